@@ -8,19 +8,46 @@ The file contains the following functions
     node (stored in the dictionary called previous_on_path) is set to be None.
 
     * relax - auxiliary function used by the Bellman-Ford algorithm;
-    it takes as input a graph, a node, a neighbor of the node in the graph, a dictionary of distances and
-    a dictionary of parents. The function checks if we can improve the current shortest path to the input node
-    by going through the input neighbor node. If this is the case, the function updates the dictionary of distances
-    and the one of parents.
+    it takes as input a graph, a node, a neighbor of the node in the graph, a dictionary of distances,
+    a dictionary of parents and optionally the weight of the edge, which is otherwise looked up in the graph
+    (with parallel edges, the smallest weight is used). The function checks if we can improve the current shortest
+    path to the input node by going through the input neighbor node. If this is the case, the function updates the
+    dictionary of distances and the one of parents.
+
+    The function returns True if it updated the two dictionaries and False otherwise.
 
     * bellman_ford - the main function of the file, that takes as input a graph and a source and returns either
-    the shortest path to all the other nodes in the graph, or it flags that it found a negative cycle in the graph
+    the shortest path to all the other nodes in the graph, or it flags that it found a negative cycle in the graph.
+    The function stops as soon as a pass over all the edges makes no relaxation, as no later pass can make one.
+
+    * spfa - queue based version of the Bellman-Ford algorithm (Shortest Path Faster Algorithm); it only relaxes
+    the edges leaving the nodes whose distance improved, and returns the dictionary of distances, the dictionary
+    of parents and a negative cycle reachable from source, or None if there is no such cycle
+
+    * find_negative_cycle - takes as input a graph and a source, and returns a list of nodes forming a negative
+    cycle reachable from source, or None if there is no such cycle
+
+    * extract_cycle - auxiliary function that takes as input a dictionary of parents and a node, and walks back
+    through the parents until a node repeats; it returns the nodes of the cycle in the order of the edges
+
+All the functions iterate over the pairs (neighbor, weight) stored in the adjacency lists of the graph, so that no
+(node, neighbor) tuple has to be built and hashed for every relaxation, and every parallel edge is relaxed with its
+own weight. See the below implementation of the class Graph, which stores every edge only once, and computes the
+lists of neighbors and the weights keyed by node tuples as read only views, with the classes Neighbors and EdgeWeights
+from dijkstra.py.
+
+The file also contains the class ShortestPathCache, the one from dijkstra.py computing the results with bellman_ford
+by default, which keeps the results for the most recently queried sources, and drops them when graph.version changes.
 """
 
 
 from collections import defaultdict
+from collections import deque
 import unittest
 
+from dijkstra import EdgeWeights, Neighbors
+from dijkstra import ShortestPathCache as DijkstraShortestPathCache
+
 
 class Graph:
     """
@@ -32,11 +59,19 @@ class Graph:
             nodes : set
                 a set consisting of all the nodes in the graph
 
-            edges : dict
-                a dictionary storing all edges, in the format node : [list of neighboring nodes]
+            edges : Neighbors
+                a read only view of all edges, in the format node : [list of neighboring nodes]
+
+            weighted_edges : dict
+                a dictionary storing all edges with their weights, in the format
+                node : [list of pairs (neighboring node, weight of edge)]
 
-            distances: dict
-                a dictionary storing the weights of each edge, in the format (node_1, node_2) : weight of edge
+            distances: EdgeWeights
+                a read only view of the weights of each edge, in the format (node_1, node_2) : weight of edge;
+                with parallel edges, the weight is the smallest one
+
+            version : int
+                the number of changes made to the graph so far, used to invalidate cached results
 
         Methods
         ----------
@@ -54,25 +89,24 @@ class Graph:
         """
     def __init__(self):
         self.nodes = set()
-        self.edges = defaultdict(list)
-        self.distances = {}
+        self.weighted_edges = defaultdict(list)
+        self.edges = Neighbors(self.weighted_edges)
+        self.distances = EdgeWeights(self.weighted_edges)
+        self.version = 0
 
     def add_node(self, node):
-        self.nodes.add(node)
+        if node not in self.nodes:
+            self.nodes.add(node)
+            self.version += 1
 
     def add_edge(self, source_node, target_node, distance):
         # first add the two nodes to the graph.nodes, in case we forgot to do this before
         self.add_node(source_node)
         self.add_node(target_node)
 
-        # add the edge in the oriented graph
-        if source_node in self.edges:
-            self.edges[source_node].append(target_node)
-        else:
-            self.edges[source_node] = [target_node]
-
-        # add the distance between the two nodes
-        self.distances[(source_node, target_node)] = distance
+        # add the edge in the oriented graph, with the distance between the two nodes next to the neighbor
+        self.weighted_edges[source_node].append((target_node, distance))
+        self.version += 1
 
 
 def initialize(graph, source):
@@ -82,28 +116,115 @@ def initialize(graph, source):
     return distance, previous_on_path
 
 
-def relax(graph, node, neighbor, distance, previous_on_path):
+def relax(graph, node, neighbor, distance, previous_on_path, weight=None):
+    if weight is None:
+        weight = graph.distances[(node, neighbor)]
+
     # check if distance between node and neighbor is smaller than what we currently have
-    if distance[neighbor] > distance[node] + graph.distances[(node, neighbor)]:
-        distance[neighbor] = distance[node] + graph.distances[(node, neighbor)]
+    if distance[neighbor] > distance[node] + weight:
+        distance[neighbor] = distance[node] + weight
         previous_on_path[neighbor] = node
+        return True
+    return False
 
 
 def bellman_ford(graph, source):
     distance, previous_on_path = initialize(graph, source)
     for j in range(len(graph.nodes)):
+        relaxed = False
         for node in graph.nodes:
-            for neighbor in graph.edges[node]:
-                relax(graph, node, neighbor, distance, previous_on_path)
+            for neighbor, weight in graph.weighted_edges[node]:
+                if relax(graph, node, neighbor, distance, previous_on_path, weight):
+                    relaxed = True
+
+        # if nothing changed in this pass, nothing will change in the next ones either
+        if not relaxed:
+            break
 
     # check for negative cycles
     for node in graph.nodes:
-        for neighbor in graph.edges[node]:
-            assert distance[neighbor] <= distance[node] + graph.distances[(node, neighbor)], "Negative cycle!"
+        for neighbor, weight in graph.weighted_edges[node]:
+            assert distance[neighbor] <= distance[node] + weight, "Negative cycle!"
 
     return distance, previous_on_path
 
 
+def spfa(graph, source):
+    distance, previous_on_path = initialize(graph, source)
+
+    # edge_count[node] is the number of edges on the current path to node; a path with len(graph.nodes)
+    # edges repeats a node, so the parents contain a negative cycle
+    edge_count = {source: 0}
+    nodes_queue = deque([source])
+    in_queue = {source}
+
+    while nodes_queue:
+        node = nodes_queue.popleft()
+        in_queue.remove(node)
+
+        for neighbor, weight in graph.weighted_edges[node]:
+            if relax(graph, node, neighbor, distance, previous_on_path, weight):
+                edge_count[neighbor] = edge_count[node] + 1
+                if edge_count[neighbor] >= len(graph.nodes):
+                    cycle = extract_cycle(previous_on_path, neighbor)
+                    if cycle is not None:
+                        return distance, previous_on_path, cycle
+
+                if neighbor not in in_queue:
+                    nodes_queue.append(neighbor)
+                    in_queue.add(neighbor)
+
+    return distance, previous_on_path, None
+
+
+def find_negative_cycle(graph, source):
+    distance, previous_on_path = initialize(graph, source)
+    for j in range(len(graph.nodes)):
+        relaxed = False
+        for node in graph.nodes:
+            for neighbor, weight in graph.weighted_edges[node]:
+                if relax(graph, node, neighbor, distance, previous_on_path, weight):
+                    relaxed = True
+        if not relaxed:
+            return None
+
+    # an edge that can still be relaxed after len(graph.nodes) passes lies on, or is reachable from, a negative cycle
+    for node in graph.nodes:
+        for neighbor, weight in graph.weighted_edges[node]:
+            if relax(graph, node, neighbor, distance, previous_on_path, weight):
+                return extract_cycle(previous_on_path, neighbor)
+    return None
+
+
+def extract_cycle(previous_on_path, node):
+    # walk back through the parents until we reach a node for the second time
+    seen = set()
+    while node is not None and node not in seen:
+        seen.add(node)
+        node = previous_on_path[node]
+
+    if node is None:
+        return None
+
+    # node is on the cycle, so walk around it once more to collect it
+    cycle = [node]
+    current = previous_on_path[node]
+    while current != node:
+        cycle.append(current)
+        current = previous_on_path[current]
+    cycle.reverse()
+    return cycle
+
+
+class ShortestPathCache(DijkstraShortestPathCache):
+    """
+    The cache of shortest path trees from dijkstra.py, computed by default with bellman_ford; a source reaching a
+    negative cycle raises an AssertionError, and nothing is cached for it
+    """
+    def __init__(self, graph, algorithm=None, max_entries=128, max_bytes=None):
+        super().__init__(graph, bellman_ford if algorithm is None else algorithm, max_entries, max_bytes)
+
+
 class TestBellmanFord(unittest.TestCase):
 
     def setUp(self):
@@ -124,5 +245,63 @@ class TestBellmanFord(unittest.TestCase):
         expected = ({'A': float('inf'), 'B': 0, 'C': 8, 'D': 4}, {'A': None, 'B': None, 'C': 'B', 'D': 'C'})
         self.assertEqual(actual, expected)
 
-
-unittest.main(verbosity=2)
+    def test_spfa(self):
+        actual = spfa(self.graph, 'A')
+        expected = ({'A': 0, 'B': -1, 'C': 7, 'D': 3}, {'A': None, 'B': 'A', 'C': 'B', 'D': 'C'}, None)
+        self.assertEqual(actual, expected)
+        self.assertIsNone(find_negative_cycle(self.graph, 'A'))
+
+    def test_negative_cycle(self):
+        # add the cycle C -> D -> E -> C, of weight -4 + 1 + 2 = -1
+        self.graph.add_edge('D', 'E', 1)
+        self.graph.add_edge('E', 'C', 2)
+        self.graph.add_node('F')
+
+        cycle = spfa(self.graph, 'A')[2]
+        self.assertEqual(set(cycle), {'C', 'D', 'E'})
+        self.assertEqual(sum(self.graph.distances[(u, v)] for u, v in zip(cycle, cycle[1:] + cycle[:1])), -1)
+
+        cycle = find_negative_cycle(self.graph, 'A')
+        self.assertEqual(set(cycle), {'C', 'D', 'E'})
+        self.assertEqual(sum(self.graph.distances[(u, v)] for u, v in zip(cycle, cycle[1:] + cycle[:1])), -1)
+
+        # the cycle cannot be reached from F
+        self.assertIsNone(spfa(self.graph, 'F')[2])
+        self.assertIsNone(find_negative_cycle(self.graph, 'F'))
+
+        with self.assertRaises(AssertionError):
+            bellman_ford(self.graph, 'A')
+
+    def test_shortest_path_cache(self):
+        cache = ShortestPathCache(self.graph, max_entries=1)
+        self.assertEqual(cache.get('A'), bellman_ford(self.graph, 'A'))
+        cache.get('A')
+        cache.get('B')
+        self.assertEqual(cache.stats(), {'entries': 1, 'bytes': cache.nbytes, 'hits': 1, 'misses': 2,
+                                         'evictions': 1, 'invalidations': 0})
+
+        # the new edge closes the negative cycle C -> D -> E -> C, so the cached results are dropped
+        self.graph.add_edge('D', 'E', 1)
+        self.graph.add_edge('E', 'C', 2)
+        with self.assertRaises(AssertionError):
+            cache.get('B')
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+    def test_parallel_edges(self):
+        # a parallel edge from C to D with a larger weight must not hide the smaller one, and a parallel edge
+        # from D to B closes a negative cycle B -> C -> D -> B of weight 8 - 4 - 5 = -1
+        self.graph.add_edge('C', 'D', 10)
+        self.assertEqual(self.graph.distances[('C', 'D')], -4)
+        self.assertEqual(bellman_ford(self.graph, 'A')[0]['D'], 3)
+        self.assertEqual(spfa(self.graph, 'A')[0]['D'], 3)
+
+        self.graph.add_edge('D', 'B', 0)
+        self.graph.add_edge('D', 'B', -5)
+        self.assertEqual(set(spfa(self.graph, 'A')[2]), {'B', 'C', 'D'})
+        self.assertEqual(set(find_negative_cycle(self.graph, 'A')), {'B', 'C', 'D'})
+
+
+# other files import bellman_ford, so the tests only run when this file is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
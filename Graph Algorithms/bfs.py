@@ -12,6 +12,9 @@ The file contains the following functions
     *bfs_target - takes as input a graph, a source node and a target node from the graph
         and returns a list representing the path from source to target, if this exists
 
+    *bidirectional_bfs - same as bfs_target, but searches at the same time from the source and from the target,
+        always expanding the smaller of the two frontiers, until the two searches meet
+
     *reconstruct_path - takes as input a dictionary representing a path from a source to a target,
         together with the target node, and returns a list representing the path from source to target
 
@@ -120,11 +123,68 @@ def bfs_target(graph, source, target):
     return 'Target node cannot be reached from the source node'
 
 
+def bidirectional_bfs(graph, source, target, reversed_edges=None):
+    if source not in graph.nodes:
+        raise ValueError('The given source node is not in the graph')
+
+    if target not in graph.nodes:
+        raise ValueError('The given target node is not in the graph')
+
+    if source == target:
+        return [source]
+
+    # the search from target follows the edges backwards; for undirected graphs, these are the same edges
+    if reversed_edges is None:
+        reversed_edges = graph.edges
+
+    # index 0 is the search from source and index 1 the search from target; the dictionaries of parents
+    # serve both as paths and as visited nodes indicators, and distance stores the level of every visited node
+    adjacency = [graph.edges, reversed_edges]
+    previous_on_path = [{source: None}, {target: None}]
+    distance = [{source: 0}, {target: 0}]
+    frontiers = [[source], [target]]
+
+    while frontiers[0] and frontiers[1]:
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        other = 1 - side
+
+        # expand the whole level, and keep the shortest connection between the two searches
+        next_frontier = []
+        best_length = float('inf')
+        best_edge = None
+        for current in frontiers[side]:
+            for neighbor in adjacency[side][current]:
+                if neighbor in distance[other]:
+                    length = distance[side][current] + 1 + distance[other][neighbor]
+                    if length < best_length:
+                        best_length = length
+                        best_edge = (current, neighbor)
+                if neighbor not in distance[side]:
+                    distance[side][neighbor] = distance[side][current] + 1
+                    previous_on_path[side][neighbor] = current
+                    next_frontier.append(neighbor)
+
+        if best_edge is not None:
+            # join the path from the root of this side to current with the path from neighbor to the other root
+            current, neighbor = best_edge
+            path = reconstruct_path(previous_on_path[side], current)
+            while neighbor is not None:
+                path.append(neighbor)
+                neighbor = previous_on_path[other][neighbor]
+            if side == 1:
+                path.reverse()
+            return path
+
+        frontiers[side] = next_frontier
+
+    return 'Target node cannot be reached from the source node'
+
+
 def reconstruct_path(path_dictionary, target):
     # store nodes in backwards order first, starting from target
     reversed_path = []
     current = target
-    while current:
+    while current is not None:
         reversed_path.append(current)
         current = path_dictionary[current]
     reversed_path.reverse()
@@ -191,6 +251,35 @@ class TestBFS(unittest.TestCase):
         expected = ['A', 'D', 'C']
         self.assertEqual(actual, expected)
 
+    def test_bidirectional_bfs(self):
+        self.assertEqual(bidirectional_bfs(self.graph, 'A', 'C'), ['A', 'D', 'C'])
+        self.assertEqual(bidirectional_bfs(self.graph, 'B', 'E'), ['B', 'A', 'D', 'E'])
+        self.assertEqual(bidirectional_bfs(self.graph, 'E', 'E'), ['E'])
+        self.assertEqual(bidirectional_bfs(self.graph, 'A', 'G'), 'Target node cannot be reached from the source node')
+
+    def test_bidirectional_bfs_shortest(self):
+        # a cycle of 10 nodes with a chord, where all the shortest paths have the same length as with bfs_target
+        graph = Graph()
+        for node in range(1, 11):
+            graph.add_edge('n' + str(node), 'n' + str(node % 10 + 1))
+        graph.add_edge('n1', 'n6')
+        for source in graph.nodes:
+            for target in graph.nodes:
+                path = bidirectional_bfs(graph, source, target)
+                self.assertEqual(len(path), len(bfs_target(graph, source, target)))
+                self.assertEqual((path[0], path[-1]), (source, target))
+                for node_1, node_2 in zip(path, path[1:]):
+                    self.assertIn(node_2, graph.edges[node_1])
+
+    def test_bidirectional_bfs_falsy_node(self):
+        # node 0 is a valid endpoint, not the end of the path
+        graph = Graph()
+        for node in range(5):
+            graph.add_edge(node, node + 1)
+        self.assertEqual(bidirectional_bfs(graph, 0, 5), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(bidirectional_bfs(graph, 5, 0), [5, 4, 3, 2, 1, 0])
+        self.assertEqual(bfs_target(graph, 0, 3), [0, 1, 2, 3])
+
     def test_connected_components(self):
         actual = bfs_all_graph(self.graph)
         expected = set()
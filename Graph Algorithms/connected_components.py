@@ -0,0 +1,202 @@
+""" Python3 implementation of connected components of an undirected graph, maintained with a disjoint-set forest
+
+bfs_all_graph from bfs.py finds the connected components of a graph by running BFS from every node that was not
+visited yet. This has to be repeated from scratch every time an edge is added, and keeps a dictionary of parents
+for every component. When the edges arrive one by one and the questions are only of the form "are these two nodes
+connected?" or "how large is the component of this node?", a disjoint-set (union-find) forest is a better fit:
+adding an edge merges the trees of its two endpoints, and every query only walks up to the root of a tree.
+
+The forest is stored in flat arrays (Python array module) indexed by integer node ids, uses union by size and path
+compression, so that every operation runs in O(alpha(V)) amortized time, where alpha is the inverse Ackermann
+function (at most 4 for any practical V). For more details, see Chapter 21.3 in 3rd edition of
+Cormen - Introduction to Algorithms.
+
+The file contains the following classes:
+    ConnectedComponents - connected components of an undirected graph, built one edge at a time
+
+    TestConnectedComponents - test cases for the connected components
+"""
+
+from array import array
+import os
+import tempfile
+import unittest
+
+
+class ConnectedComponents:
+    """
+    Connected components of an undirected graph, stored as a disjoint-set forest
+
+    Attributes
+    ----------
+
+        ids : dict
+            the integer id of every node, in the format node : id
+
+        labels : list
+            the inverse of ids, in the format id : node
+
+        parent : array
+            the parent of every id in the forest; the roots are their own parents
+
+        size : array
+            the number of nodes in the tree of every root
+
+        component_count : int
+            the number of connected components
+
+    Methods
+    ----------
+
+        add_node(node)
+            adds node to graph, as a component of its own
+
+        add_edge (node_1, node_2)
+            adds node_1 and node_2 to the graph and merges their components
+
+        add_edges (edges)
+            adds all the edges from an iterable of pairs (node_1, node_2)
+
+        from_file(path, node_type=str)
+            class method that builds the components from a text file with one edge "node_1 node_2" per line;
+            lines with a single node add that node only, and empty lines and lines starting with # are skipped
+
+        find_root(node_id)
+            returns the id of the root of the tree containing node_id, compressing the path to the root
+
+        find(node)
+            returns the id of the root of the tree containing node
+
+        same_component(node_1, node_2)
+            checks whether node_1 and node_2 are in the same connected component
+
+        component_size(node)
+            returns the number of nodes in the component of node
+
+        components
+            returns a set consisting of all connected components, each represented as a frozenset,
+            same as bfs_all_graph from bfs.py
+    """
+    def __init__(self):
+        self.ids = {}
+        self.labels = []
+        self.parent = array('l')
+        self.size = array('l')
+        self.component_count = 0
+
+    def add_node(self, node):
+        node_id = self.ids.get(node)
+        if node_id is None:
+            node_id = len(self.labels)
+            self.ids[node] = node_id
+            self.labels.append(node)
+            self.parent.append(node_id)
+            self.size.append(1)
+            self.component_count += 1
+        return node_id
+
+    def add_edge(self, node_1, node_2):
+        root_1 = self.find_root(self.add_node(node_1))
+        root_2 = self.find_root(self.add_node(node_2))
+        if root_1 == root_2:
+            return
+
+        # attach the smaller tree under the root of the larger one
+        if self.size[root_1] < self.size[root_2]:
+            root_1, root_2 = root_2, root_1
+        self.parent[root_2] = root_1
+        self.size[root_1] += self.size[root_2]
+        self.component_count -= 1
+
+    def add_edges(self, edges):
+        for node_1, node_2 in edges:
+            self.add_edge(node_1, node_2)
+
+    @classmethod
+    def from_file(cls, path, node_type=str):
+        components = cls()
+        # a large buffer, so that the file is read in big chunks
+        with open(path, buffering=1 << 20) as edge_file:
+            for line in edge_file:
+                fields = line.split()
+                if not fields or fields[0].startswith('#'):
+                    continue
+                if len(fields) == 1:
+                    components.add_node(node_type(fields[0]))
+                else:
+                    components.add_edge(node_type(fields[0]), node_type(fields[1]))
+        return components
+
+    def find_root(self, node_id):
+        parent = self.parent
+        root = node_id
+        while parent[root] != root:
+            root = parent[root]
+
+        # point every node on the path directly to the root
+        while parent[node_id] != root:
+            parent[node_id], node_id = root, parent[node_id]
+        return root
+
+    def find(self, node):
+        if node not in self.ids:
+            raise ValueError('The given node is not in the graph')
+        return self.find_root(self.ids[node])
+
+    def same_component(self, node_1, node_2):
+        return self.find(node_1) == self.find(node_2)
+
+    def component_size(self, node):
+        return self.size[self.find(node)]
+
+    def components(self):
+        members = {}
+        for node_id, node in enumerate(self.labels):
+            members.setdefault(self.find_root(node_id), []).append(node)
+        return {frozenset(component) for component in members.values()}
+
+
+class TestConnectedComponents(unittest.TestCase):
+
+    def setUp(self):
+        # same graph as in the tests of bfs.py
+        self.components = ConnectedComponents()
+        self.components.add_edge('A', 'B')
+        self.components.add_edge('A', 'D')
+        self.components.add_edge('D', 'E')
+        self.components.add_edge('D', 'C')
+        self.components.add_edge('F', 'G')
+        self.components.add_node('H')
+
+    def test_components(self):
+        actual = self.components.components()
+        expected = {frozenset({'A', 'B', 'C', 'D', 'E'}), frozenset({'F', 'G'}), frozenset({'H'})}
+        self.assertEqual(actual, expected)
+        self.assertEqual(self.components.component_count, 3)
+
+    def test_queries(self):
+        self.assertTrue(self.components.same_component('B', 'C'))
+        self.assertFalse(self.components.same_component('A', 'G'))
+        self.assertEqual(self.components.component_size('E'), 5)
+        self.assertEqual(self.components.component_size('H'), 1)
+        with self.assertRaises(ValueError):
+            self.components.same_component('A', 'Z')
+
+    def test_incremental_edges(self):
+        self.components.add_edges([('G', 'H'), ('H', 'C'), ('C', 'A')])
+        self.assertTrue(self.components.same_component('F', 'B'))
+        self.assertEqual(self.components.component_size('F'), 8)
+        self.assertEqual(self.components.component_count, 1)
+
+    def test_from_file(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as edge_file:
+            edge_file.write('# a comment\n1 2\n2 3\n\n4 5\n6\n')
+        try:
+            components = ConnectedComponents.from_file(edge_file.name, node_type=int)
+        finally:
+            os.remove(edge_file.name)
+        self.assertEqual(components.components(), {frozenset({1, 2, 3}), frozenset({4, 5}), frozenset({6})})
+        self.assertTrue(components.same_component(1, 3))
+
+
+unittest.main(verbosity=2)
@@ -0,0 +1,912 @@
+""" Python3 implementation of a graph stored in Compressed Sparse Row (CSR) format, together with
+versions of the graph algorithms from this folder that run directly on it.
+
+The Graph classes from the other files store a set of nodes, a dictionary of adjacency lists and, for
+weighted graphs, a dictionary of weights keyed by (node_1, node_2) tuples. This is convenient for
+building a graph one edge at a time, but it costs a few hundred bytes per edge and a tuple hash on every
+relaxation. Once a graph is built, it can be frozen into CSR format:
+    * every node gets an integer id between 0 and V-1
+    * targets[offsets[u]: offsets[u+1]] are the ids of the neighbors of the node with id u
+    * weights[offsets[u]: offsets[u+1]] are the weights of the corresponding edges
+The three arrays are stored with the Python array module, i.e. as flat machine integers and floats,
+which takes 16 bytes per edge and 8 bytes per node.
+
+Instead of building a Graph one add_edge call at a time, a CSR graph can also be loaded directly from a text file
+with one edge "node_1 node_2 [weight]" per line, which is read in large chunks, or saved to and loaded from a compact
+binary file. The binary file consists of a header followed by the three arrays, stored as 64 bit little endian
+integers and floats, and the labels of the nodes:
+    * header: the magic bytes b'CSRG', a format version, the type of the labels, V and E (32 bytes in total)
+    * offsets (V+1 integers), targets (E integers) and weights (E floats)
+    * labels: nothing if the nodes are the integers 0, ..., V-1, V integers if the nodes are other integers, and the
+    labels separated by newlines if the nodes are strings; other labels, and strings containing a newline, cannot
+    be saved
+The loader maps the file into memory with mmap, and the arrays of the graph are views into the mapped file, so that
+nothing is copied and the pages of the file are only read when an algorithm touches them.
+
+The algorithms below work with node ids instead of nodes, and return arrays indexed by node id. A parent
+equal to -1 plays the role of None in the dictionaries returned by the other files. Use node_id and
+node_label to translate between nodes and ids.
+
+The file contains the following classes:
+    Graph - implementation of a weighted directed graph using adjacency list, same as in dijkstra.py
+
+    CSRGraph - immutable graph in CSR format
+
+    TestCSRGraph - test cases for the CSR graph and the algorithms running on it
+
+The file contains the following functions
+    * csr_bfs - takes as input a CSR graph and a source id, and returns the array of parents on the
+    breadth first search tree rooted at source
+
+    * csr_dfs - takes as input a CSR graph, a source id and a target id, and returns a boolean indicating
+    whether there is a path from source to target
+
+    * csr_dijkstra - takes as input a CSR graph and a source id, and returns the arrays of distances and of
+    parents on the shortest paths from source
+
+    * csr_bellman_ford - same as csr_dijkstra, but allows negative weights and flags negative cycles
+
+    * csr_prim - takes as input an undirected CSR graph and a source id, and returns the array of parents
+    of a minimum spanning tree rooted at source
+
+    * csr_top_sort - takes as input a directed CSR graph and returns a list of node ids in topological order
+
+    * csr_level_bfs - takes as input a CSR graph and a source id, and returns the arrays of distances (number of
+    edges, -1 for unreachable nodes) and of parents on the breadth first search tree rooted at source. Unlike
+    csr_bfs, it expands the search one whole level (frontier) at a time, choosing for every level between two
+    directions (Beamer, Asanovic and Patterson, Direction-optimizing breadth-first search, 2012):
+        - top-down: the edges leaving the frontier are scanned, to find the nodes that were not reached yet
+        - bottom-up: for every node that was not reached yet, its incoming edges are scanned until one of them
+        comes from the frontier; this is much cheaper when the frontier is large
+    Each level can also be split between worker processes, which receive the graph only once, when they start
+"""
+
+from array import array
+from collections import defaultdict
+from collections import deque
+import concurrent.futures
+import heapq
+import mmap
+from multiprocessing import shared_memory
+import os
+import random
+import struct
+import sys
+import tempfile
+import unittest
+
+
+# the header of the binary file: magic bytes, version, type of the labels, number of nodes, number of edges
+_HEADER = struct.Struct('<4sIQqq')
+_MAGIC = b'CSRG'
+_VERSION = 1
+# the types of the labels in the binary file: the integers 0, ..., V-1, strings, or any other integers
+_RANGE_LABELS, _STRING_LABELS, _INTEGER_LABELS = 0, 1, 2
+
+
+class Graph:
+    """
+            An implementation of a directed graph using adjacency list representation
+
+            Attributes
+            ----------
+
+                nodes : set
+                    a set consisting of all the nodes in the graph
+
+                edges : dict
+                    a dictionary storing all edges, in the format node : [list of neighboring nodes]
+
+                distances: dict
+                    a dictionary storing the weights of each edge, in the format (node_1, node_2) : weight of edge
+
+            Methods
+            ----------
+
+                add_node(node)
+                    adds node to graph
+
+                add_edge (node_1, node_2, weight)
+                    adds node_1 and node_2 to the graph, together with the corresponding edges and weight
+                    adds node_2 to the neighbors of node_1
+            """
+
+    def __init__(self):
+        self.nodes = set()
+        self.edges = defaultdict(list)
+        self.distances = {}
+
+    def add_node(self, node):
+        self.nodes.add(node)
+
+    def add_edge(self, source_node, target_node, distance):
+        # first add the two nodes to the graph.nodes, in case we forgot to do this before
+        self.add_node(source_node)
+        self.add_node(target_node)
+
+        # add the edge in the directed graph
+        self.edges[source_node].append(target_node)
+
+        # add the distance between the two nodes
+        self.distances[(source_node, target_node)] = distance
+
+
+class CSRGraph:
+    """
+    An immutable graph stored in Compressed Sparse Row format
+
+    Attributes
+    ----------
+
+        labels : list
+            the original nodes, in the format id : node
+
+        ids : dict
+            the inverse of labels, in the format node : id
+
+        offsets : array
+            array of V+1 integers; the edges leaving the node with id u are stored between
+            offsets[u] (inclusive) and offsets[u+1] (exclusive) in targets and weights
+
+        targets : array
+            array of E integers, storing the id of the target node of each edge
+
+        weights : array
+            array of E floats, storing the weight of each edge
+
+    Methods
+    ----------
+
+        from_graph(graph)
+            class method that builds a CSR graph from any of the Graph classes in this folder; the weights are
+            read from graph.distances or graph.weights, and are all equal to 1 for unweighted graphs
+
+        node_id(node)
+            returns the integer id of node
+
+        node_label(node_id)
+            returns the node with the given id
+
+        neighbors(node_id)
+            returns a range of positions in targets and weights, covering the edges leaving node_id
+
+        reverse
+            returns a new CSR graph with all edges reversed, with the same ids
+
+        nbytes
+            returns the number of bytes used by the three arrays
+
+        from_edge_list(path, node_type=int, undirected=False)
+            class method that builds a CSR graph from a text file with one edge "node_1 node_2 [weight]" per line;
+            missing weights are equal to 1, and empty lines and lines starting with # are skipped; if undirected is
+            True, every edge is added in both directions
+
+        save(path)
+            writes the graph to a binary file; the labels must be all integers or all strings without newlines
+
+        load(path)
+            class method that maps a binary file written by save into memory, and returns the graph stored in it,
+            with labels of the same type as the saved ones
+
+        fill_graph(graph)
+            adds all the nodes and edges to an empty Graph from any of the files in this folder, without going
+            through its add_edge method
+    """
+
+    def __init__(self, labels, offsets, targets, weights):
+        self.labels = labels
+        # when the nodes are the integers 0, ..., V-1, the range is its own inverse and no dictionary is needed
+        if isinstance(labels, range) and labels.start == 0 and labels.step == 1:
+            self.ids = labels
+        else:
+            self.ids = {node: idx for idx, node in enumerate(labels)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_graph(cls, graph):
+        # sort the nodes when possible, so that the ids do not depend on the order of the set graph.nodes
+        try:
+            labels = sorted(graph.nodes)
+        except TypeError:
+            labels = list(graph.nodes)
+        ids = {node: idx for idx, node in enumerate(labels)}
+
+        # the weighted graphs store the weights either next to the neighbors, as weighted_edges, or in a
+        # dictionary keyed by node tuples, as distances or as weights
+        weighted_edges = getattr(graph, 'weighted_edges', None)
+        edge_weights = getattr(graph, 'distances', None)
+        if edge_weights is None:
+            edge_weights = getattr(graph, 'weights', None)
+
+        offsets = array('l', [0])
+        targets = array('l')
+        weights = array('d')
+        for node in labels:
+            if weighted_edges is not None:
+                for neighbor, weight in weighted_edges.get(node, ()):
+                    targets.append(ids[neighbor])
+                    weights.append(weight)
+            else:
+                for neighbor in graph.edges.get(node, ()):
+                    targets.append(ids[neighbor])
+                    weights.append(1 if edge_weights is None else edge_weights[(node, neighbor)])
+            offsets.append(len(targets))
+
+        return cls(labels, offsets, targets, weights)
+
+    @classmethod
+    def from_edge_list(cls, path, node_type=int, undirected=False, chunk_size=1 << 20):
+        ids = {}
+        labels = []
+        sources = array('l')
+        targets = array('l')
+        weights = array('d')
+
+        with open(path) as edge_file:
+            while True:
+                # read about chunk_size bytes of whole lines at once
+                lines = edge_file.readlines(chunk_size)
+                if not lines:
+                    break
+                for line in lines:
+                    fields = line.split()
+                    if not fields or fields[0].startswith('#'):
+                        continue
+
+                    edge_ids = []
+                    for node in map(node_type, fields[:2]):
+                        node_id = ids.get(node)
+                        if node_id is None:
+                            node_id = ids[node] = len(labels)
+                            labels.append(node)
+                        edge_ids.append(node_id)
+
+                    if len(edge_ids) == 1:
+                        continue
+                    weight = float(fields[2]) if len(fields) > 2 else 1
+                    sources.append(edge_ids[0])
+                    targets.append(edge_ids[1])
+                    weights.append(weight)
+                    if undirected:
+                        sources.append(edge_ids[1])
+                        targets.append(edge_ids[0])
+                        weights.append(weight)
+
+        # when the nodes are exactly the integers 0, ..., V-1 in order, use them as their own ids
+        if labels == list(range(len(labels))):
+            labels = range(len(labels))
+
+        # counting sort of the edges by source node
+        n = len(labels)
+        offsets = array('l', [0]) * (n + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for node in range(n):
+            offsets[node + 1] += offsets[node]
+
+        next_position = array('l', offsets[:n])
+        sorted_targets = array('l', [0]) * len(targets)
+        sorted_weights = array('d', [0]) * len(targets)
+        for source, target, weight in zip(sources, targets, weights):
+            sorted_targets[next_position[source]] = target
+            sorted_weights[next_position[source]] = weight
+            next_position[source] += 1
+
+        return cls(labels, offsets, sorted_targets, sorted_weights)
+
+    def save(self, path):
+        n = len(self.labels)
+        # check the labels before writing anything, so that a failed save leaves no partial file
+        if (isinstance(self.labels, range) and self.labels.start == 0 and self.labels.step == 1) or \
+                self.labels == list(range(n)):
+            label_type, label_bytes = _RANGE_LABELS, b''
+        elif all(type(label) is int for label in self.labels):
+            try:
+                label_values = array('q', self.labels)
+            except OverflowError:
+                raise ValueError('Integer labels must fit in 64 bits')
+            if sys.byteorder == 'big':
+                label_values.byteswap()
+            label_type, label_bytes = _INTEGER_LABELS, label_values.tobytes()
+        elif all(type(label) is str and '\n' not in label for label in self.labels):
+            label_type, label_bytes = _STRING_LABELS, '\n'.join(self.labels).encode()
+        else:
+            raise ValueError('Only integer labels and string labels without newlines can be saved')
+
+        with open(path, 'wb') as graph_file:
+            graph_file.write(_HEADER.pack(_MAGIC, _VERSION, label_type, n, len(self.targets)))
+            for values, typecode in [(self.offsets, 'q'), (self.targets, 'q'), (self.weights, 'd')]:
+                values = array(typecode, values)
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                values.tofile(graph_file)
+            graph_file.write(label_bytes)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as graph_file:
+            mapped_file = mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, label_type, n, m = _HEADER.unpack_from(mapped_file)
+        if magic != _MAGIC or version != _VERSION or label_type not in (_RANGE_LABELS, _STRING_LABELS, _INTEGER_LABELS):
+            raise ValueError('The given file is not a CSR graph file')
+        if sys.byteorder == 'big':
+            raise ValueError('Memory mapped CSR graph files are only supported on little endian machines')
+
+        # views into the mapped file, without copying
+        view = memoryview(mapped_file)
+        start = _HEADER.size
+        offsets = view[start: start + 8 * (n + 1)].cast('q')
+        start += 8 * (n + 1)
+        targets = view[start: start + 8 * m].cast('q')
+        start += 8 * m
+        weights = view[start: start + 8 * m].cast('d')
+        start += 8 * m
+
+        if label_type == _STRING_LABELS:
+            labels = bytes(view[start:]).decode().split('\n') if n else []
+        elif label_type == _INTEGER_LABELS:
+            labels = view[start: start + 8 * n].cast('q').tolist()
+        else:
+            labels = range(n)
+
+        graph = cls(labels, offsets, targets, weights)
+        graph.mapped_file = mapped_file
+        return graph
+
+    def fill_graph(self, graph):
+        labels, offsets, targets, weights = self.labels, self.offsets, self.targets, self.weights
+        graph.nodes.update(labels)
+
+        # the weighted graphs store the weights either next to the neighbors, as weighted_edges, or in a
+        # dictionary keyed by node tuples, as distances or as weights
+        weighted_edges = getattr(graph, 'weighted_edges', None)
+        edge_weights = getattr(graph, 'distances', None)
+        if edge_weights is None:
+            edge_weights = getattr(graph, 'weights', None)
+
+        for node_id, node in enumerate(labels):
+            neighbors = [labels[target] for target in targets[offsets[node_id]: offsets[node_id + 1]]]
+            if neighbors:
+                # the neighbors of the graphs with weighted_edges are a read only view of them
+                if weighted_edges is not None:
+                    weighted_edges[node] = list(zip(neighbors, weights[offsets[node_id]: offsets[node_id + 1]]))
+                    continue
+                graph.edges[node] = neighbors
+                if edge_weights is not None:
+                    edge_weights.update(zip(((node, neighbor) for neighbor in neighbors),
+                                            weights[offsets[node_id]: offsets[node_id + 1]]))
+        return graph
+
+    def __len__(self):
+        return len(self.labels)
+
+    def node_id(self, node):
+        return self.ids[node]
+
+    def node_label(self, node_id):
+        return self.labels[node_id]
+
+    def neighbors(self, node_id):
+        return range(self.offsets[node_id], self.offsets[node_id + 1])
+
+    def reverse(self):
+        n = len(self.labels)
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        # count the incoming edges of every node, and turn the counts into offsets
+        reversed_offsets = array('l', [0]) * (n + 1)
+        for target in targets:
+            reversed_offsets[target + 1] += 1
+        for node in range(n):
+            reversed_offsets[node + 1] += reversed_offsets[node]
+
+        # place every edge at the next free position of its target
+        next_position = array('l', reversed_offsets[:n])
+        reversed_targets = array('l', [0]) * len(targets)
+        reversed_weights = array('d', [0]) * len(targets)
+        for node in range(n):
+            for position in range(offsets[node], offsets[node + 1]):
+                target = targets[position]
+                reversed_targets[next_position[target]] = node
+                reversed_weights[next_position[target]] = weights[position]
+                next_position[target] += 1
+
+        return CSRGraph(self.labels, reversed_offsets, reversed_targets, reversed_weights)
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.offsets, self.targets, self.weights))
+
+
+def csr_bfs(graph, source):
+    n = len(graph)
+    if not 0 <= source < n:
+        raise ValueError('The given source node is not in the graph')
+
+    offsets, targets = graph.offsets, graph.targets
+
+    # the parent of every node, -1 if the node was not reached; the source is its own parent while
+    # the search is running, so that it is marked as visited
+    previous_on_path = array('l', [-1]) * n
+    previous_on_path[source] = source
+    nodes_queue = deque([source])
+
+    while nodes_queue:
+        current = nodes_queue.popleft()
+        for position in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[position]
+            if previous_on_path[neighbor] == -1:
+                previous_on_path[neighbor] = current
+                nodes_queue.append(neighbor)
+
+    previous_on_path[source] = -1
+    return previous_on_path
+
+
+def csr_dfs(graph, source, target):
+    offsets, targets = graph.offsets, graph.targets
+    visited = bytearray(len(graph))
+    stack = [source]
+
+    while stack:
+        current = stack.pop()
+        if visited[current]:
+            continue
+        visited[current] = 1
+
+        if current == target:
+            return True
+
+        for position in range(offsets[current], offsets[current + 1]):
+            if not visited[targets[position]]:
+                stack.append(targets[position])
+
+    return False
+
+
+def csr_dijkstra(graph, source):
+    n = len(graph)
+    assert 0 <= source < n
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = array('d', [float('inf')]) * n
+    distances[source] = 0
+    previous_on_path = array('l', [-1]) * n
+    visited = bytearray(n)
+
+    # node ids are integers, so the heap can store (distance, node) pairs directly
+    heap = [(0.0, source)]
+    while heap:
+        min_distance, min_node = heapq.heappop(heap)
+        if visited[min_node]:
+            continue
+        visited[min_node] = 1
+
+        for position in range(offsets[min_node], offsets[min_node + 1]):
+            neighbor = targets[position]
+            new_distance = min_distance + weights[position]
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous_on_path[neighbor] = min_node
+                heapq.heappush(heap, (new_distance, neighbor))
+
+    return distances, previous_on_path
+
+
+def csr_bellman_ford(graph, source):
+    n = len(graph)
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = array('d', [float('inf')]) * n
+    distances[source] = 0
+    previous_on_path = array('l', [-1]) * n
+
+    for j in range(n):
+        for node in range(n):
+            node_distance = distances[node]
+            for position in range(offsets[node], offsets[node + 1]):
+                neighbor = targets[position]
+                if distances[neighbor] > node_distance + weights[position]:
+                    distances[neighbor] = node_distance + weights[position]
+                    previous_on_path[neighbor] = node
+
+    # check for negative cycles
+    for node in range(n):
+        for position in range(offsets[node], offsets[node + 1]):
+            assert distances[targets[position]] <= distances[node] + weights[position], "Negative cycle!"
+
+    return distances, previous_on_path
+
+
+def csr_prim(graph, source):
+    n = len(graph)
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+
+    # key[v] is the weight of the lightest known edge connecting v to the tree
+    key = array('d', [float('inf')]) * n
+    key[source] = 0
+    previous_on_path = array('l', [-1]) * n
+    in_tree = bytearray(n)
+
+    heap = [(0.0, source)]
+    while heap:
+        _, current_node = heapq.heappop(heap)
+        if in_tree[current_node]:
+            continue
+        in_tree[current_node] = 1
+
+        for position in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[position]
+            if not in_tree[neighbor] and weights[position] < key[neighbor]:
+                key[neighbor] = weights[position]
+                previous_on_path[neighbor] = current_node
+                heapq.heappush(heap, (weights[position], neighbor))
+
+    return previous_on_path
+
+
+def csr_top_sort(graph):
+    n = len(graph)
+    offsets, targets = graph.offsets, graph.targets
+
+    # 0 = white, 1 = gray, 2 = black, same as the colors used in dfs_top_sort
+    color = bytearray(n)
+    nodes_list = []
+
+    for root in range(n):
+        if color[root]:
+            continue
+
+        # the stack stores pairs (node, position of the next edge to explore)
+        color[root] = 1
+        stack = [(root, offsets[root])]
+        while stack:
+            node, position = stack[-1]
+            if position < offsets[node + 1]:
+                stack[-1] = (node, position + 1)
+                neighbor = targets[position]
+                if color[neighbor] == 1:
+                    return 'the given graph has a cycle'
+                if color[neighbor] == 0:
+                    color[neighbor] = 1
+                    stack.append((neighbor, offsets[neighbor]))
+            else:
+                stack.pop()
+                color[node] = 2
+                nodes_list.append(node)
+
+    nodes_list.reverse()
+    return nodes_list
+
+
+def _top_down_step(offsets, targets, distances, frontier):
+    # the pairs (node, parent) for the nodes reached from the frontier; a node may appear several times
+    discovered = []
+    for node in frontier:
+        for position in range(offsets[node], offsets[node + 1]):
+            if distances[targets[position]] == -1:
+                discovered.append((targets[position], node))
+    return discovered
+
+
+def _bottom_up_step(offsets, targets, distances, level, start, end):
+    # the pairs (node, parent) for the nodes from start to end that have an incoming edge from the frontier
+    discovered = []
+    for node in range(start, end):
+        if distances[node] == -1:
+            for position in range(offsets[node], offsets[node + 1]):
+                if distances[targets[position]] == level:
+                    discovered.append((node, targets[position]))
+                    break
+    return discovered
+
+
+# the graph and the reversed graph of the worker process, and its view of the distances in shared memory, set once
+# by _init_worker
+_worker_graphs = None
+_worker_block = None
+_worker_distances = None
+
+
+def _init_worker(offsets, targets, reversed_offsets, reversed_targets, distances_name, n):
+    global _worker_graphs, _worker_block, _worker_distances
+    _worker_graphs = (offsets, targets, reversed_offsets, reversed_targets)
+    _worker_block = shared_memory.SharedMemory(name=distances_name)
+    _worker_distances = memoryview(_worker_block.buf)[:8 * n].cast('q')
+
+
+def _worker_top_down_step(frontier):
+    offsets, targets, _, _ = _worker_graphs
+    return _top_down_step(offsets, targets, _worker_distances, frontier)
+
+
+def _worker_bottom_up_step(level, start, end):
+    _, _, reversed_offsets, reversed_targets = _worker_graphs
+    return _bottom_up_step(reversed_offsets, reversed_targets, _worker_distances, level, start, end)
+
+
+def csr_level_bfs(graph, source, reversed_graph=None, workers=1, alpha=14, beta=24):
+    """"This function returns the tuple (distances, previous_on_path) of integer arrays indexed by node id.
+    The bottom-up direction needs the incoming edges of every node, given by reversed_graph; for undirected
+    graphs, reversed_graph can be the graph itself. The search switches to bottom-up when the edges leaving
+    the frontier are more than 1/alpha of the edges leaving the nodes that were not reached yet, and back to
+    top-down when the frontier has fewer than 1/beta of all the nodes"""
+
+    n = len(graph)
+    if not 0 <= source < n:
+        raise ValueError('The given source node is not in the graph')
+    if reversed_graph is None:
+        reversed_graph = graph.reverse()
+
+    offsets, targets = graph.offsets, graph.targets
+    reversed_offsets, reversed_targets = reversed_graph.offsets, reversed_graph.targets
+
+    distances = array('l', [-1]) * n
+    previous_on_path = array('l', [-1]) * n
+
+    # with several workers, the distances are kept in shared memory, which the workers read directly; the tasks only
+    # consist of a slice of the frontier or a range of node ids, instead of a copy of the distances for every task
+    executor = None
+    block = None
+    shared_distances = None
+    if workers > 1:
+        block = shared_memory.SharedMemory(create=True, size=8 * n)
+
+    try:
+        if block is not None:
+            distances = shared_distances = memoryview(block.buf)[:8 * n].cast('q')
+            distances[:] = array('q', [-1]) * n
+            executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=tuple(array(values.typecode if isinstance(values, array) else values.format, values)
+                               for values in (offsets, targets, reversed_offsets, reversed_targets)) + (block.name, n))
+        distances[source] = 0
+        distances = _level_bfs(offsets, targets, reversed_offsets, reversed_targets, source, distances,
+                               previous_on_path, workers, executor, alpha, beta)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if block is not None:
+            # the view has to be released before the shared memory can be closed
+            if shared_distances is not None:
+                shared_distances.release()
+            try:
+                block.close()
+            finally:
+                block.unlink()
+
+    return distances, previous_on_path
+
+
+def _level_bfs(offsets, targets, reversed_offsets, reversed_targets, source, distances, previous_on_path, workers,
+               executor, alpha, beta):
+    # the loop of csr_level_bfs; it returns the distances as an array, copied out of the shared memory if necessary
+    n = len(previous_on_path)
+
+    frontier = [source]
+    level = 0
+    bottom_up = False
+    unexplored_edges = len(targets) - (offsets[source + 1] - offsets[source])
+    while frontier:
+        frontier_edges = sum(offsets[node + 1] - offsets[node] for node in frontier)
+        if not bottom_up and frontier_edges * alpha > unexplored_edges:
+            bottom_up = True
+        elif bottom_up and len(frontier) * beta < n:
+            bottom_up = False
+
+        if executor is None:
+            if bottom_up:
+                discovered = _bottom_up_step(reversed_offsets, reversed_targets, distances, level, 0, n)
+            else:
+                discovered = _top_down_step(offsets, targets, distances, frontier)
+        else:
+            # the workers read the distances of the previous levels from shared memory, and the main process only
+            # writes them once all the tasks of the level are done
+            if bottom_up:
+                chunk_size = -(-n // workers)
+                futures = [executor.submit(_worker_bottom_up_step, level, start, min(start + chunk_size, n))
+                           for start in range(0, n, chunk_size)]
+            else:
+                chunk_size = -(-len(frontier) // workers)
+                futures = [executor.submit(_worker_top_down_step, frontier[start: start + chunk_size])
+                           for start in range(0, len(frontier), chunk_size)]
+            discovered = [pair for future in futures for pair in future.result()]
+
+        level += 1
+        frontier = []
+        for node, parent in discovered:
+            if distances[node] == -1:
+                distances[node] = level
+                previous_on_path[node] = parent
+                frontier.append(node)
+                unexplored_edges -= offsets[node + 1] - offsets[node]
+
+    return distances if isinstance(distances, array) else array('l', distances)
+
+
+class TestCSRGraph(unittest.TestCase):
+
+    def setUp(self):
+        # same graph as in the tests of dijkstra.py
+        self.graph = Graph()
+        self.graph.add_edge('A', 'B', 5)
+        self.graph.add_edge('B', 'A', 5)
+        self.graph.add_edge('B', 'C', 3)
+        self.graph.add_edge('B', 'D', 6)
+        self.graph.add_edge('C', 'D', 2)
+        self.csr_graph = CSRGraph.from_graph(self.graph)
+
+    def labelled_parents(self, previous_on_path):
+        return {self.csr_graph.node_label(node): None if parent == -1 else self.csr_graph.node_label(parent)
+                for node, parent in enumerate(previous_on_path)}
+
+    def test_from_graph(self):
+        self.assertEqual(self.csr_graph.labels, ['A', 'B', 'C', 'D'])
+        self.assertEqual(list(self.csr_graph.offsets), [0, 1, 4, 5, 5])
+        self.assertEqual(list(self.csr_graph.targets), [1, 0, 2, 3, 3])
+        self.assertEqual(list(self.csr_graph.weights), [5, 5, 3, 6, 2])
+        self.assertEqual(self.csr_graph.nbytes(), 8 * (5 + 5 + 5))
+
+    def test_csr_bfs(self):
+        actual = self.labelled_parents(csr_bfs(self.csr_graph, self.csr_graph.node_id('A')))
+        expected = {'A': None, 'B': 'A', 'C': 'B', 'D': 'B'}
+        self.assertEqual(actual, expected)
+
+    def test_csr_dfs(self):
+        ids = self.csr_graph.ids
+        self.assertTrue(csr_dfs(self.csr_graph, ids['A'], ids['D']))
+        self.assertFalse(csr_dfs(self.csr_graph, ids['C'], ids['A']))
+
+    def test_csr_dijkstra(self):
+        distances, previous_on_path = csr_dijkstra(self.csr_graph, self.csr_graph.node_id('B'))
+        self.assertEqual(list(distances), [5, 0, 3, 5])
+        self.assertEqual(self.labelled_parents(previous_on_path), {'B': None, 'A': 'B', 'C': 'B', 'D': 'C'})
+
+    def test_csr_bellman_ford(self):
+        # same graph as in the tests of bellman_ford.py
+        graph = Graph()
+        graph.add_edge('A', 'B', -1)
+        graph.add_edge('B', 'C', 8)
+        graph.add_edge('A', 'C', 9)
+        graph.add_edge('B', 'D', 7)
+        graph.add_edge('C', 'D', -4)
+        self.csr_graph = CSRGraph.from_graph(graph)
+
+        distances, previous_on_path = csr_bellman_ford(self.csr_graph, self.csr_graph.node_id('A'))
+        self.assertEqual(list(distances), [0, -1, 7, 3])
+        self.assertEqual(self.labelled_parents(previous_on_path), {'A': None, 'B': 'A', 'C': 'B', 'D': 'C'})
+
+    def test_csr_prim(self):
+        # an undirected graph, i.e. every edge is added in both directions
+        graph = Graph()
+        for node_1, node_2, weight in [('A', 'B', 4), ('A', 'C', 1), ('B', 'C', 2), ('C', 'D', 5), ('B', 'D', 3)]:
+            graph.add_edge(node_1, node_2, weight)
+            graph.add_edge(node_2, node_1, weight)
+        self.csr_graph = CSRGraph.from_graph(graph)
+
+        actual = self.labelled_parents(csr_prim(self.csr_graph, self.csr_graph.node_id('A')))
+        expected = {'A': None, 'B': 'C', 'C': 'A', 'D': 'B'}
+        self.assertEqual(actual, expected)
+
+    def test_csr_top_sort(self):
+        graph = Graph()
+        graph.add_edge('A', 'B', 1)
+        graph.add_edge('B', 'C', 1)
+        graph.add_edge('A', 'C', 1)
+        self.csr_graph = CSRGraph.from_graph(graph)
+        self.assertEqual(csr_top_sort(self.csr_graph), [0, 1, 2])
+
+        # the graph from setUp has the cycle A -> B -> A
+        self.assertEqual(csr_top_sort(CSRGraph.from_graph(self.graph)), 'the given graph has a cycle')
+
+    def test_from_edge_list(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as edge_file:
+            edge_file.write('# a comment\n0 1 5\n1 0 5\n1 2 3\n\n1 3 6\n2 3 2\n')
+        try:
+            csr_graph = CSRGraph.from_edge_list(edge_file.name)
+        finally:
+            os.remove(edge_file.name)
+
+        self.assertEqual(csr_graph.labels, range(4))
+        self.assertEqual(list(csr_graph.offsets), list(self.csr_graph.offsets))
+        self.assertEqual(list(csr_graph.targets), list(self.csr_graph.targets))
+        self.assertEqual(list(csr_graph.weights), list(self.csr_graph.weights))
+
+    def test_from_edge_list_undirected(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as edge_file:
+            edge_file.write('b a\na c\nd\n')
+        try:
+            csr_graph = CSRGraph.from_edge_list(edge_file.name, node_type=str, undirected=True, chunk_size=4)
+        finally:
+            os.remove(edge_file.name)
+
+        self.assertEqual(csr_graph.labels, ['b', 'a', 'c', 'd'])
+        self.assertEqual(list(csr_graph.offsets), [0, 1, 3, 4, 4])
+        self.assertEqual(list(csr_graph.targets), [1, 0, 2, 1])
+
+    def test_save_and_load(self):
+        for labels in (self.csr_graph.labels, range(4)):
+            self.csr_graph.labels = labels
+            path = os.path.join(tempfile.mkdtemp(), 'graph.csr')
+            self.csr_graph.save(path)
+            loaded_graph = CSRGraph.load(path)
+            try:
+                self.assertEqual(list(loaded_graph.labels), list(labels))
+                self.assertEqual(list(loaded_graph.offsets), list(self.csr_graph.offsets))
+                self.assertEqual(list(loaded_graph.targets), list(self.csr_graph.targets))
+                self.assertEqual(list(loaded_graph.weights), list(self.csr_graph.weights))
+
+                # the algorithms run directly on the mapped file
+                distances, previous_on_path = csr_dijkstra(loaded_graph, 1)
+                self.assertEqual(list(distances), [5, 0, 3, 5])
+                self.assertEqual(list(csr_level_bfs(loaded_graph, 0, workers=2)[0]), [0, 1, 2, 2])
+            finally:
+                del loaded_graph
+                os.remove(path)
+
+    def test_save_and_load_labels(self):
+        # integer labels that are not 0, ..., V-1 come back as integers, and string labels as strings
+        for labels in ([10, -3, 2 ** 40, 7], ['1', '2', 'a b', '']):
+            self.csr_graph.labels = labels
+            path = os.path.join(tempfile.mkdtemp(), 'graph.csr')
+            self.csr_graph.save(path)
+            loaded_graph = CSRGraph.load(path)
+            try:
+                self.assertEqual(loaded_graph.labels, labels)
+                self.assertEqual(loaded_graph.node_id(labels[2]), 2)
+            finally:
+                del loaded_graph
+                os.remove(path)
+
+        # labels that cannot be encoded are rejected, without writing the file
+        for labels in (['a', 'b\nc', 'd', 'e'], [(0, 1), (1, 0), (2, 2), (3, 3)], [1, 'b', 2, 3], [2 ** 70, 1, 2, 3]):
+            self.csr_graph.labels = labels
+            path = os.path.join(tempfile.mkdtemp(), 'graph.csr')
+            with self.assertRaises(ValueError):
+                self.csr_graph.save(path)
+            self.assertFalse(os.path.exists(path))
+
+    def test_fill_graph(self):
+        graph = self.csr_graph.fill_graph(Graph())
+        self.assertEqual(graph.nodes, self.graph.nodes)
+        self.assertEqual(dict(graph.edges), dict(self.graph.edges))
+        self.assertEqual(graph.distances, self.graph.distances)
+
+    def test_reverse(self):
+        reversed_graph = self.csr_graph.reverse()
+        self.assertEqual(list(reversed_graph.offsets), [0, 1, 2, 3, 5])
+        self.assertEqual(list(reversed_graph.targets), [1, 0, 1, 1, 2])
+        self.assertEqual(list(reversed_graph.weights), [5, 5, 3, 6, 2])
+
+    def test_csr_level_bfs(self):
+        # a random graph, compared against csr_bfs in both directions and with and without worker processes
+        rng = random.Random(5)
+        graph = Graph()
+        for node in range(300):
+            graph.add_node(node)
+        for _ in range(1500):
+            graph.add_edge(rng.randrange(300), rng.randrange(300), 1)
+        self.csr_graph = CSRGraph.from_graph(graph)
+        reversed_graph = self.csr_graph.reverse()
+
+        expected_parents = csr_bfs(self.csr_graph, 0)
+        # alpha = 0 only goes top-down, while a large alpha with beta = 0 only goes bottom-up
+        for alpha, beta, workers in [(14, 24, 1), (0, 24, 1), (10 ** 9, 0, 1), (0, 24, 2), (10 ** 9, 0, 2)]:
+            distances, previous_on_path = csr_level_bfs(self.csr_graph, 0, reversed_graph, workers, alpha, beta)
+            for node in range(300):
+                self.assertEqual(distances[node] == -1, expected_parents[node] == -1 and node != 0)
+                if previous_on_path[node] != -1:
+                    # the parent is one level closer to the source, and there is an edge from it
+                    parent = previous_on_path[node]
+                    self.assertEqual(distances[parent] + 1, distances[node])
+                    self.assertIn(node, [self.csr_graph.targets[position]
+                                         for position in self.csr_graph.neighbors(parent)])
+            self.assertEqual(distances[0], 0)
+            # the distances are copied out of the shared memory of the workers
+            self.assertIsInstance(distances, array)
+
+
+# the worker processes may import this file, so the tests only run when it is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
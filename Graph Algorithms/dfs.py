@@ -11,7 +11,14 @@ The file contains the following functions
         to target in the given graph
     * iterative_dfs - a non-recursive implementation (using stack) of DFS, that takes as input a graph,
         a source node and a target node, and returns a boolean indicating whether there is a path from
-        source to target in the given graph"""
+        source to target in the given graph
+    * dfs_events - a non-recursive generator, that takes as input a graph, and optionally a list of source
+        nodes and a target node, and yields the events of the search as tuples (event, node, parent, time),
+        where event is either 'discover' or 'finish' and time is the discovery or finishing time of the node,
+        same as in Chapter 22.3 from 3rd edition of Cormen - Introduction to Algorithms. The search stops
+        right after the target is discovered
+    * dfs_tree - takes as input a graph and optionally a list of source nodes, and returns the dictionary
+        of parents in the depth first forest, together with the pre-order and post-order number of every node"""
 
 from collections import defaultdict
 import unittest
@@ -60,11 +67,15 @@ class Graph:
             self.edges[node_2] = [node_1]
 
 
-def recursive_dfs(graph, source, target, visited_nodes=set()):
+def recursive_dfs(graph, source, target, visited_nodes=None):
     if source not in graph.nodes:
         raise ValueError('source node is not in the graph')
     if source == target:  # the base case
         return True
+
+    # a new set for every top level call, so that calls do not share their visited nodes
+    if visited_nodes is None:
+        visited_nodes = set()
     visited_nodes.add(source)
 
     for neighbor in graph.edges[source]:
@@ -95,6 +106,59 @@ def iterative_dfs(graph, source, target):
     return False
 
 
+def dfs_events(graph, sources=None, target=None):
+    if sources is None:
+        sources = graph.nodes
+
+    visited_nodes = set()
+    time = 0
+
+    for source in sources:
+        if source not in graph.nodes:
+            raise ValueError('source node is not in the graph')
+        if source in visited_nodes:
+            continue
+
+        time += 1
+        visited_nodes.add(source)
+        yield 'discover', source, None, time
+        if source == target:
+            return
+
+        # the stack stores pairs (node, iterator over the neighbors of node that were not explored yet),
+        # so that a node is finished only after all its neighbors were explored
+        stack = [(source, iter(graph.edges[source]))]
+        while stack:
+            current_node, neighbors = stack[-1]
+            for neighbor in neighbors:
+                if neighbor not in visited_nodes:
+                    time += 1
+                    visited_nodes.add(neighbor)
+                    yield 'discover', neighbor, current_node, time
+                    if neighbor == target:
+                        return
+                    stack.append((neighbor, iter(graph.edges[neighbor])))
+                    break
+            else:
+                # all the neighbors of current_node were explored
+                stack.pop()
+                time += 1
+                yield 'finish', current_node, stack[-1][0] if stack else None, time
+
+
+def dfs_tree(graph, sources=None):
+    previous_on_path = {}
+    pre_order = {}
+    post_order = {}
+    for event, node, parent, time in dfs_events(graph, sources):
+        if event == 'discover':
+            previous_on_path[node] = parent
+            pre_order[node] = len(pre_order)
+        else:
+            post_order[node] = len(post_order)
+    return previous_on_path, pre_order, post_order
+
+
 class TestDFS(unittest.TestCase):
 
     def setUp(self):
@@ -126,5 +190,51 @@ class TestDFS(unittest.TestCase):
         expected = False
         self.assertEqual(actual, expected)
 
+    def test_recursive_repeated_calls(self):
+        # the visited nodes of the first call must not leak into the second one
+        self.assertTrue(recursive_dfs(self.graph, 'A', 'E'))
+        self.assertTrue(recursive_dfs(self.graph, 'C', 'B'))
+        self.assertFalse(recursive_dfs(self.graph, 'F', 'A'))
+        self.assertTrue(recursive_dfs(self.graph, 'G', 'F'))
+
+    def test_dfs_events(self):
+        graph = Graph()
+        graph.add_edge('A', 'B')
+        graph.add_edge('B', 'C')
+        graph.add_edge('A', 'D')
+        actual = list(dfs_events(graph, ['A']))
+        expected = [('discover', 'A', None, 1), ('discover', 'B', 'A', 2), ('discover', 'C', 'B', 3),
+                    ('finish', 'C', 'B', 4), ('finish', 'B', 'A', 5), ('discover', 'D', 'A', 6),
+                    ('finish', 'D', 'A', 7), ('finish', 'A', None, 8)]
+        self.assertEqual(actual, expected)
 
-unittest.main(verbosity=2)
+    def test_dfs_events_target(self):
+        actual = [node for event, node, parent, time in dfs_events(self.graph, ['A'], target='D')]
+        self.assertEqual(actual[-1], 'D')
+        self.assertNotIn('E', actual)
+
+    def test_dfs_tree(self):
+        previous_on_path, pre_order, post_order = dfs_tree(self.graph)
+        self.assertEqual(set(previous_on_path), self.graph.nodes)
+        self.assertEqual(sorted(pre_order.values()), list(range(8)))
+        self.assertEqual(sorted(post_order.values()), list(range(8)))
+
+        # every node is discovered after and finished before its parent
+        for node, parent in previous_on_path.items():
+            if parent is not None:
+                self.assertLess(pre_order[parent], pre_order[node])
+                self.assertLess(post_order[node], post_order[parent])
+
+    def test_deep_graph(self):
+        # a path much longer than the default recursion limit
+        graph = Graph()
+        for node in range(100000):
+            graph.add_edge(node, node + 1)
+        previous_on_path, pre_order, post_order = dfs_tree(graph, [0])
+        self.assertEqual(previous_on_path[100000], 99999)
+        self.assertEqual(post_order[100000], 0)
+
+
+# other files import iterative_dfs, so the tests only run when this file is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
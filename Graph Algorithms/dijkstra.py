@@ -1,16 +1,68 @@
 """ Python3 implementation of Dijkstra\'s algorithm.
 
-The below implementation of Dijkstra\'s algorithm runs in O(V^2+E) = O(V^2).
-This is NOT the fastest implementation: there exists an implementation that uses Fibonacci heaps 
+The default implementation of Dijkstra\'s algorithm uses a binary heap (the Python heapq module) and
+runs in O((V+E)*log(V)). Since heapq offers no decrease_key operation, a node whose distance improves
+is simply pushed again, and outdated entries are skipped when they are popped (lazy deletion).
+This is still NOT the fastest implementation: there exists an implementation that uses Fibonacci heaps
 and runs in O(V*log(V)+E)-see Chapter 24.3 in 3rd edition of Cormen - Introduction to Algorithms.
- 
+
+The file also keeps the array based implementation, which scans all the unvisited nodes for the
+minimum and runs in O(V^2+E) = O(V^2). This can still be preferable for very dense graphs.
+
 The below implementation of Dijkstra\'s algorithm assumes that the Graph is
-implemented as adjacency list stored as dictionary and that it contains a set of 
-distances (costs) stored as dictionary where the keys are node tuples (source_node, target_node)
-and the values are represented by the distances between the nodes. See the below 
-implementation of the class Graph."""
+implemented as adjacency list stored as dictionary, where the adjacency list of every node
+stores pairs (neighbor, distance), so that relaxing an edge does not have to build and hash
+a (source_node, target_node) tuple to find its distance, and parallel edges keep their own
+distances. The lists of neighbors and the dictionary of distances keyed by node tuples are
+still available as read only views computed from these pairs, for the code that looks up the
+neighbors or a single edge, so the graph stores every edge only once. See the below
+implementation of the class Graph.
+
+The file contains the following functions
+    * dijkstra - takes as input a graph and a source, and returns a dictionary of parents on the
+    shortest paths from source; it uses the heap based engine
+
+    * dijkstra_heap - the heap based engine; takes as input a graph and a source, and returns both the
+    dictionary of distances and the dictionary of parents on the shortest paths from source
+
+    * dijkstra_array - the O(V^2) implementation that finds the next node by scanning all the nodes
+    that are still to be visited; it returns the dictionary of parents, same as dijkstra
+
+    * shortest_path - takes as input a graph, a source and a target, and returns a tuple (path, cost);
+    unlike dijkstra, it stops as soon as the target is settled
+
+    * bidirectional_shortest_path - same as shortest_path, but runs two searches at the same time,
+    one forward from source and one backward from target, and stops when they meet
+
+    * a_star - takes as input a graph, a source, a target and a heuristic, and returns a tuple
+    (path, cost, number of settled nodes); the heuristic guides the search towards the target
+
+    * euclidean_heuristic, haversine_heuristic - take as input a dictionary of coordinates, in the format
+    node : (x, y), respectively node : (latitude, longitude), and return a heuristic that can be given to a_star
+
+    * reverse_edges - takes as input a graph and returns its weighted adjacency list with all edges reversed
+
+    * reconstruct_path - takes as input a dictionary of parents and a target node, and returns a list
+    representing the path from source to target, same as in bfs.py
+
+    * benchmark - takes as input a number of nodes and a number of edges, and returns the time in seconds
+    that dijkstra_heap takes on a random graph, next to the time of the same search when the graph
+    stores the neighbors and a dictionary of distances keyed by (source_node, target_node) tuples
+
+The file also contains the class ShortestPathCache, which keeps the results of dijkstra_heap for the most recently
+queried sources, for applications that ask for the shortest paths from the same few sources over and over. Every
+change of the graph through add_node or add_edge increases graph.version, and the cache drops all its results as
+soon as it notices that the version changed."""
 
 from collections import defaultdict
+from collections import OrderedDict
+from collections.abc import Mapping
+import heapq
+import itertools
+import math
+import random
+import sys
+import time
 import unittest
 
 
@@ -24,11 +76,19 @@ class Graph:
                 nodes : set
                     a set consisting of all the nodes in the graph
 
-                edges : dict
-                    a dictionary storing all edges, in the format node : [list of neighboring nodes]
+                edges : Neighbors
+                    a read only view of all edges, in the format node : [list of neighboring nodes]
 
-                distances: dict
-                    a dictionary storing the weights of each edge, in the format (node_1, node_2) : weight of edge
+                weighted_edges : dict
+                    a dictionary storing all edges with their weights, in the format
+                    node : [list of pairs (neighboring node, weight of edge)]
+
+                distances: EdgeWeights
+                    a read only view of the weights of each edge, in the format (node_1, node_2) : weight of edge;
+                    with parallel edges, the weight is the smallest one
+
+                version : int
+                    the number of changes made to the graph so far, used to invalidate cached results
 
             Methods
             ----------
@@ -47,32 +107,130 @@ class Graph:
 
     def __init__(self):
         self.nodes = set()
-        self.edges = defaultdict(list)
-        self.distances = {}
+        self.weighted_edges = defaultdict(list)
+        self.edges = Neighbors(self.weighted_edges)
+        self.distances = EdgeWeights(self.weighted_edges)
+        self.version = 0
 
     def add_node(self, node):
-        self.nodes.add(node)
+        if node not in self.nodes:
+            self.nodes.add(node)
+            self.version += 1
 
     def add_edge(self, source_node, target_node, distance):
         # first add the two nodes to the graph.nodes, in case we forgot to do this before
         self.add_node(source_node)
         self.add_node(target_node)
 
-        # add the edge in the directed graph
-        if source_node in self.edges:
-            self.edges[source_node].append(target_node)
-        else:
-            self.edges[source_node] = [target_node]
+        # add the edge in the directed graph, with the distance between the two nodes next to the neighbor
+        self.weighted_edges[source_node].append((target_node, distance))
+        self.version += 1
+
+
+class Neighbors(Mapping):
+    """
+    A read only dictionary of the neighbors of every node of a graph, in the format node : [list of neighboring
+    nodes], computed from the weighted adjacency lists. Same as the defaultdict it replaces, a node without
+    outgoing edges has an empty list of neighbors
+    """
+    def __init__(self, weighted_edges):
+        self.weighted_edges = weighted_edges
+
+    def __getitem__(self, node):
+        return [neighbor for neighbor, _ in self.weighted_edges.get(node, ())]
+
+    def __contains__(self, node):
+        return node in self.weighted_edges
+
+    def __iter__(self):
+        return iter(self.weighted_edges)
+
+    def __len__(self):
+        return len(self.weighted_edges)
+
+
+class EdgeWeights(Mapping):
+    """
+    A read only dictionary of the edge weights of a graph, in the format (node_1, node_2) : weight of edge,
+    computed from the weighted adjacency lists. Looking up an edge takes O(degree of node_1) time, so the
+    algorithms below iterate over graph.weighted_edges instead, and this view is only kept for the code that
+    looks up single edges
+    """
+    def __init__(self, weighted_edges):
+        self.weighted_edges = weighted_edges
+
+    def __getitem__(self, edge):
+        node_1, node_2 = edge
+        weights = [weight for neighbor, weight in self.weighted_edges.get(node_1, ()) if neighbor == node_2]
+        if not weights:
+            raise KeyError(edge)
+        return min(weights)
 
-        # add the distance between the two nodes
-        self.distances[(source_node, target_node)] = distance
+    def __iter__(self):
+        seen = set()
+        for node, neighbors in self.weighted_edges.items():
+            for neighbor, _ in neighbors:
+                if (node, neighbor) not in seen:
+                    seen.add((node, neighbor))
+                    yield node, neighbor
+
+    def __len__(self):
+        return sum(1 for _ in self)
 
 
 def dijkstra(graph, source):
     """"This function returns a dictionary consisting of shortest paths in the form
     node: parent on path, with the source node having source: None.
-    It is designed so that it can be easily modified to also return
-    the distances or to explicitly reconstruct the path for one specific node"""
+    Use dijkstra_heap directly to also get the distances"""
+
+    distances, previous_on_path = dijkstra_heap(graph, source)
+    return previous_on_path
+
+
+def dijkstra_heap(graph, source):
+    """"This function returns a tuple (distances, previous_on_path), where distances is a dictionary
+    in the form node: length of the shortest path from source, and previous_on_path is a dictionary
+    in the form node: parent on path, with the source node having source: None.
+    Nodes that cannot be reached from source have distance infinity and parent None"""
+
+    # first assert that the source node is indeed in our graph
+    assert source in graph.nodes
+
+    # create a dictionary of distances, initialized to infinity and then update for source
+    distances = {node: float('inf') for node in graph.nodes}
+    distances[source] = 0
+
+    # create a dictionary that stores the parent of each node on the path from source
+    previous_on_path = {node: None for node in graph.nodes}
+
+    # the heap stores triples (distance, counter, node); the counter breaks ties between equal
+    # distances, so that the nodes themselves never have to be compared
+    counter = itertools.count()
+    heap = [(0, next(counter), source)]
+    visited = set()
+
+    while heap:
+        min_distance, _, min_node = heapq.heappop(heap)
+
+        # skip the outdated entries, i.e. the nodes that were already settled with a smaller distance
+        if min_node in visited:
+            continue
+        visited.add(min_node)
+
+        for neighbor, weight in graph.weighted_edges[min_node]:
+            new_distance = min_distance + weight
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                previous_on_path[neighbor] = min_node
+                heapq.heappush(heap, (new_distance, next(counter), neighbor))
+
+    return distances, previous_on_path
+
+
+def dijkstra_array(graph, source):
+    """"This function returns a dictionary consisting of shortest paths in the form
+    node: parent on path, with the source node having source: None.
+    The next node to visit is found by a linear scan, so that the function runs in O(V^2)"""
 
     # first assert that the source node is indeed in our graph
     assert source in graph.nodes
@@ -101,13 +259,330 @@ def dijkstra(graph, source):
 
         nodes_to_visit.remove(min_node)
 
-        for neighbor in graph.edges[min_node]:
-            if distances[neighbor] > distances[min_node] + graph.distances[(min_node, neighbor)]:
-                distances[neighbor] = distances[min_node] + graph.distances[(min_node, neighbor)]
+        for neighbor, weight in graph.weighted_edges[min_node]:
+            if distances[neighbor] > distances[min_node] + weight:
+                distances[neighbor] = distances[min_node] + weight
                 previous_on_path[neighbor] = min_node
     return previous_on_path
 
 
+def shortest_path(graph, source, target):
+    """"This function returns a tuple (path, cost), where path is the list of nodes on a shortest path
+    from source to target and cost is its length. If target cannot be reached, it returns (None, infinity)"""
+
+    assert source in graph.nodes
+    assert target in graph.nodes
+
+    distances = {source: 0}
+    previous_on_path = {source: None}
+    counter = itertools.count()
+    heap = [(0, next(counter), source)]
+    visited = set()
+
+    while heap:
+        min_distance, _, min_node = heapq.heappop(heap)
+        if min_node in visited:
+            continue
+        visited.add(min_node)
+
+        # the distance of a node never changes after it is popped, so we can stop here
+        if min_node == target:
+            return reconstruct_path(previous_on_path, target), min_distance
+
+        for neighbor, weight in graph.weighted_edges[min_node]:
+            new_distance = min_distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                previous_on_path[neighbor] = min_node
+                heapq.heappush(heap, (new_distance, next(counter), neighbor))
+
+    return None, float('inf')
+
+
+def bidirectional_shortest_path(graph, source, target, reversed_edges=None):
+    """"This function returns the same tuple (path, cost) as shortest_path, by alternating a forward search
+    from source over graph.weighted_edges and a backward search from target over the reversed edges. The reversed
+    adjacency list can be computed once with reverse_edges and passed as reversed_edges for repeated queries"""
+
+    assert source in graph.nodes
+    assert target in graph.nodes
+
+    if source == target:
+        return [source], 0
+
+    if reversed_edges is None:
+        reversed_edges = reverse_edges(graph)
+
+    # index 0 is the forward search and index 1 the backward search
+    adjacency = [graph.weighted_edges, reversed_edges]
+    distances = [{source: 0}, {target: 0}]
+    previous_on_path = [{source: None}, {target: None}]
+    visited = [set(), set()]
+    counter = itertools.count()
+    heaps = [[(0, next(counter), source)], [(0, next(counter), target)]]
+
+    # best_cost is the length of the shortest path found so far, passing through meeting_node
+    best_cost = float('inf')
+    meeting_node = None
+
+    while heaps[0] and heaps[1]:
+        # no path through unsettled nodes can be shorter than the sum of the two smallest keys
+        if heaps[0][0][0] + heaps[1][0][0] >= best_cost:
+            break
+
+        # expand the search with the smaller heap
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        min_distance, _, min_node = heapq.heappop(heaps[side])
+        if min_node in visited[side]:
+            continue
+        visited[side].add(min_node)
+
+        for neighbor, weight in adjacency[side][min_node]:
+            new_distance = min_distance + weight
+            if new_distance < distances[side].get(neighbor, float('inf')):
+                distances[side][neighbor] = new_distance
+                previous_on_path[side][neighbor] = min_node
+                heapq.heappush(heaps[side], (new_distance, next(counter), neighbor))
+
+            # check if the edge connects the two searches into a shorter path
+            if neighbor in distances[1 - side]:
+                cost = distances[side][neighbor] + distances[1 - side][neighbor]
+                if cost < best_cost:
+                    best_cost = cost
+                    meeting_node = neighbor
+
+    if meeting_node is None:
+        return None, float('inf')
+
+    # the path from source to the meeting node, followed by the path from the meeting node to target
+    path = reconstruct_path(previous_on_path[0], meeting_node)
+    current = previous_on_path[1][meeting_node]
+    while current is not None:
+        path.append(current)
+        current = previous_on_path[1][current]
+    return path, best_cost
+
+
+def a_star(graph, source, target, heuristic):
+    """"This function returns a tuple (path, cost, settled), where path and cost are the same as in shortest_path
+    and settled is the number of nodes that were settled during the search.
+
+    The heuristic is a function taking as input a node and the target, and returning a lower bound on the
+    distance between them. The heuristic must be consistent, i.e. heuristic(u, target) <= weight of (u, v) +
+    heuristic(v, target) for every edge (u, v); this holds for example for the straight line distance, when
+    the edge weights are at least the straight line distance between their nodes. With a heuristic that
+    is always 0, the function is the same as shortest_path"""
+
+    assert source in graph.nodes
+    assert target in graph.nodes
+
+    distances = {source: 0}
+    previous_on_path = {source: None}
+    counter = itertools.count()
+
+    # the heap is ordered by distance from source + estimated distance to target
+    heap = [(heuristic(source, target), next(counter), source)]
+    visited = set()
+
+    while heap:
+        _, _, min_node = heapq.heappop(heap)
+        if min_node in visited:
+            continue
+        visited.add(min_node)
+
+        if min_node == target:
+            return reconstruct_path(previous_on_path, target), distances[target], len(visited)
+
+        for neighbor, weight in graph.weighted_edges[min_node]:
+            new_distance = distances[min_node] + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                previous_on_path[neighbor] = min_node
+                heapq.heappush(heap, (new_distance + heuristic(neighbor, target), next(counter), neighbor))
+
+    return None, float('inf'), len(visited)
+
+
+def euclidean_heuristic(coordinates):
+    def heuristic(node, target):
+        (x_1, y_1), (x_2, y_2) = coordinates[node], coordinates[target]
+        return math.hypot(x_1 - x_2, y_1 - y_2)
+    return heuristic
+
+
+def haversine_heuristic(coordinates, radius=6371.0):
+    # the great circle distance on a sphere with the given radius (by default the Earth's radius in km)
+    def heuristic(node, target):
+        latitude_1, longitude_1 = map(math.radians, coordinates[node])
+        latitude_2, longitude_2 = map(math.radians, coordinates[target])
+        a = math.sin((latitude_2 - latitude_1) / 2) ** 2 + \
+            math.cos(latitude_1) * math.cos(latitude_2) * math.sin((longitude_2 - longitude_1) / 2) ** 2
+        return 2 * radius * math.asin(min(1.0, math.sqrt(a)))
+    return heuristic
+
+
+def reverse_edges(graph):
+    reversed_edges = defaultdict(list)
+    for node in graph.nodes:
+        for neighbor, weight in graph.weighted_edges[node]:
+            reversed_edges[neighbor].append((node, weight))
+    return reversed_edges
+
+
+def reconstruct_path(path_dictionary, target):
+    # store nodes in backwards order first, starting from target
+    reversed_path = []
+    current = target
+    while current is not None:
+        reversed_path.append(current)
+        current = path_dictionary[current]
+    reversed_path.reverse()
+    return reversed_path
+
+
+def benchmark(n=50000, m=500000, seed=0):
+    rng = random.Random(seed)
+    graph = Graph()
+    for node in range(n):
+        graph.add_node(node)
+    for _ in range(m):
+        graph.add_edge(rng.randrange(n), rng.randrange(n), rng.random())
+    timings = {}
+
+    start = time.perf_counter()
+    dijkstra_heap(graph, 0)
+    timings['weighted_edges'] = time.perf_counter() - start
+
+    # the same search when the graph stores the neighbors and a dictionary of distances keyed by node tuples
+    edges = {node: graph.edges[node] for node in graph.nodes}
+    distances = dict(graph.distances.items())
+    start = time.perf_counter()
+    tentative = {node: float('inf') for node in graph.nodes}
+    tentative[0] = 0
+    previous_on_path = {node: None for node in graph.nodes}
+    counter = itertools.count()
+    heap = [(0, next(counter), 0)]
+    visited = set()
+    while heap:
+        min_distance, _, min_node = heapq.heappop(heap)
+        if min_node in visited:
+            continue
+        visited.add(min_node)
+        for neighbor in edges[min_node]:
+            new_distance = min_distance + distances[(min_node, neighbor)]
+            if new_distance < tentative[neighbor]:
+                tentative[neighbor] = new_distance
+                previous_on_path[neighbor] = min_node
+                heapq.heappush(heap, (new_distance, next(counter), neighbor))
+    timings['distances'] = time.perf_counter() - start
+
+    return timings
+
+
+class ShortestPathCache:
+    """
+    A cache of shortest path trees, keeping the results for the least recently used sources up to a given number of
+    entries and/or a given estimated number of bytes
+
+    Attributes
+    ----------
+
+        graph : Graph
+            the graph whose shortest paths are cached
+
+        algorithm : function
+            the function computing the shortest paths, taking as input a graph and a source and returning a tuple
+            (distances, previous_on_path)
+
+        max_entries : int
+            the maximum number of cached sources, or None for no limit
+
+        max_bytes : int
+            the maximum estimated size of the cached results in bytes, or None for no limit
+
+        entries : OrderedDict
+            the cached results, in the format source : (distances, previous_on_path, size in bytes), from the least
+            to the most recently used
+
+        nbytes : int
+            the estimated size of the cached results in bytes
+
+        version : int
+            the version of the graph the cached results were computed for
+
+        hits, misses, evictions, invalidations : int
+            the number of queries answered from the cache, the number of queries that had to run the algorithm, the
+            number of results dropped to respect the limits, and the number of times the graph changed
+
+    Methods
+    ----------
+
+        get(source)
+            returns the tuple (distances, previous_on_path) for source, from the cache if possible; the two
+            dictionaries are shared with the cache, and must not be modified
+
+        clear
+            drops all the cached results
+
+        stats
+            returns a dictionary with the statistics of the cache
+    """
+    def __init__(self, graph, algorithm=None, max_entries=128, max_bytes=None):
+        self.graph = graph
+        self.algorithm = dijkstra_heap if algorithm is None else algorithm
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.version = graph.version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, source):
+        # the graph changed since the results were computed, so none of them can be trusted
+        if self.version != self.graph.version:
+            if self.entries:
+                self.invalidations += 1
+            self.clear()
+            self.version = self.graph.version
+
+        entry = self.entries.get(source)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(source)
+            return entry[0], entry[1]
+
+        self.misses += 1
+        distances, previous_on_path = self.algorithm(self.graph, source)
+        # the dictionaries themselves, as the nodes and the numbers are shared with the graph
+        size = sys.getsizeof(distances) + sys.getsizeof(previous_on_path)
+        self.entries[source] = (distances, previous_on_path, size)
+        self.nbytes += size
+
+        # evict the least recently used results, but always keep the one just computed
+        while len(self.entries) > 1 and \
+                ((self.max_entries is not None and len(self.entries) > self.max_entries) or
+                 (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            _, (_, _, evicted_size) = self.entries.popitem(last=False)
+            self.nbytes -= evicted_size
+            self.evictions += 1
+
+        return distances, previous_on_path
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.nbytes, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'invalidations': self.invalidations}
+
+
 class TestDijkstra(unittest.TestCase):
 
     def setUp(self):
@@ -123,5 +598,151 @@ class TestDijkstra(unittest.TestCase):
         expected = {'B': None, 'A': 'B', 'C': 'B', 'D': 'C'}
         self.assertEqual(actual, expected)
 
+    def test_dijkstra_heap(self):
+        actual = dijkstra_heap(self.graph, 'B')
+        expected = ({'A': 5, 'B': 0, 'C': 3, 'D': 5}, {'B': None, 'A': 'B', 'C': 'B', 'D': 'C'})
+        self.assertEqual(actual, expected)
+
+    def test_dijkstra_heap_unreachable(self):
+        self.graph.add_node('E')
+        distances, previous_on_path = dijkstra_heap(self.graph, 'C')
+        self.assertEqual(distances, {'A': float('inf'), 'B': float('inf'), 'C': 0, 'D': 2, 'E': float('inf')})
+        self.assertEqual(previous_on_path, {'A': None, 'B': None, 'C': None, 'D': 'C', 'E': None})
+
+    def test_dijkstra_array(self):
+        actual = dijkstra_array(self.graph, 'B')
+        expected = {'B': None, 'A': 'B', 'C': 'B', 'D': 'C'}
+        self.assertEqual(actual, expected)
 
-unittest.main(verbosity=2)
+    def test_shortest_path(self):
+        self.assertEqual(shortest_path(self.graph, 'A', 'D'), (['A', 'B', 'C', 'D'], 10))
+        self.assertEqual(shortest_path(self.graph, 'B', 'B'), (['B'], 0))
+        self.assertEqual(shortest_path(self.graph, 'D', 'A'), (None, float('inf')))
+
+    def test_bidirectional_shortest_path(self):
+        self.assertEqual(bidirectional_shortest_path(self.graph, 'A', 'D'), (['A', 'B', 'C', 'D'], 10))
+        self.assertEqual(bidirectional_shortest_path(self.graph, 'C', 'C'), (['C'], 0))
+        self.assertEqual(bidirectional_shortest_path(self.graph, 'D', 'A'), (None, float('inf')))
+
+    def test_a_star(self):
+        # a 10x10 grid, where each edge weight is the euclidean distance between its nodes
+        graph = Graph()
+        coordinates = {}
+        for i in range(10):
+            for j in range(10):
+                coordinates[(i, j)] = (i, j)
+                for neighbor in [(i + 1, j), (i, j + 1)]:
+                    if neighbor[0] < 10 and neighbor[1] < 10:
+                        graph.add_edge((i, j), neighbor, 1)
+                        graph.add_edge(neighbor, (i, j), 1)
+
+        path, cost, settled = a_star(graph, (0, 0), (9, 0), euclidean_heuristic(coordinates))
+        self.assertEqual(path, [(i, 0) for i in range(10)])
+        self.assertEqual(cost, 9)
+
+        # without a heuristic, A* settles all the nodes that are closer to source than the target
+        _, dijkstra_cost, dijkstra_settled = a_star(graph, (0, 0), (9, 0), lambda node, target: 0)
+        self.assertEqual(dijkstra_cost, 9)
+        self.assertLess(settled, dijkstra_settled)
+
+    def test_a_star_unreachable(self):
+        self.assertEqual(a_star(self.graph, 'D', 'A', lambda node, target: 0), (None, float('inf'), 1))
+
+    def test_haversine_heuristic(self):
+        heuristic = haversine_heuristic({'London': (51.5074, -0.1278), 'Paris': (48.8566, 2.3522)})
+        self.assertAlmostEqual(heuristic('London', 'Paris'), 343.5, delta=1)
+        self.assertEqual(heuristic('Paris', 'Paris'), 0)
+
+    def test_parallel_edges(self):
+        # the second edge from C to D is shorter, and must not be hidden by the first one
+        self.graph.add_edge('C', 'D', 1)
+        self.graph.add_edge('B', 'D', 9)
+        self.assertEqual(self.graph.weighted_edges['C'], [('D', 2), ('D', 1)])
+        self.assertEqual(self.graph.distances[('C', 'D')], 1)
+        self.assertEqual(dijkstra_heap(self.graph, 'B')[0]['D'], 4)
+        self.assertEqual(dijkstra_array(self.graph, 'B')['D'], 'C')
+        self.assertEqual(shortest_path(self.graph, 'A', 'D'), (['A', 'B', 'C', 'D'], 9))
+        self.assertEqual(bidirectional_shortest_path(self.graph, 'A', 'D'), (['A', 'B', 'C', 'D'], 9))
+
+    def test_edge_weights(self):
+        self.assertEqual(self.graph.distances[('B', 'C')], 3)
+        self.assertEqual(len(self.graph.distances), 5)
+        self.assertEqual(dict(self.graph.distances),
+                         {('A', 'B'): 5, ('B', 'A'): 5, ('B', 'C'): 3, ('B', 'D'): 6, ('C', 'D'): 2})
+        self.assertNotIn(('D', 'C'), self.graph.distances)
+        with self.assertRaises(KeyError):
+            self.graph.distances[('A', 'E')]
+
+    def test_neighbors(self):
+        self.assertEqual(self.graph.edges['B'], ['A', 'C', 'D'])
+        self.assertEqual(self.graph.edges['D'], [])
+        self.assertIn('B', self.graph.edges)
+        self.assertNotIn('E', self.graph.edges)
+        self.assertEqual(set(self.graph.edges), {'A', 'B', 'C'})
+
+    def test_benchmark(self):
+        timings = benchmark(n=100, m=1000)
+        self.assertEqual(set(timings), {'weighted_edges', 'distances'})
+
+    def test_shortest_path_cache(self):
+        cache = ShortestPathCache(self.graph, max_entries=2)
+        self.assertEqual(cache.get('B'), dijkstra_heap(self.graph, 'B'))
+        self.assertIs(cache.get('B')[0], cache.get('B')[0])
+        cache.get('A')
+        cache.get('C')
+        # B was the least recently used source when C was added
+        self.assertEqual(list(cache.entries), ['A', 'C'])
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        # adding an edge changes the graph version and invalidates the cached results
+        self.graph.add_edge('A', 'D', 1)
+        self.assertEqual(cache.get('A')[0]['D'], 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+        # adding a node that is already in the graph changes nothing
+        self.graph.add_node('A')
+        cache.get('A')
+        self.assertEqual(cache.stats()['hits'], 3)
+
+    def test_shortest_path_cache_bytes(self):
+        size = sys.getsizeof(dijkstra_heap(self.graph, 'A')[0]) * 2
+        cache = ShortestPathCache(self.graph, max_entries=None, max_bytes=2 * size)
+        for source in ['A', 'B', 'C', 'D']:
+            cache.get(source)
+        self.assertEqual(list(cache.entries), ['C', 'D'])
+        self.assertEqual(cache.stats()['bytes'], 2 * size)
+        self.assertEqual(cache.stats()['evictions'], 2)
+
+        # a single result larger than the limit is still kept, until the next one arrives
+        cache.max_bytes = 1
+        cache.get('A')
+        self.assertEqual(list(cache.entries), ['A'])
+
+    def test_bidirectional_matches_dijkstra(self):
+        # a grid with random weights, where every node pair is compared against dijkstra_heap
+        rng = random.Random(7)
+        graph = Graph()
+        for i in range(5):
+            for j in range(5):
+                if i < 4:
+                    graph.add_edge((i, j), (i + 1, j), rng.randint(1, 9))
+                    graph.add_edge((i + 1, j), (i, j), rng.randint(1, 9))
+                if j < 4:
+                    graph.add_edge((i, j), (i, j + 1), rng.randint(1, 9))
+        reversed_edges = reverse_edges(graph)
+        for source in graph.nodes:
+            distances, _ = dijkstra_heap(graph, source)
+            for target in graph.nodes:
+                path, cost = bidirectional_shortest_path(graph, source, target, reversed_edges)
+                self.assertEqual(cost, distances[target])
+                self.assertEqual(shortest_path(graph, source, target)[1], distances[target])
+                if path is not None:
+                    self.assertEqual(sum(graph.distances[edge] for edge in zip(path, path[1:])), cost)
+
+
+# other files import the shortest path cache, so the tests only run when this file is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
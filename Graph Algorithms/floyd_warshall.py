@@ -0,0 +1,230 @@
+""" Python3 implementation of the Floyd-Warshall algorithm (shortest paths between all pairs of nodes).
+
+The Floyd-Warshall algorithm works on a matrix of distances, where distance[i][j] is the weight of the edge from
+nodes[i] to nodes[j] (infinity if there is no such edge). After step k of the algorithm, distance[i][j] is the length
+of the shortest path from nodes[i] to nodes[j] that only goes through the nodes nodes[0], ..., nodes[k] in between:
+    distance[i][j] = min(distance[i][j], distance[i][k] + distance[k][j])
+For more details, see Chapter 25.2 in 3rd edition of Cormen - Introduction to Algorithms.
+
+The algorithm runs in O(V^3) time, the same as running Dijkstra's algorithm from every node of a dense graph, but
+it also allows negative weights. In the below implementation, step k updates the matrix one row at a time: row i
+only changes if distance[i][k] is finite, and then distance[k] shifted by distance[i][k] is compared with the row by
+map and itertools.compress, which find the improved columns at C speed; only those columns are updated, together
+with their predecessors. The rows are stored with the Python array module, either as double precision ('d', the
+default) or as single precision floats ('f'), which halves the memory of the matrix.
+
+The graph has a negative cycle if and only if some node has a negative distance to itself at the end of the
+algorithm, i.e. if the diagonal of the matrix contains a negative value.
+
+The file contains the following classes:
+    Graph - implementation of a weighted directed graph using adjacency list, same as in dijkstra.py
+
+    TestFloydWarshall - test cases for the implementation of the Floyd-Warshall algorithm
+
+The file contains the following functions
+    * adjacency_matrix - takes as input any of the weighted Graph classes from this folder, and returns the list
+    of nodes together with the matrix of edge weights
+
+    * floyd_warshall - takes as input a graph, and returns the list of nodes, the matrix of distances between all
+    pairs of nodes and the matrix of predecessors, where predecessor[i][j] is the index of the node before nodes[j]
+    on a shortest path from nodes[i] (-1 if there is no such path)
+
+    * reconstruct_path - takes as input the list of nodes, the matrix of predecessors, a source and a target, and
+    returns a list representing the path from source to target
+"""
+
+from array import array
+from collections import defaultdict
+from itertools import compress
+from itertools import repeat
+from operator import add
+from operator import lt
+import unittest
+
+
+class Graph:
+    """
+            An implementation of a directed graph using adjacency list representation
+
+            Attributes
+            ----------
+
+                nodes : set
+                    a set consisting of all the nodes in the graph
+
+                edges : dict
+                    a dictionary storing all edges, in the format node : [list of neighboring nodes]
+
+                distances: dict
+                    a dictionary storing the weights of each edge, in the format (node_1, node_2) : weight of edge
+
+            Methods
+            ----------
+
+                add_node(node)
+                    adds node to graph
+
+                add_edge (node_1, node_2, weight)
+                    adds node_1 and node_2 to the graph, together with the corresponding edges and weight
+                    adds node_2 to the neighbors of node_1
+            """
+
+    def __init__(self):
+        self.nodes = set()
+        self.edges = defaultdict(list)
+        self.distances = {}
+
+    def add_node(self, node):
+        self.nodes.add(node)
+
+    def add_edge(self, source_node, target_node, distance):
+        # first add the two nodes to the graph.nodes, in case we forgot to do this before
+        self.add_node(source_node)
+        self.add_node(target_node)
+
+        # add the edge in the directed graph
+        self.edges[source_node].append(target_node)
+
+        # add the distance between the two nodes
+        self.distances[(source_node, target_node)] = distance
+
+
+def adjacency_matrix(graph, typecode='d'):
+    # sort the nodes when possible, so that the order of the rows does not depend on the set order
+    try:
+        nodes = sorted(graph.nodes)
+    except TypeError:
+        nodes = list(graph.nodes)
+    ids = {node: idx for idx, node in enumerate(nodes)}
+    n = len(nodes)
+
+    # the weighted graphs store the weights either next to the neighbors, as weighted_edges (dijkstra.py,
+    # bellman_ford.py), or in a dictionary keyed by node tuples, as distances or as weights
+    weighted_edges = getattr(graph, 'weighted_edges', None)
+    if weighted_edges is None:
+        edge_weights = getattr(graph, 'distances', None)
+        if edge_weights is None:
+            edge_weights = graph.weights
+        weighted_edges = {node: [(neighbor, edge_weights[(node, neighbor)]) for neighbor in graph.edges[node]]
+                          for node in nodes}
+
+    matrix = []
+    for i, node in enumerate(nodes):
+        row = array(typecode, [float('inf')]) * n
+        row[i] = 0
+        for neighbor, weight in weighted_edges.get(node, ()):
+            # keep the lightest edge if the same pair of nodes appears several times
+            if weight < row[ids[neighbor]]:
+                row[ids[neighbor]] = weight
+        matrix.append(row)
+    return nodes, matrix
+
+
+def floyd_warshall(graph, typecode='d'):
+    nodes, distance = adjacency_matrix(graph, typecode)
+    n = len(nodes)
+    infinity = float('inf')
+
+    # predecessor[i][j] is the node before nodes[j] on the shortest path from nodes[i] found so far
+    predecessor = []
+    for i in range(n):
+        row = array('l', [i]) * n
+        for j in range(n):
+            if i == j or distance[i][j] == infinity:
+                row[j] = -1
+        predecessor.append(row)
+
+    columns = range(n)
+    for k in range(n):
+        distance_k = distance[k]
+        predecessor_k = predecessor[k]
+        for i in range(n):
+            distance_ik = distance[i][k]
+            # row i cannot improve through node k if node k cannot be reached from node i
+            if distance_ik == infinity:
+                continue
+            distance_i = distance[i]
+
+            # the candidates, and the columns where they improve row i, are computed at C speed by map and
+            # compress; only the improved entries are then updated one by one
+            candidates = list(map(add, repeat(distance_ik, n), distance_k))
+            improved = list(compress(columns, map(lt, candidates, distance_i)))
+            if improved:
+                predecessor_i = predecessor[i]
+                for j in improved:
+                    distance_i[j] = candidates[j]
+                    predecessor_i[j] = predecessor_k[j]
+
+    # check for negative cycles on the diagonal
+    for i in range(n):
+        assert distance[i][i] >= 0, "Negative cycle!"
+
+    return nodes, distance, predecessor
+
+
+def reconstruct_path(nodes, predecessor, source, target):
+    ids = {node: idx for idx, node in enumerate(nodes)}
+    i, j = ids[source], ids[target]
+    if i != j and predecessor[i][j] == -1:
+        return None
+
+    # store nodes in backwards order first, starting from target
+    reversed_path = [target]
+    while j != i:
+        j = predecessor[i][j]
+        reversed_path.append(nodes[j])
+    reversed_path.reverse()
+    return reversed_path
+
+
+class TestFloydWarshall(unittest.TestCase):
+    """Test case taken from Cormen, Chapter 25.2, Figure 25.4"""
+
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.add_edge(1, 2, 3)
+        self.graph.add_edge(1, 3, 8)
+        self.graph.add_edge(1, 5, -4)
+        self.graph.add_edge(2, 4, 1)
+        self.graph.add_edge(2, 5, 7)
+        self.graph.add_edge(3, 2, 4)
+        self.graph.add_edge(4, 1, 2)
+        self.graph.add_edge(4, 3, -5)
+        self.graph.add_edge(5, 4, 6)
+        self.expected = [[0, 1, -3, 2, -4],
+                         [3, 0, -4, 1, -1],
+                         [7, 4, 0, 5, 3],
+                         [2, -1, -5, 0, -2],
+                         [8, 5, 1, 6, 0]]
+
+    def test_floyd_warshall(self):
+        nodes, distance, predecessor = floyd_warshall(self.graph)
+        self.assertEqual(nodes, [1, 2, 3, 4, 5])
+        self.assertEqual([list(row) for row in distance], self.expected)
+
+    def test_single_precision(self):
+        nodes, distance, predecessor = floyd_warshall(self.graph, typecode='f')
+        self.assertEqual(distance[0].typecode, 'f')
+        self.assertEqual([list(row) for row in distance], self.expected)
+
+    def test_reconstruct_path(self):
+        nodes, distance, predecessor = floyd_warshall(self.graph)
+        self.assertEqual(reconstruct_path(nodes, predecessor, 1, 2), [1, 5, 4, 3, 2])
+        self.assertEqual(reconstruct_path(nodes, predecessor, 3, 1), [3, 2, 4, 1])
+        self.assertEqual(reconstruct_path(nodes, predecessor, 4, 4), [4])
+
+    def test_unreachable(self):
+        self.graph.add_node(6)
+        nodes, distance, predecessor = floyd_warshall(self.graph)
+        self.assertEqual(list(distance[5]), [float('inf')] * 5 + [0])
+        self.assertIsNone(reconstruct_path(nodes, predecessor, 6, 1))
+
+    def test_negative_cycle(self):
+        self.graph.add_edge(3, 4, 0)
+        with self.assertRaises(AssertionError):
+            floyd_warshall(self.graph)
+
+
+# other files import floyd_warshall, so the tests only run when this file is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,198 @@
+"""Python3 implementation of an incremental topological order, maintained under edge insertions
+
+When the edges of a directed acyclic graph arrive one by one, recomputing the topological order from scratch after
+each insertion takes O(V+E) time per edge. The below implementation follows the algorithm of Pearce and Kelly
+(A dynamic topological sort algorithm for directed acyclic graphs, 2006), which only reorders the nodes affected
+by the new edge.
+
+Every node has a position in the current order. Adding an edge from_node -> to_node with
+position(from_node) < position(to_node) keeps the order valid, so nothing has to be done. Otherwise, only the nodes
+with positions between position(to_node) and position(from_node) can be affected:
+    * a forward search from to_node finds the affected nodes reachable from to_node; if it reaches from_node,
+    the new edge would close a cycle, and it is rejected
+    * a backward search from from_node finds the affected nodes that reach from_node
+The positions of these two sets of nodes are then shuffled between them, putting all the nodes that reach from_node
+before all the nodes reachable from to_node, and keeping the relative order inside each set.
+
+The file contains the following classes:
+    IncrementalTopologicalOrder - implementation of a directed graph using adjacency list, which keeps
+        a topological order of its nodes up to date
+
+    TestIncrementalTopSort - test cases for the incremental topological order
+"""
+
+from collections import defaultdict
+import random
+import unittest
+
+
+class IncrementalTopologicalOrder:
+    """
+    An implementation of a directed acyclic graph using adjacency list representation, together with
+    a topological order of its nodes
+
+    Attributes
+    ----------
+
+        nodes : set
+            a set consisting of all the nodes in the graph
+
+        edges : dict
+            a dictionary storing all edges, in the format node : [list of neighboring nodes]
+
+        reversed_edges : dict
+            a dictionary storing all edges reversed, in the format node : [list of nodes pointing to node]
+
+        order : list
+            the nodes of the graph, in topological order
+
+        positions : dict
+            the position of every node in order, in the format node : position
+
+    Methods
+    ----------
+
+        add_node(node)
+            adds node to graph, at the end of the order
+
+        add_edge (from_node, to_node)
+            adds from_node and to_node to the graph, and the edge between them, updating the order;
+            raises ValueError if the edge would create a cycle, in which case the graph is left unchanged
+
+        position(node)
+            returns the position of node in the topological order
+
+        precedes(node_1, node_2)
+            checks whether node_1 comes before node_2 in the topological order
+    """
+    def __init__(self):
+        self.nodes = set()
+        self.edges = defaultdict(list)
+        self.reversed_edges = defaultdict(list)
+        self.order = []
+        self.positions = {}
+
+    def add_node(self, node):
+        if node not in self.nodes:
+            self.nodes.add(node)
+            self.positions[node] = len(self.order)
+            self.order.append(node)
+
+    def position(self, node):
+        return self.positions[node]
+
+    def precedes(self, node_1, node_2):
+        return self.positions[node_1] < self.positions[node_2]
+
+    def add_edge(self, from_node, to_node):
+        # a self-loop is rejected before its node is added, so that the graph is left unchanged
+        if from_node == to_node:
+            raise ValueError('the edge would create a cycle')
+
+        # first add the two nodes to the graph.nodes, in case we forgot to do this before
+        self.add_node(from_node)
+        self.add_node(to_node)
+
+        lower_bound = self.positions[to_node]
+        upper_bound = self.positions[from_node]
+        if lower_bound < upper_bound:
+            # the order has to change: find the affected nodes on both sides of the new edge
+            forward = self.search(to_node, self.edges, lambda position: position <= upper_bound, from_node)
+            if forward is None:
+                raise ValueError('the edge would create a cycle')
+            backward = self.search(from_node, self.reversed_edges, lambda position: position > lower_bound)
+            self.reorder(backward, forward)
+
+        # add the edge in the graph
+        self.edges[from_node].append(to_node)
+        self.reversed_edges[to_node].append(from_node)
+
+    def search(self, source, edges, in_bounds, target=None):
+        # iterative depth first search, restricted to the nodes whose position satisfies in_bounds;
+        # returns None if the target is reached
+        visited = {source}
+        stack = [source]
+        while stack:
+            node = stack.pop()
+            for neighbor in edges[node]:
+                if neighbor == target:
+                    return None
+                if neighbor not in visited and in_bounds(self.positions[neighbor]):
+                    visited.add(neighbor)
+                    stack.append(neighbor)
+        return visited
+
+    def reorder(self, backward, forward):
+        # keep the relative order inside each set of nodes
+        backward = sorted(backward, key=self.positions.__getitem__)
+        forward = sorted(forward, key=self.positions.__getitem__)
+
+        # the nodes reaching from_node take the smallest of the freed positions, in their previous order
+        free_positions = sorted(self.positions[node] for node in backward + forward)
+        for node, position in zip(backward + forward, free_positions):
+            self.positions[node] = position
+            self.order[position] = node
+
+
+class TestIncrementalTopSort(unittest.TestCase):
+
+    def is_topological(self, graph):
+        return all(graph.precedes(node, neighbor) for node in graph.nodes for neighbor in graph.edges[node])
+
+    def test_reorder(self):
+        graph = IncrementalTopologicalOrder()
+        for node in ['A', 'B', 'C', 'D', 'E']:
+            graph.add_node(node)
+        graph.add_edge('A', 'B')
+        graph.add_edge('D', 'E')
+        self.assertEqual(graph.order, ['A', 'B', 'C', 'D', 'E'])
+
+        # D and E have to move before B, while C is not affected and keeps its position
+        graph.add_edge('E', 'B')
+        self.assertTrue(self.is_topological(graph))
+        self.assertEqual(graph.order, ['A', 'D', 'C', 'E', 'B'])
+        self.assertEqual(graph.position('B'), 4)
+
+    def test_reject_cycle(self):
+        graph = IncrementalTopologicalOrder()
+        graph.add_edge('A', 'B')
+        graph.add_edge('B', 'C')
+        with self.assertRaises(ValueError):
+            graph.add_edge('C', 'A')
+        with self.assertRaises(ValueError):
+            graph.add_edge('B', 'B')
+
+        # the graph is unchanged after a rejected edge
+        self.assertEqual(graph.edges['C'], [])
+        self.assertEqual(graph.order, ['A', 'B', 'C'])
+
+    def test_reject_self_loop(self):
+        graph = IncrementalTopologicalOrder()
+        graph.add_edge('A', 'B')
+        with self.assertRaises(ValueError):
+            graph.add_edge('D', 'D')
+
+        # the node of a rejected self-loop is not added to the graph
+        self.assertEqual(graph.nodes, {'A', 'B'})
+        self.assertEqual(graph.order, ['A', 'B'])
+        self.assertNotIn('D', graph.positions)
+
+    def test_random_edges(self):
+        # insert random edges, keeping only the ones that do not create cycles
+        rng = random.Random(3)
+        graph = IncrementalTopologicalOrder()
+        for node in range(50):
+            graph.add_node(node)
+        for _ in range(500):
+            from_node, to_node = rng.randrange(50), rng.randrange(50)
+            try:
+                graph.add_edge(from_node, to_node)
+            except ValueError:
+                # a rejected edge must close a cycle, i.e. from_node is reachable from to_node
+                self.assertTrue(from_node == to_node or
+                                graph.search(to_node, graph.edges, lambda position: True, from_node) is None)
+            self.assertTrue(self.is_topological(graph))
+            self.assertEqual([graph.position(node) for node in graph.order], list(range(50)))
+
+
+unittest.main(verbosity=2)
@@ -0,0 +1,197 @@
+""" Python3 implementation of Johnson's algorithm (shortest paths between all pairs of nodes).
+
+Johnson's algorithm works on graphs with negative weights, as long as they contain no negative cycle.
+It first adds a new node connected to all the other nodes by edges of weight 0, and runs the Bellman-Ford
+algorithm from it, to get a value h(node) for every node. The edges are then reweighted as
+    new weight of (u, v) = weight of (u, v) + h(u) - h(v)
+which makes all the weights non-negative and keeps the shortest paths the same. Finally, Dijkstra's algorithm
+is run from every source on the reweighted graph, and the distances are converted back by adding h(v) - h(u).
+For more details, see Chapter 25.3 in 3rd edition of Cormen - Introduction to Algorithms.
+
+The values h(node) are computed by bellman_ford from bellman_ford.py, on a view of the graph extended with the
+additional node. The graph is converted once into the compressed sparse row format of csr_graph.py, and the
+Dijkstra runs use csr_dijkstra on the reweighted CSR graph. They are independent of each other, so they are
+distributed over a pool of worker processes; to avoid sending the graph with every task, the arrays of the
+reweighted graph are given to each worker when it starts.
+
+The graph can be any of the weighted Graph classes from this folder, e.g. the one from bellman_ford.py, which the
+tests use.
+
+The file contains the following class:
+    TestJohnson - test cases for the implementation of Johnson's algorithm
+
+The file contains the following functions
+    * johnson - takes as input a graph, and returns the list of nodes together with the matrix of distances
+    between all pairs of nodes, in the format matrix[i][j] = distance from nodes[i] to nodes[j]
+
+    * johnson_rows - same as johnson, but yields the rows of the matrix one by one, as soon as they are computed,
+    in the format (source, row); it can also be restricted to a given list of sources
+
+    * reweight - auxiliary function that runs the Bellman-Ford algorithm from the additional node, and returns the
+    graph in CSR format with non-negative weights, together with the values h(node)
+
+    * dijkstra_row - auxiliary function that runs csr_dijkstra on the reweighted graph from one source, and
+    returns the row of distances from that source, converted back to the original weights
+"""
+
+from array import array
+from collections import ChainMap
+import concurrent.futures
+import os
+from types import SimpleNamespace
+import unittest
+
+from bellman_ford import Graph, bellman_ford
+from csr_graph import CSRGraph, csr_dijkstra
+
+
+def reweight(graph):
+    csr_graph = CSRGraph.from_graph(graph)
+    offsets, targets, weights = csr_graph.offsets, csr_graph.targets, csr_graph.weights
+    n = len(csr_graph)
+
+    # Bellman-Ford from an additional node, connected to all the other nodes by edges of weight 0; the graph is
+    # extended with it through a view, so that it is neither copied nor changed
+    weighted_edges = getattr(graph, 'weighted_edges', None)
+    if weighted_edges is None:
+        weighted_edges = {node: [(neighbor, weights[position]) for neighbor, position in
+                                 zip(graph.edges.get(node, ()), csr_graph.neighbors(csr_graph.node_id(node)))]
+                          for node in csr_graph.labels}
+    additional_node = object()
+    extended_graph = SimpleNamespace(
+        nodes=graph.nodes | {additional_node},
+        weighted_edges=ChainMap({additional_node: [(node, 0) for node in graph.nodes]}, weighted_edges))
+    distance, _ = bellman_ford(extended_graph, additional_node)
+    h = array('d', (distance[node] for node in csr_graph.labels))
+
+    reweighted = array('d', weights)
+    for node in range(n):
+        for position in range(offsets[node], offsets[node + 1]):
+            reweighted[position] += h[node] - h[targets[position]]
+
+    return CSRGraph(csr_graph.labels, offsets, targets, reweighted), h
+
+
+def dijkstra_row(csr_graph, h, source):
+    distances, _ = csr_dijkstra(csr_graph, source)
+
+    # undo the reweighting
+    for node in range(len(h)):
+        distances[node] += h[node] - h[source]
+    return distances
+
+
+# the reweighted graph of the worker process, set once by _init_worker instead of being sent with every task
+_worker_graph = None
+
+
+def _init_worker(offsets, targets, weights, h):
+    global _worker_graph
+    # the labels are not needed by the workers, which only see node ids
+    _worker_graph = (CSRGraph(range(len(h)), offsets, targets, weights), h)
+
+
+def _worker_row(source):
+    csr_graph, h = _worker_graph
+    return source, dijkstra_row(csr_graph, h, source)
+
+
+def johnson_rows(graph, sources=None, workers=None):
+    # CSRGraph.from_graph sorts the nodes when possible, so that the order of the rows and columns does not depend
+    # on the set order
+    csr_graph, h = reweight(graph)
+    nodes = csr_graph.labels
+    source_ids = range(len(nodes)) if sources is None else [csr_graph.node_id(source) for source in sources]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        for source in source_ids:
+            yield nodes[source], dijkstra_row(csr_graph, h, source)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(csr_graph.offsets, csr_graph.targets, csr_graph.weights, h)) as executor:
+        # a few sources per task amortize the cost of sending the results back
+        chunk_size = max(1, len(source_ids) // (4 * workers))
+        for source, row in executor.map(_worker_row, source_ids, chunksize=chunk_size):
+            yield nodes[source], row
+
+
+def johnson(graph, workers=None):
+    # without a list of sources, the rows come in the same order as the columns
+    nodes = []
+    matrix = []
+    for source, row in johnson_rows(graph, workers=workers):
+        nodes.append(source)
+        matrix.append(row)
+    return nodes, matrix
+
+
+class TestJohnson(unittest.TestCase):
+    """Test case taken from Cormen, Chapter 25.3, Figure 25.6"""
+
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.add_edge(1, 2, 3)
+        self.graph.add_edge(1, 3, 8)
+        self.graph.add_edge(1, 5, -4)
+        self.graph.add_edge(2, 4, 1)
+        self.graph.add_edge(2, 5, 7)
+        self.graph.add_edge(3, 2, 4)
+        self.graph.add_edge(4, 1, 2)
+        self.graph.add_edge(4, 3, -5)
+        self.graph.add_edge(5, 4, 6)
+        self.expected = [[0, 1, -3, 2, -4],
+                         [3, 0, -4, 1, -1],
+                         [7, 4, 0, 5, 3],
+                         [2, -1, -5, 0, -2],
+                         [8, 5, 1, 6, 0]]
+
+    def test_johnson(self):
+        nodes, matrix = johnson(self.graph, workers=1)
+        self.assertEqual(nodes, [1, 2, 3, 4, 5])
+        self.assertEqual([list(row) for row in matrix], self.expected)
+
+    def test_johnson_process_pool(self):
+        nodes, matrix = johnson(self.graph, workers=2)
+        self.assertEqual([list(row) for row in matrix], self.expected)
+
+    def test_johnson_rows(self):
+        actual = [(source, list(row)) for source, row in johnson_rows(self.graph, sources=[4, 2], workers=2)]
+        self.assertEqual(actual, [(4, self.expected[3]), (2, self.expected[1])])
+
+    def test_unreachable(self):
+        self.graph.add_node(6)
+        nodes, matrix = johnson(self.graph, workers=1)
+        self.assertEqual(list(matrix[5]), [float('inf')] * 5 + [0])
+        self.assertEqual([row[5] for row in matrix[:5]], [float('inf')] * 5)
+
+    def test_graph_without_weighted_edges(self):
+        # the Graph from csr_graph.py stores the weights in a dictionary keyed by (node_1, node_2) tuples
+        from csr_graph import Graph as TupleWeightsGraph
+        graph = TupleWeightsGraph()
+        for node in sorted(self.graph.nodes):
+            for neighbor, weight in self.graph.weighted_edges[node]:
+                graph.add_edge(node, neighbor, weight)
+        nodes, matrix = johnson(graph, workers=1)
+        self.assertEqual([list(row) for row in matrix], self.expected)
+
+    def test_graph_unchanged(self):
+        nodes = set(self.graph.nodes)
+        version = self.graph.version
+        johnson(self.graph, workers=1)
+        self.assertEqual(self.graph.nodes, nodes)
+        self.assertEqual(self.graph.version, version)
+
+    def test_negative_cycle(self):
+        self.graph.add_edge(3, 4, 0)
+        with self.assertRaises(AssertionError):
+            johnson(self.graph, workers=1)
+
+
+# the worker processes may import this file, so the tests only run when it is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,390 @@
+""" Python3 implementation of Kruskal's and Boruvka's algorithms (Minimum spanning trees)
+
+Kruskal's algorithm sorts the edges by weight and adds them one by one to the spanning forest, skipping the edges
+whose endpoints are already connected. Whether two nodes are connected is tracked with a disjoint-set (union-find)
+data structure. The algorithm runs in O(E*log(V)) time, dominated by the sorting of the edges; if the edges are
+already sorted, the rest runs in almost linear time. For more details, see Chapter 23.2 in 3rd edition of
+Cormen - Introduction to Algorithms.
+
+Boruvka's algorithm works in rounds: in every round, each component of the forest picks the cheapest edge leaving it,
+and all these edges are added at once, which at least halves the number of components. There are at most log(V)
+rounds, each taking O(E) time. Finding the cheapest edge of every component is independent for different parts of
+the edge list, so this phase can be split between worker processes. The workers receive the edges once, when they
+start, and read the component of every node from shared memory, which is rewritten once per round, so that the
+tasks only consist of a range of edge positions.
+
+The disjoint-set forest is stored in flat arrays (Python array module), uses union by rank and path compression,
+and works on integer node ids. For more details, see Chapter 21.3 in 3rd edition of Cormen - Introduction to
+Algorithms.
+
+Both algorithms return the same result as prim from prim_mst.py, i.e. a dictionary of parents in the form
+node: parent in the tree, together with the total weight of the tree. If the graph is not connected, the result is a
+minimum spanning forest and every tree has its own root with parent None.
+
+The file contains the following classes:
+    Graph - implementation of an undirected graph using adjacency list, same as in prim_mst.py
+
+    DisjointSet - implementation of a disjoint-set forest
+
+    TestKruskal - test cases for the implementation of Kruskal's and Boruvka's algorithms
+
+The file contains the following functions
+    * kruskal - takes as input a graph and a source, and returns a minimum spanning tree rooted at the source,
+    together with its total weight
+
+    * kruskal_edges - same as kruskal, but takes as input a list of nodes and a list of edges (node_1, node_2, weight),
+    which can be marked as already sorted by weight
+
+    * boruvka - same as kruskal, but uses Boruvka's algorithm, and can split each round between worker processes
+
+    * graph_edges - auxiliary function that returns the list of edges of a graph, each edge appearing once
+
+    * root_tree - auxiliary function that takes as input a list of tree edges and returns the dictionary of parents
+"""
+
+from array import array
+from collections import defaultdict
+import concurrent.futures
+from multiprocessing import shared_memory
+import unittest
+
+
+class Graph:
+    """
+    An implementation of an undirected graph using adjacency list representation
+
+    Attributes
+    ----------
+
+        nodes : set
+            a set consisting of all the nodes in the graph
+
+        edges : dict
+            a dictionary storing all edges, in the format node : [list of neighboring nodes]
+
+        weights: dict
+            a dictionary storing the weights of each edge, in the format (node_1, node_2) : weight of edge
+
+    Methods
+    ----------
+
+        add_node(node)
+            adds node to graph
+
+        add_edge (node_1, node_2, weight)
+            adds node_1 and node_2 to the graph, together with the corresponding edges and weight
+            adds node_2 to the neighbors of node_1
+            adds node_1 to the neighbors of node_2
+    """
+    def __init__(self):
+        self.nodes = set()
+        self.edges = defaultdict(list)
+        self.weights = {}
+
+    def add_node(self, node):
+        self.nodes.add(node)
+
+    def add_edge(self, source_node, target_node, weight):
+        # first add the two nodes to the graph.nodes, in case we forgot to do this before
+        self.add_node(source_node)
+        self.add_node(target_node)
+
+        # add the edges in the graph
+        self.edges[source_node].append(target_node)
+        self.edges[target_node].append(source_node)
+
+        # add the weight (cost) between the two nodes
+        self.weights[(source_node, target_node)] = weight
+        self.weights[(target_node, source_node)] = weight
+
+
+class DisjointSet:
+    """
+    Disjoint-set forest with union by rank and path compression, on the integer ids 0, ..., n-1
+
+    Attributes:
+        ----------
+        parent : array
+            the parent of every id in the forest; the roots are their own parents
+
+        rank : bytearray
+            an upper bound on the height of the tree rooted at every id
+
+    Methods:
+        ----------
+        find(x)
+            returns the root of the tree containing x, compressing the path from x to the root
+
+        union(x, y)
+            merges the trees containing x and y, and returns False if they were already the same tree
+    """
+
+    def __init__(self, n):
+        self.parent = array('l', range(n))
+        self.rank = bytearray(n)
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+
+        # point every node on the path directly to the root
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, x, y):
+        x = self.find(x)
+        y = self.find(y)
+        if x == y:
+            return False
+
+        # attach the tree with the smaller rank under the root of the other one
+        if self.rank[x] < self.rank[y]:
+            x, y = y, x
+        self.parent[y] = x
+        if self.rank[x] == self.rank[y]:
+            self.rank[x] += 1
+        return True
+
+
+def graph_edges(graph):
+    # every undirected edge is stored in both directions, so keep only the first one we see
+    edges = []
+    seen = set()
+    for node in graph.nodes:
+        for neighbor in graph.edges[node]:
+            if (neighbor, node) not in seen:
+                seen.add((node, neighbor))
+                edges.append((node, neighbor, graph.weights[(node, neighbor)]))
+    return edges
+
+
+def root_tree(nodes, tree_edges, source=None):
+    adjacency = defaultdict(list)
+    for node_1, node_2 in tree_edges:
+        adjacency[node_1].append(node_2)
+        adjacency[node_2].append(node_1)
+
+    # walk every tree from its root, starting with the source if one was given
+    previous_on_path = {}
+    roots = list(nodes) if source is None else [source] + list(nodes)
+    for root in roots:
+        if root in previous_on_path:
+            continue
+        previous_on_path[root] = None
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            for neighbor in adjacency[current]:
+                if neighbor not in previous_on_path:
+                    previous_on_path[neighbor] = current
+                    stack.append(neighbor)
+    return previous_on_path
+
+
+def kruskal_edges(nodes, edges, source=None, presorted=False):
+    nodes = list(nodes)
+    ids = {node: idx for idx, node in enumerate(nodes)}
+    if not presorted:
+        edges = sorted(edges, key=lambda edge: edge[2])
+
+    disjoint_set = DisjointSet(len(nodes))
+    tree_edges = []
+    total_weight = 0
+    for node_1, node_2, weight in edges:
+        if disjoint_set.union(ids[node_1], ids[node_2]):
+            tree_edges.append((node_1, node_2))
+            total_weight += weight
+
+            # a spanning tree has exactly V-1 edges, so the remaining edges can be skipped
+            if len(tree_edges) == len(nodes) - 1:
+                break
+
+    return root_tree(nodes, tree_edges, source), total_weight
+
+
+def kruskal(graph, source=None):
+    return kruskal_edges(graph.nodes, graph_edges(graph), source)
+
+
+def _cheapest_edges(component, edges_1, edges_2, weights, start, end):
+    # for every component, the position of the cheapest edge leaving it among the edges from start to end;
+    # equal weights are compared by position, so that all the components agree on the same order of the edges
+    cheapest = {}
+    for position in range(start, end):
+        component_1 = component[edges_1[position]]
+        component_2 = component[edges_2[position]]
+        if component_1 == component_2:
+            continue
+        for comp in (component_1, component_2):
+            best = cheapest.get(comp)
+            if best is None or (weights[position], position) < (weights[best], best):
+                cheapest[comp] = position
+    return cheapest
+
+
+# the edges of the worker process, and its view of the components in shared memory, set once by _init_worker instead
+# of being sent with every round
+_worker_edges = None
+_worker_block = None
+_worker_component = None
+
+
+def _init_worker(edges_1, edges_2, weights, component_name, n):
+    global _worker_edges, _worker_block, _worker_component
+    _worker_edges = (edges_1, edges_2, weights)
+    _worker_block = shared_memory.SharedMemory(name=component_name)
+    _worker_component = memoryview(_worker_block.buf)[:8 * n].cast('q')
+
+
+def _worker_cheapest_edges(start, end):
+    return _cheapest_edges(_worker_component, *_worker_edges, start, end)
+
+
+def boruvka(graph, source=None, workers=1):
+    if workers < 1:
+        raise ValueError('The number of workers must be at least 1')
+
+    nodes = list(graph.nodes)
+    ids = {node: idx for idx, node in enumerate(nodes)}
+    edges = graph_edges(graph)
+    n = len(nodes)
+
+    # store the edges as three parallel arrays of node ids and weights
+    edges_1 = array('l', (ids[node_1] for node_1, _, _ in edges))
+    edges_2 = array('l', (ids[node_2] for _, node_2, _ in edges))
+    weights = array('d', (weight for _, _, weight in edges))
+
+    # with several workers, the components are kept in shared memory, which the workers read directly; the tasks only
+    # consist of a range of edge positions, instead of a copy of the components for every task
+    executor = None
+    block = None
+    shared_component = None
+    if workers > 1:
+        block = shared_memory.SharedMemory(create=True, size=max(1, 8 * n))
+    chunk_size = max(1, -(-len(edges) // workers))
+
+    disjoint_set = DisjointSet(n)
+    tree_edges = []
+    total_weight = 0
+    try:
+        if block is not None:
+            shared_component = memoryview(block.buf)[:8 * n].cast('q')
+            executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                              initargs=(edges_1, edges_2, weights, block.name, n))
+        while True:
+            # label every node with the root of its component
+            component = array('q', (disjoint_set.find(node) for node in range(n)))
+
+            if executor is None:
+                cheapest = _cheapest_edges(component, edges_1, edges_2, weights, 0, len(edges))
+            else:
+                # the workers of the previous round are done, so the components can be rewritten
+                shared_component[:] = component
+                futures = [executor.submit(_worker_cheapest_edges, start, min(start + chunk_size, len(edges)))
+                           for start in range(0, len(edges), chunk_size)]
+                cheapest = {}
+                for future in futures:
+                    for comp, position in future.result().items():
+                        best = cheapest.get(comp)
+                        if best is None or (weights[position], position) < (weights[best], best):
+                            cheapest[comp] = position
+
+            # no edge leaves any component, so the forest is complete
+            if not cheapest:
+                break
+
+            for position in set(cheapest.values()):
+                if disjoint_set.union(edges_1[position], edges_2[position]):
+                    tree_edges.append((nodes[edges_1[position]], nodes[edges_2[position]]))
+                    total_weight += weights[position]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if block is not None:
+            # the view has to be released before the shared memory can be closed
+            if shared_component is not None:
+                shared_component.release()
+            try:
+                block.close()
+            finally:
+                block.unlink()
+
+    return root_tree(nodes, tree_edges, source), total_weight
+
+
+class TestKruskal(unittest.TestCase):
+    """"Test case taken from Cormen, Chapter 23.2, Figure 23.4"""
+
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.add_edge('A', 'B', 4)
+        self.graph.add_edge('A', 'H', 8)
+        self.graph.add_edge('B', 'C', 8)
+        self.graph.add_edge('B', 'H', 11)
+        self.graph.add_edge('C', 'D', 7)
+        self.graph.add_edge('C', 'F', 4)
+        self.graph.add_edge('C', 'I', 2)
+        self.graph.add_edge('D', 'E', 9)
+        self.graph.add_edge('D', 'F', 14)
+        self.graph.add_edge('E', 'F', 10)
+        self.graph.add_edge('F', 'G', 2)
+        self.graph.add_edge('G', 'I', 6)
+        self.graph.add_edge('G', 'H', 1)
+        self.graph.add_edge('H', 'I', 7)
+
+        # the two minimum spanning trees of the graph, rooted at A, same as in the tests of prim_mst.py
+        self.expected_1 = {'A': None, 'B': 'A', 'C': 'B', 'D': 'C', 'E': 'D', 'F': 'C', 'I': 'C', 'G': 'F', 'H': 'G'}
+        self.expected_2 = {'F': 'G', 'C': 'F', 'I': 'C', 'D': 'C', 'G': 'H', 'B': 'A', 'E': 'D', 'H': 'A', 'A': None}
+
+    def test_disjoint_set(self):
+        disjoint_set = DisjointSet(5)
+        self.assertTrue(disjoint_set.union(0, 1))
+        self.assertTrue(disjoint_set.union(2, 3))
+        self.assertTrue(disjoint_set.union(1, 3))
+        self.assertFalse(disjoint_set.union(0, 2))
+        self.assertEqual(disjoint_set.find(0), disjoint_set.find(3))
+        self.assertNotEqual(disjoint_set.find(0), disjoint_set.find(4))
+
+    def test_kruskal(self):
+        actual, total_weight = kruskal(self.graph, 'A')
+        self.assertTrue(actual == self.expected_1 or actual == self.expected_2)
+        self.assertEqual(total_weight, 37)
+
+    def test_kruskal_presorted_edges(self):
+        edges = sorted(graph_edges(self.graph), key=lambda edge: edge[2])
+        actual, total_weight = kruskal_edges(self.graph.nodes, edges, 'A', presorted=True)
+        self.assertTrue(actual == self.expected_1 or actual == self.expected_2)
+        self.assertEqual(total_weight, 37)
+
+    def test_boruvka(self):
+        actual, total_weight = boruvka(self.graph, 'A')
+        self.assertTrue(actual == self.expected_1 or actual == self.expected_2)
+        self.assertEqual(total_weight, 37)
+
+    def test_boruvka_process_pool(self):
+        actual, total_weight = boruvka(self.graph, 'A', workers=2)
+        self.assertTrue(actual == self.expected_1 or actual == self.expected_2)
+        self.assertEqual(total_weight, 37)
+
+    def test_boruvka_workers(self):
+        for workers in (0, -1):
+            with self.assertRaises(ValueError):
+                boruvka(self.graph, 'A', workers=workers)
+
+    def test_spanning_forest(self):
+        self.graph.add_edge('X', 'Y', 3)
+        self.graph.add_node('Z')
+        for algorithm in (kruskal, boruvka):
+            actual, total_weight = algorithm(self.graph, 'A')
+            self.assertEqual(total_weight, 40)
+            self.assertEqual(actual['A'], None)
+            self.assertEqual(actual['Z'], None)
+            self.assertTrue(actual['X'] is None or actual['Y'] is None)
+
+
+# the worker processes may import this file, so the tests only run when it is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
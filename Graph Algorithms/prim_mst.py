@@ -7,19 +7,23 @@ The below implementation is the Python3 code for the algorithm given in
 Chapter 23.2 in 3rd edition of Cormen - Introduction to Algorithms.
 
 The below implementation of Prim\'s algorithm assumes that the Graph is
-implemented as adjacency list, stored as dictionary. See the below
-implementation of the class Graph.
+implemented as adjacency list, stored as dictionary, where the adjacency list of every node
+stores pairs (neighbor, weight), so that no (node, neighbor) tuple has to be hashed for every
+edge, and parallel edges keep their own weights. See the below implementation of the class Graph.
 
 We also implement our own min priority queue, mainly because of inability to find
 an efficient way of retrieving index of an element in a queue in the Python heapq module.
 The below implementation is based on the heap implementation from Cormen Chapter 6
 and follows closely the ideas from this link
 https://www.geeksforgeeks.org/prims-mst-for-adjacency-list-representation-greedy-algo-6/
+It is the indexed d-ary heap stored in flat arrays, with iterative sifting, from priority_queue.py;
+see that file for more details and for a benchmark.
 
 The file contains the following classes:
-    Graph - implementation of a graph using adjacency list
+    Graph - implementation of a graph using adjacency list, with the read only views Neighbors and EdgeWeights
+    from dijkstra.py
 
-    PriorityQueue - implementation of a min priority queue
+    PriorityQueue - the min priority queue from priority_queue.py, with the methods of its previous implementation
 
     TestPrim - test cases for the implementation of Prim's algorithm
 
@@ -30,6 +34,9 @@ The file contains the following function
 from collections import defaultdict
 import unittest
 
+from dijkstra import EdgeWeights, Neighbors
+from priority_queue import IndexedPriorityQueue
+
 
 class Graph:
     """
@@ -41,11 +48,16 @@ class Graph:
         nodes : set
             a set consisting of all the nodes in the graph
 
-        edges : dict
-            a dictionary storing all edges, in the format node : [list of neighboring nodes]
+        edges : Neighbors
+            a read only view of all edges, in the format node : [list of neighboring nodes]
+
+        weighted_edges : dict
+            a dictionary storing all edges with their weights, in the format
+            node : [list of pairs (neighboring node, weight of edge)]
 
-        weights: dict
-            a dictionary storing the weights of each edge, in the format (node_1, node_2) : weight of edge
+        weights: EdgeWeights
+            a read only view of the weights of each edge, in the format (node_1, node_2) : weight of edge;
+            with parallel edges, the weight is the smallest one
 
     Methods
     ----------
@@ -63,8 +75,9 @@ class Graph:
     """
     def __init__(self):
         self.nodes = set()
-        self.edges = defaultdict(list)
-        self.weights = {}
+        self.weighted_edges = defaultdict(list)
+        self.edges = Neighbors(self.weighted_edges)
+        self.weights = EdgeWeights(self.weighted_edges)
 
     def add_node(self, node):
         self.nodes.add(node)
@@ -74,129 +87,34 @@ class Graph:
         self.add_node(source_node)
         self.add_node(target_node)
 
-        # add the edges in the graph
-        if source_node in self.edges:
-            self.edges[source_node].append(target_node)
-        else:
-            self.edges[source_node] = [target_node]
-
-        if target_node in self.edges:
-            self.edges[target_node].append(source_node)
-        else:
-            self.edges[target_node] = [source_node]
-
-        # add the weight (cost) between the two nodes
-        self.weights[(source_node, target_node)] = weight
-        self.weights[(target_node, source_node)] = weight
+        # add the edges in the graph, with the weight (cost) between the two nodes next to the neighbor in both
+        # directions
+        self.weighted_edges[source_node].append((target_node, weight))
+        self.weighted_edges[target_node].append((source_node, weight))
 
 
-class PriorityQueue:
+class PriorityQueue(IndexedPriorityQueue):
     """
-    Own implementation of a min-priority queue
-
-    Attributes:
-        ----------
-        queue: list
-            list of tuples (node, distance)
-
-        size : int
-            size of the queue
-
-        indices: dict
-            dictionary storing the index of a node in queue in the form node : index
+    Indexed d-ary min priority queue from priority_queue.py, with the methods of the previous implementation of the
+    queue
 
     Methods:
         ----------
-        is_empty
-            returns a boolean corresponding to the priority queue being empty or not
-
-        in_queue(node)
-            checks if the input node is in the priority queue
-
-        add_node(node, distance)
-            adds the list [node, distance] to the queue, updating the size and indices attributes
-
-        swap_nodes(first_node, second_node)
-            swaps the list containing first_node with the list containing second_node inside the queue
-
-        heapify(index)
-            maintains the min priority queue property of the queue starting from position equal to index
-
-        extract_min
-            returns and removes the node with the minimum distance from the queue, maintaining the min queue property
-
-        decrease_key (node, new_distance)
-            decreases the distance associated with node in the queue to the new_distance value
-            it assumes that new_distance is strictly smaller than the original distance
+        in_queue(node), add_node(node, distance), extract_min
+            the methods of the previous implementation of the queue, kept for compatibility; see IndexedPriorityQueue
+            for the other methods
     """
 
-    def __init__(self):
-        self.queue = []
-        self.size = 0
-        self.indices = {}
-
-    def is_empty(self):
-        return True if self.size == 0 else False
-
     def in_queue(self, node):
-        if self.indices[node] < self.size:
-            return True
-        return False
+        return node in self
 
     def add_node(self, node, distance):
-        self.queue.append([node, distance])
-        self.indices[node] = self.size
-        self.size += 1
-
-    def swap_nodes(self, u, v):
-        self.queue[self.indices[u]], self.queue[self.indices[v]] = \
-            self.queue[self.indices[v]], self.queue[self.indices[u]]
-        self.indices[u], self.indices[v] = self.indices[v], self.indices[u]
-
-    def heapify(self, idx):
-        smallest = idx
-        left = 2*idx + 1
-        right = 2*idx + 2
-        if left < self.size and self.queue[left][1] < self.queue[smallest][1]:
-            smallest = left
-        if right < self. size and self.queue[right][1] < self.queue[smallest][1]:
-            smallest = right
-
-        if smallest != idx:
-            self.swap_nodes(self.queue[smallest][0], self.queue[idx][0])
-            self.heapify(smallest)
+        self.push(node, distance)
 
     def extract_min(self):
         if self.is_empty():
             return
-
-        min_node = self.queue[0][0]
-        [last_node, last_distance] = self.queue[self.size - 1]
-        self.queue[0] = [last_node, last_distance]
-        self.indices[last_node] = 0
-        self.indices[min_node] = self.size - 1
-
-        # Reduce heap size and heapify
-        self.size -= 1
-        self.heapify(0)
-
-        return min_node
-
-    def decrease_key(self, node, distance):
-
-        # Get the index of v in  heap array
-        idx = self.indices[node]
-
-        # Get the node and update its dist value
-        self.queue[idx][1] = distance
-
-        # Travel up while the complete tree is not heapified.
-        while idx > 0 and self.queue[idx][1] < self.queue[(idx - 1) // 2][1]:
-            # Swap this node with its parent
-            self.swap_nodes(self.queue[idx][0], self.queue[(idx - 1)//2][0])
-
-            # move to parent index
-            idx = (idx - 1) // 2
+        return self.pop()[0]
 
 
 def prim(graph, source):
@@ -206,28 +124,20 @@ def prim(graph, source):
     for each node. These are necessary for initializing the minimum spanning tree that initially
     consists only of the source node and will be gradually grown during the algorithm"""
 
-    # initialize the priority queue
+    # initialize the priority queue, with distance 0 for the source and infinity for everything else
     priority_queue = PriorityQueue()
     for node in graph.nodes:
-        priority_queue.add_node(node, float('inf'))
-
-    # change the distance to the source to 0
-    source_index = priority_queue.indices[source]
-    priority_queue.queue[source_index][1] = 0
-
-    # change the index of the source to be 0. this avoids building a min-heap, as everything else is infinity
-    priority_queue.swap_nodes(source, priority_queue.queue[0][0])
+        priority_queue.push(node, 0 if node == source else float('inf'))
 
     # initialize the dictionary of parents
     previous_on_path = {node: None for node in graph.nodes}
 
-    while priority_queue.size > 0:
-        current_node = priority_queue.extract_min()
-        for neighbor in graph.edges[current_node]:
-            if priority_queue.in_queue(neighbor) and \
-                    priority_queue.queue[priority_queue.indices[neighbor]][1] > graph.weights[(current_node, neighbor)]:
+    while priority_queue:
+        current_node, _ = priority_queue.pop()
+        for neighbor, weight in graph.weighted_edges[current_node]:
+            if neighbor in priority_queue and priority_queue.key(neighbor) > weight:
                 previous_on_path[neighbor] = current_node
-                priority_queue.decrease_key(neighbor, graph.weights[(current_node, neighbor)])
+                priority_queue.decrease_key(neighbor, weight)
     return previous_on_path
 
 
@@ -264,5 +174,28 @@ class TestPrim(unittest.TestCase):
         expected_2 = {'F': 'G', 'C': 'F', 'I': 'C', 'D': 'C', 'G': 'H', 'B': 'A', 'E': 'D', 'H': 'A', 'A': None}
         self.assertTrue(actual == expected_1 or actual == expected_2)
 
+    def test_parallel_edges(self):
+        # a heavier parallel edge between A and H does not change the tree, a lighter one between B and H does
+        self.graph.add_edge('H', 'A', 20)
+        self.assertEqual(self.graph.weights[('A', 'H')], 8)
+        self.assertEqual(prim(self.graph, 'B')['H'], 'G')
+
+        self.graph.add_edge('B', 'H', 0)
+        self.assertEqual(self.graph.weights[('H', 'B')], 0)
+        actual = prim(self.graph, 'B')
+        self.assertEqual(actual['H'], 'B')
+        self.assertEqual(actual['G'], 'H')
+
+    def test_priority_queue(self):
+        priority_queue = PriorityQueue(arity=2)
+        priority_queue.add_node('A', 3)
+        priority_queue.add_node('B', 5)
+        priority_queue.decrease_key('B', 1)
+        self.assertTrue(priority_queue.in_queue('A'))
+        self.assertFalse(priority_queue.in_queue('C'))
+        self.assertEqual(priority_queue.extract_min(), 'B')
+        self.assertEqual(priority_queue.extract_min(), 'A')
+        self.assertIsNone(priority_queue.extract_min())
+
 
 unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,303 @@
+""" Python3 implementation of an indexed d-ary min priority queue.
+
+The Python heapq module has no efficient way of finding an element inside the heap, so it cannot decrease the key
+of an element; algorithms like Dijkstra's or Prim's then have to push the element again and skip the outdated
+copies later. An indexed priority queue also stores the position of every element in the heap, so that
+decrease_key runs in O(log(n)) and membership tests run in O(1).
+
+The below implementation stores the heap in flat arrays (Python array module) instead of lists of [node, key] pairs:
+    * every item gets an integer id when it is pushed for the first time
+    * heap[i] is the id of the item at position i of the heap
+    * keys[id] is the key of the item with the given id; the keys are kept in a list rather than an array, so that
+    they are returned exactly as they were given (an array of floats would turn integer keys into floats)
+    * positions[id] is the position of the item with the given id in the heap, or -1 if it is not in the queue
+Sifting up and down is iterative, and moves the sifted id into its final position only once, instead of swapping
+it at every level.
+
+The heap is d-ary: every position i has the children d*i+1, ..., d*i+d. A larger arity makes the heap shallower,
+so that push and decrease_key get faster, while pop has to compare more children at every level. Arity 4 is
+usually a good choice for Dijkstra's and Prim's algorithms, where decrease_key is the most frequent operation.
+For more details on binary heaps, see Chapter 6 in 3rd edition of Cormen - Introduction to Algorithms.
+
+The file contains the following classes:
+    IndexedPriorityQueue - implementation of an indexed d-ary min priority queue
+
+    TestIndexedPriorityQueue - test cases for the implementation of the priority queue
+
+The file contains the following function
+    * benchmark - takes as input a number of items and a list of arities, and returns the time in seconds
+    that the priority queue with each arity takes to push all items, decrease the key of each of them and then pop
+    them all; the time taken by the heapq module for the same work (with lazy deletion) is returned as well
+"""
+
+from array import array
+import heapq
+import random
+import time
+import unittest
+
+
+class IndexedPriorityQueue:
+    """
+    Indexed d-ary min priority queue
+
+    Attributes:
+        ----------
+        arity : int
+            number of children of every position in the heap
+
+        heap : array
+            ids of the items, in heap order
+
+        keys : list
+            the key of every item, indexed by id
+
+        positions : array
+            the position of every item in heap, indexed by id, or -1 if the item is not in the queue
+
+        ids : dict
+            dictionary storing the id of every item that was pushed, in the form item : id
+
+        items : list
+            the inverse of ids, in the form id : item
+
+    Methods:
+        ----------
+        push(item, key)
+            adds item to the queue with the given key
+
+        pop
+            removes the item with the minimum key from the queue and returns the tuple (item, key)
+
+        peek
+            returns the tuple (item, key) with the minimum key, without removing it
+
+        decrease_key(item, key)
+            decreases the key of item to the given key; it assumes that key is smaller than the current key
+
+        key(item)
+            returns the current key of item
+
+        __contains__(item)
+            checks if item is in the queue; items that were never pushed are simply not in the queue
+
+        __len__
+            returns the number of items in the queue
+    """
+
+    def __init__(self, arity=4):
+        if arity < 2:
+            raise ValueError('The arity of the heap must be at least 2')
+        self.arity = arity
+        self.heap = array('l')
+        self.keys = []
+        self.positions = array('l')
+        self.ids = {}
+        self.items = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        item_id = self.ids.get(item)
+        return item_id is not None and self.positions[item_id] >= 0
+
+    def is_empty(self):
+        return len(self.heap) == 0
+
+    def key(self, item):
+        return self.keys[self.ids[item]]
+
+    def push(self, item, key):
+        item_id = self.ids.get(item)
+        if item_id is None:
+            item_id = len(self.items)
+            self.ids[item] = item_id
+            self.items.append(item)
+            self.keys.append(key)
+            self.positions.append(-1)
+        elif self.positions[item_id] >= 0:
+            raise ValueError('The given item is already in the queue')
+
+        self.keys[item_id] = key
+        self.heap.append(item_id)
+        self.sift_up(len(self.heap) - 1, item_id)
+
+    def peek(self):
+        if not self.heap:
+            raise IndexError('peek from an empty priority queue')
+        return self.items[self.heap[0]], self.keys[self.heap[0]]
+
+    def pop(self):
+        if not self.heap:
+            raise IndexError('pop from an empty priority queue')
+
+        min_id = self.heap[0]
+        self.positions[min_id] = -1
+
+        # move the last item to the root and sift it down
+        last_id = self.heap.pop()
+        if self.heap:
+            self.sift_down(0, last_id)
+
+        return self.items[min_id], self.keys[min_id]
+
+    def decrease_key(self, item, key):
+        item_id = self.ids[item]
+        position = self.positions[item_id]
+        if position < 0:
+            raise KeyError('The given item is not in the queue')
+        if key > self.keys[item_id]:
+            raise ValueError('The new key is larger than the current key')
+
+        self.keys[item_id] = key
+        self.sift_up(position, item_id)
+
+    def sift_up(self, position, item_id):
+        heap, keys, positions, arity = self.heap, self.keys, self.positions, self.arity
+        key = keys[item_id]
+
+        # move the parents down until we find the right position for item_id
+        while position > 0:
+            parent = (position - 1) // arity
+            parent_id = heap[parent]
+            if keys[parent_id] <= key:
+                break
+            heap[position] = parent_id
+            positions[parent_id] = position
+            position = parent
+
+        heap[position] = item_id
+        positions[item_id] = position
+
+    def sift_down(self, position, item_id):
+        heap, keys, positions, arity = self.heap, self.keys, self.positions, self.arity
+        key = keys[item_id]
+        size = len(heap)
+
+        # move the smallest child up until we find the right position for item_id
+        while True:
+            first_child = arity * position + 1
+            if first_child >= size:
+                break
+
+            smallest = first_child
+            smallest_key = keys[heap[first_child]]
+            for child in range(first_child + 1, min(first_child + arity, size)):
+                if keys[heap[child]] < smallest_key:
+                    smallest = child
+                    smallest_key = keys[heap[child]]
+
+            if key <= smallest_key:
+                break
+            heap[position] = heap[smallest]
+            positions[heap[smallest]] = position
+            position = smallest
+
+        heap[position] = item_id
+        positions[item_id] = position
+
+
+def benchmark(n=100000, arities=(2, 4, 8), seed=0):
+    rng = random.Random(seed)
+    keys = [rng.random() for _ in range(n)]
+    timings = {}
+
+    for arity in arities:
+        start = time.perf_counter()
+        queue = IndexedPriorityQueue(arity)
+        for item, key in enumerate(keys):
+            queue.push(item, key)
+        for item, key in enumerate(keys):
+            queue.decrease_key(item, key / 2)
+        while queue:
+            queue.pop()
+        timings[arity] = time.perf_counter() - start
+
+    # the same work with heapq, where a decreased key is pushed again and the outdated copy is skipped later
+    start = time.perf_counter()
+    heap = []
+    for item, key in enumerate(keys):
+        heapq.heappush(heap, (key, item))
+    for item, key in enumerate(keys):
+        heapq.heappush(heap, (key / 2, item))
+    popped = set()
+    while heap:
+        key, item = heapq.heappop(heap)
+        if item not in popped:
+            popped.add(item)
+    timings['heapq'] = time.perf_counter() - start
+
+    return timings
+
+
+class TestIndexedPriorityQueue(unittest.TestCase):
+
+    def test_push_pop(self):
+        for arity in (2, 3, 4, 8):
+            queue = IndexedPriorityQueue(arity)
+            keys = [5, 3, 8, 1, 9, 2, 7, 4, 6, 0]
+            for item, key in enumerate(keys):
+                queue.push(item, key)
+            self.assertEqual(len(queue), 10)
+            self.assertEqual(queue.peek(), (9, 0))
+            actual = [queue.pop()[1] for _ in range(len(keys))]
+            self.assertEqual(actual, sorted(keys))
+            self.assertTrue(queue.is_empty())
+
+    def test_decrease_key(self):
+        queue = IndexedPriorityQueue(2)
+        for item, key in [('A', 4), ('B', 8), ('C', 2), ('D', 6)]:
+            queue.push(item, key)
+        queue.decrease_key('D', 1)
+        self.assertEqual(queue.key('D'), 1)
+        # integer keys are not turned into floats
+        self.assertIs(type(queue.key('D')), int)
+        self.assertEqual(queue.pop(), ('D', 1))
+        self.assertEqual(queue.pop(), ('C', 2))
+        with self.assertRaises(KeyError):
+            queue.decrease_key('C', 0)
+        with self.assertRaises(ValueError):
+            queue.decrease_key('B', 10)
+
+    def test_contains(self):
+        queue = IndexedPriorityQueue()
+        queue.push('A', 1)
+        self.assertIn('A', queue)
+        self.assertNotIn('B', queue)
+        queue.pop()
+        self.assertNotIn('A', queue)
+
+        # an item can be pushed again after it was popped
+        queue.push('A', 3)
+        self.assertEqual(queue.pop(), ('A', 3))
+
+    def test_random_operations(self):
+        rng = random.Random(1)
+        queue = IndexedPriorityQueue(4)
+        current = {}
+        for _ in range(2000):
+            operation = rng.random()
+            if operation < 0.4:
+                item = rng.randrange(200)
+                if item not in current:
+                    current[item] = rng.randrange(1000)
+                    queue.push(item, current[item])
+            elif operation < 0.7 and current:
+                item = rng.choice(list(current))
+                current[item] = current[item] - rng.randrange(100)
+                queue.decrease_key(item, current[item])
+            elif current:
+                item, key = queue.pop()
+                self.assertEqual(key, min(current.values()))
+                self.assertEqual(current.pop(item), key)
+            self.assertEqual(len(queue), len(current))
+
+    def test_benchmark(self):
+        timings = benchmark(n=1000)
+        self.assertEqual(set(timings), {2, 4, 8, 'heapq'})
+
+
+# other files import the priority queue, so the tests only run when this file is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
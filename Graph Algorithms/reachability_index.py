@@ -0,0 +1,275 @@
+"""Python3 implementation of a reachability index, answering "can node_1 reach node_2?" queries without traversals
+
+iterative_dfs from dfs.py answers a reachability query by searching the graph from the source, which takes O(V+E)
+time per query. When the graph changes rarely and the queries are many, it pays off to precompute the answers:
+    * first, every strongly connected component is contracted to a single node, as all the nodes of a component
+    reach exactly the same nodes; this uses tarjan_scc from strongly_connected_components.py, an iterative version
+    of Tarjan's algorithm, and gives an acyclic graph (the condensation)
+    * then, the transitive closure of the condensation is computed as one bitset per component: bit d of the
+    bitset of component c is set if c reaches d. Tarjan's algorithm numbers the components in reverse topological
+    order, i.e. every edge goes from a component to one with a smaller id, so the bitset of every component is
+    simply the union of the bitsets of its successors, which are all computed before it
+While building, the bitsets are Python integers, so that the union of two bitsets is a single | operation on machine
+words. They are then stored as bytes, so that a query only looks up the two components and tests one bit in O(1).
+
+The index records the version of the graph when it is built: every add_node or add_edge, through the index or directly
+on the graph, increases graph.version (same as in dijkstra.py), and a version different from the recorded one marks
+the index as stale. The queries then fall back to a depth first search, until the index is rebuilt. For a graph
+without a version counter, the number of nodes and edges serves as the version.
+
+The file contains the following classes:
+    Graph - implementation of a directed graph using adjacency list, same as in topological_sorting.py, with a
+    version counter
+
+    ReachabilityIndex - the reachability index
+
+    TestReachabilityIndex - test cases for the reachability index
+"""
+
+from array import array
+from collections import defaultdict
+import sys
+import unittest
+
+from dfs import iterative_dfs
+from strongly_connected_components import tarjan_scc
+
+
+class Graph:
+    """
+    An implementation of a directed graph using adjacency list representation
+
+    Attributes
+    ----------
+
+        nodes : set
+            a set consisting of all the nodes in the graph
+
+        edges : dict
+            a dictionary storing all edges, in the format node : [list of neighboring nodes]
+
+        version : int
+            the number of changes made to the graph so far, used to detect a stale index
+
+
+    Methods
+    ----------
+
+        add_node(node)
+            adds node to graph
+
+        add_edge (from_node, to_node)
+            adds from_node and to_node to the graph
+            adds the edge between from_node and to_node
+            adds to_node to the neighbors of from_node
+    """
+    def __init__(self):
+        self.nodes = set()
+        self.edges = defaultdict(list)
+        self.version = 0
+
+    def add_node(self, node):
+        if node not in self.nodes:
+            self.nodes.add(node)
+            self.version += 1
+
+    def add_edge(self, from_node, to_node):
+        # first add the two nodes to the graph.nodes, in case we forgot to do this before
+        self.add_node(from_node)
+        self.add_node(to_node)
+
+        # add the edge in the graph
+        self.edges[from_node].append(to_node)
+        self.version += 1
+
+
+class ReachabilityIndex:
+    """
+    Reachability index of a directed graph, based on the transitive closure of its condensation
+
+    Attributes
+    ----------
+
+        graph : Graph
+            the indexed graph
+
+        ids : dict
+            the integer id of every node at the time of the last build, in the format node : id
+
+        component : array
+            the component id of every node id
+
+        closure : list
+            the bitset of every component, as bytes; bit d is set if the component reaches component d
+
+        version : int or tuple
+            the version of the graph at the time of the last build
+
+        stale : bool
+            True if the graph changed since the last build
+
+    Methods
+    ----------
+
+        build
+            computes the index for the current graph
+
+        graph_version
+            returns the current version of the graph, or the number of its nodes and edges if it has no version counter
+
+        add_edge (from_node, to_node)
+            adds the edge to the graph, which makes the index stale
+
+        reachable(from_node, to_node)
+            checks whether there is a path from from_node to to_node, using the index if it is up to date
+            and a depth first search otherwise
+
+        search(source, target)
+            checks whether there is a path from source to target with iterative_dfs from dfs.py
+
+        memory_usage
+            returns a dictionary with the number of bytes used by the parts of the index
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.ids = {}
+        self.component = array('l')
+        self.closure = []
+        self.version = None
+        self.build()
+
+    @property
+    def stale(self):
+        return self.version != self.graph_version()
+
+    def graph_version(self):
+        if hasattr(self.graph, 'version'):
+            return self.graph.version
+        return len(self.graph.nodes), sum(len(neighbors) for neighbors in self.graph.edges.values())
+
+    def build(self):
+        self.version = self.graph_version()
+        nodes, self.component = tarjan_scc(self.graph)
+        component_count = max(self.component) + 1 if nodes else 0
+        self.ids = {node: idx for idx, node in enumerate(nodes)}
+        adjacency = [[self.ids[neighbor] for neighbor in self.graph.edges[node]] for node in nodes]
+
+        # every edge goes from a component to one with a smaller id, so the successors of every component are
+        # complete before it is processed
+        successors = [set() for _ in range(component_count)]
+        for node, neighbors in enumerate(adjacency):
+            for neighbor in neighbors:
+                if self.component[node] != self.component[neighbor]:
+                    successors[self.component[node]].add(self.component[neighbor])
+
+        bitsets = [0] * component_count
+        for component_id in range(component_count):
+            bits = 1 << component_id
+            for successor in successors[component_id]:
+                bits |= bitsets[successor]
+            bitsets[component_id] = bits
+
+        # bit d of a bitset is bit d % 8 of byte d // 8
+        row_size = (component_count + 7) // 8
+        self.closure = [bits.to_bytes(row_size, 'little') for bits in bitsets]
+
+    def add_edge(self, from_node, to_node):
+        self.graph.add_edge(from_node, to_node)
+
+    def reachable(self, from_node, to_node):
+        if from_node not in self.graph.nodes:
+            raise ValueError('source node is not in the graph')
+
+        if self.stale or from_node not in self.ids or to_node not in self.ids:
+            return self.search(from_node, to_node)
+
+        component_1 = self.component[self.ids[from_node]]
+        component_2 = self.component[self.ids[to_node]]
+        return (self.closure[component_1][component_2 >> 3] >> (component_2 & 7)) & 1 == 1
+
+    def search(self, source, target):
+        return iterative_dfs(self.graph, source, target)
+
+    def memory_usage(self):
+        return {
+            'ids': sys.getsizeof(self.ids),
+            'component': self.component.itemsize * len(self.component),
+            'closure': sys.getsizeof(self.closure) + sum(sys.getsizeof(row) for row in self.closure),
+        }
+
+
+class TestReachabilityIndex(unittest.TestCase):
+
+    def setUp(self):
+        # same graph as in the tests of strongly_connected_components.py
+        self.graph = Graph()
+        for from_node, to_node in ['ab', 'bc', 'be', 'bf', 'cd', 'cg', 'dc', 'dh', 'ea', 'ef', 'fg', 'gf', 'gh', 'hh']:
+            self.graph.add_edge(from_node, to_node)
+        self.graph.add_node('i')
+        self.index = ReachabilityIndex(self.graph)
+
+    def test_reachable(self):
+        self.assertTrue(self.index.reachable('a', 'h'))
+        self.assertTrue(self.index.reachable('e', 'b'))
+        self.assertTrue(self.index.reachable('h', 'h'))
+        self.assertFalse(self.index.reachable('c', 'a'))
+        self.assertFalse(self.index.reachable('f', 'd'))
+        self.assertFalse(self.index.reachable('a', 'i'))
+
+    def test_matches_search(self):
+        for from_node in self.graph.nodes:
+            for to_node in self.graph.nodes:
+                self.assertEqual(self.index.reachable(from_node, to_node), self.index.search(from_node, to_node))
+
+    def test_stale_index(self):
+        self.index.add_edge('h', 'a')
+        self.assertTrue(self.index.stale)
+        self.assertTrue(self.index.reachable('c', 'a'))
+
+        # a node added directly to the graph is not in the index, so the query falls back to the search
+        self.graph.add_edge('i', 'j')
+        self.assertTrue(self.index.reachable('i', 'j'))
+
+        self.index.build()
+        self.assertFalse(self.index.stale)
+        self.assertTrue(self.index.reachable('f', 'd'))
+        self.assertFalse(self.index.reachable('a', 'i'))
+
+    def test_edge_added_to_graph(self):
+        # an edge added directly to the graph between nodes of the index also makes the index stale
+        self.assertFalse(self.index.reachable('c', 'b'))
+        self.graph.add_edge('h', 'b')
+        self.assertTrue(self.index.stale)
+        self.assertTrue(self.index.reachable('c', 'b'))
+
+        self.index.build()
+        self.assertFalse(self.index.stale)
+        self.assertTrue(self.index.reachable('c', 'b'))
+
+    def test_graph_without_version(self):
+        # a graph without a version counter is versioned by the number of its nodes and edges
+        class PlainGraph:
+            def __init__(self):
+                self.nodes = set()
+                self.edges = defaultdict(list)
+
+            def add_edge(self, from_node, to_node):
+                self.nodes.update((from_node, to_node))
+                self.edges[from_node].append(to_node)
+
+        graph = PlainGraph()
+        graph.add_edge(1, 2)
+        graph.add_edge(2, 3)
+        index = ReachabilityIndex(graph)
+        self.assertFalse(index.reachable(3, 1))
+        graph.add_edge(3, 1)
+        self.assertTrue(index.stale)
+        self.assertTrue(index.reachable(3, 1))
+
+    def test_memory_usage(self):
+        memory_usage = self.index.memory_usage()
+        self.assertEqual(set(memory_usage), {'ids', 'component', 'closure'})
+        self.assertEqual(memory_usage['component'], 9 * self.index.component.itemsize)
+
+
+unittest.main(verbosity=2)
@@ -0,0 +1,214 @@
+"""Python3 implementation of Tarjan's algorithm for the Strongly Connected Components (SCC) of a directed graph
+
+Two nodes of a directed graph are in the same strongly connected component if each of them can be reached from the
+other one. Contracting every component to a single node gives the condensation of the graph, which is always
+acyclic, and can therefore be sorted topologically, for example with dfs_top_sort from topological_sorting.py.
+
+Tarjan's algorithm finds all the components with a single depth first search. Every node gets an index, in the
+order in which it is discovered, and a low value, which is the smallest index of a node on the stack reachable from
+the subtree of the node. A node whose low value equals its own index is the root of a component, consisting of the
+nodes above it on the stack. The below implementation keeps its own stack of (node, position of the next neighbor)
+pairs instead of recursing, so that it works on graphs of any depth, and stores the indices, low values and component
+ids in flat arrays indexed by integer node ids.
+
+Tarjan's algorithm finds the components in reverse topological order of the condensation: the first component found
+has no edges towards components found after it.
+
+The file contains the following classes:
+    Graph - implementation of a directed graph using adjacency list, same as in topological_sorting.py
+
+    TestSCC - test cases for the implementation of Tarjan's algorithm
+
+The file contains the following functions
+    * tarjan_scc - takes as input a directed graph, and returns the list of nodes together with an array of
+        component ids, where component[i] is the id of the component of nodes[i]; the ids are numbered from 0,
+        in reverse topological order of the condensation
+
+    * strongly_connected_components - takes as input a directed graph, and returns a list of components,
+        each represented as a list of nodes, in topological order of the condensation
+
+    * condensation - takes as input a directed graph, and returns the condensation as a Graph whose nodes are the
+        component ids, together with a dictionary storing the component id of every node
+"""
+
+from array import array
+from collections import defaultdict
+import unittest
+
+
+class Graph:
+    """
+    An implementation of a directed graph using adjacency list representation
+
+    Attributes
+    ----------
+
+        nodes : set
+            a set consisting of all the nodes in the graph
+
+        edges : dict
+            a dictionary storing all edges, in the format node : [list of neighboring nodes]
+
+
+    Methods
+    ----------
+
+        add_node(node)
+            adds node to graph
+
+        add_edge (from_node, to_node)
+            adds from_node and to_node to the graph
+            adds the edge between from_node and to_node
+            adds to_node to the neighbors of from_node
+    """
+    def __init__(self):
+        self.nodes = set()
+        self.edges = defaultdict(list)
+
+    def add_node(self, node):
+        self.nodes.add(node)
+
+    def add_edge(self, from_node, to_node):
+        # first add the two nodes to the graph.nodes, in case we forgot to do this before
+        self.add_node(from_node)
+        self.add_node(to_node)
+
+        # add the edge in the graph
+        self.edges[from_node].append(to_node)
+
+
+def tarjan_scc(graph):
+    # sort the nodes when possible, so that the component ids do not depend on the order of the set graph.nodes
+    try:
+        nodes = sorted(graph.nodes)
+    except TypeError:
+        nodes = list(graph.nodes)
+    ids = {node: idx for idx, node in enumerate(nodes)}
+    adjacency = [[ids[neighbor] for neighbor in graph.edges[node]] for node in nodes]
+    n = len(nodes)
+
+    index = array('l', [-1]) * n
+    low = array('l', [0]) * n
+    on_stack = bytearray(n)
+    component = array('l', [-1]) * n
+    next_index = 0
+    component_count = 0
+    stack = []
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        # the pairs (node, position of the next neighbor to explore) of the current depth first search path
+        work = [(root, 0)]
+        while work:
+            node, position = work[-1]
+            if position == 0 and index[node] == -1:
+                # first time we see node
+                index[node] = low[node] = next_index
+                next_index += 1
+                stack.append(node)
+                on_stack[node] = 1
+
+            neighbors = adjacency[node]
+            if position < len(neighbors):
+                work[-1] = (node, position + 1)
+                neighbor = neighbors[position]
+                if index[neighbor] == -1:
+                    work.append((neighbor, 0))
+                elif on_stack[neighbor]:
+                    low[node] = min(low[node], index[neighbor])
+                continue
+
+            # all the neighbors of node were explored
+            work.pop()
+            if low[node] == index[node]:
+                # node is the root of a component, consisting of the nodes above it on the stack
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component[member] = component_count
+                    if member == node:
+                        break
+                component_count += 1
+
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+    return nodes, component
+
+
+def strongly_connected_components(graph):
+    nodes, component = tarjan_scc(graph)
+    components = [[] for _ in range(max(component, default=-1) + 1)]
+    for node, component_id in zip(nodes, component):
+        components[component_id].append(node)
+
+    # the ids are in reverse topological order
+    components.reverse()
+    return components
+
+
+def condensation(graph):
+    nodes, component = tarjan_scc(graph)
+    component_of = dict(zip(nodes, component))
+
+    condensed_graph = Graph()
+    for component_id in component:
+        condensed_graph.add_node(component_id)
+
+    # keep a single edge between two components, and no edges inside a component
+    added_edges = set()
+    for node in nodes:
+        for neighbor in graph.edges[node]:
+            edge = (component_of[node], component_of[neighbor])
+            if edge[0] != edge[1] and edge not in added_edges:
+                added_edges.add(edge)
+                condensed_graph.add_edge(*edge)
+
+    return condensed_graph, component_of
+
+
+class TestSCC(unittest.TestCase):
+    """Test case taken from Cormen, Chapter 22.5, Figure 22.9"""
+
+    def setUp(self):
+        self.graph = Graph()
+        for from_node, to_node in ['ab', 'bc', 'be', 'bf', 'cd', 'cg', 'dc', 'dh', 'ea', 'ef', 'fg', 'gf', 'gh', 'hh']:
+            self.graph.add_edge(from_node, to_node)
+
+    def test_tarjan_scc(self):
+        nodes, component = tarjan_scc(self.graph)
+        self.assertEqual(nodes, ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h'])
+        self.assertEqual(list(component), [3, 3, 2, 2, 3, 1, 1, 0])
+
+    def test_strongly_connected_components(self):
+        actual = strongly_connected_components(self.graph)
+        expected = [['a', 'b', 'e'], ['c', 'd'], ['f', 'g'], ['h']]
+        self.assertEqual(actual, expected)
+
+    def test_condensation(self):
+        condensed_graph, component_of = condensation(self.graph)
+        self.assertEqual(condensed_graph.nodes, {0, 1, 2, 3})
+        self.assertEqual(sorted(condensed_graph.edges[3]), [1, 2])
+        self.assertEqual(sorted(condensed_graph.edges[2]), [0, 1])
+        self.assertEqual(condensed_graph.edges[1], [0])
+        self.assertEqual(condensed_graph.edges[0], [])
+        self.assertEqual(component_of['e'], 3)
+
+    def test_long_cycle(self):
+        # a cycle much longer than the default recursion limit, plus one node outside of it
+        graph = Graph()
+        for node in range(100000):
+            graph.add_edge(node, (node + 1) % 100000)
+        graph.add_edge(0, -1)
+        components = strongly_connected_components(graph)
+        self.assertEqual(len(components), 2)
+        self.assertEqual(len(components[0]), 100000)
+        self.assertEqual(components[1], [-1])
+
+
+# other files import tarjan_scc, so the tests only run when this file is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
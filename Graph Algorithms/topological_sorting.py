@@ -19,7 +19,20 @@ The file contains the following functions
         and a boolean indicating whether we have found a cycle or not. As long as we have not encountered
         any cycles, the function performs a standard depth first search, and adds the nodes that were visited
         to a list. After all the nodes have been visited, the list of nodes will contain the graph nodes, in
-        inverse topological order."""
+        inverse topological order.
+
+    * kahn_top_sort - non-recursive function that takes as input a directed graph and returns a tuple
+        (nodes_list, cycle). It repeatedly removes the nodes that have no incoming edges left (Kahn's algorithm).
+        If the graph is acyclic, nodes_list contains a topological sorting of the vertices and cycle is None.
+        Otherwise, nodes_list is empty and cycle is a list of nodes forming a cycle, in the order of its edges
+
+    * kahn_levels - same as kahn_top_sort, but returns the nodes grouped in levels: the first level contains
+        the nodes without incoming edges, and every other level contains the nodes whose incoming edges all come
+        from the previous levels. The nodes in the same level do not depend on each other, so they can be
+        processed in parallel
+
+    * find_cycle - auxiliary function used by kahn_levels, that takes as input a graph and the set of nodes that
+        Kahn's algorithm could not remove, and returns a cycle among them"""
 
 from collections import defaultdict
 import unittest
@@ -107,6 +120,68 @@ def dfs_visit(graph, node, color, nodes_list, found_cycle):
     nodes_list.append(node)
 
 
+def kahn_top_sort(graph):
+    levels, cycle = kahn_levels(graph)
+    return [node for level in levels for node in level], cycle
+
+
+def kahn_levels(graph):
+    # count the incoming edges of every node
+    in_degree = {node: 0 for node in graph.nodes}
+    for node in graph.nodes:
+        for neighbor in graph.edges[node]:
+            in_degree[neighbor] += 1
+
+    # the current level consists of the nodes without incoming edges left
+    level = [node for node in graph.nodes if in_degree[node] == 0]
+    levels = []
+    sorted_count = 0
+
+    while level:
+        levels.append(level)
+        sorted_count += len(level)
+        next_level = []
+        for node in level:
+            # remove the edges leaving node
+            for neighbor in graph.edges[node]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    next_level.append(neighbor)
+        level = next_level
+
+    if sorted_count < len(graph.nodes):
+        # the nodes that still have incoming edges all lie on, or after, a cycle
+        remaining = {node for node in graph.nodes if in_degree[node] > 0}
+        return [], find_cycle(graph, remaining)
+
+    return levels, None
+
+
+def find_cycle(graph, remaining):
+    # every remaining node has an incoming edge from another remaining node, so walking backwards
+    # along these edges must eventually reach a node for the second time
+    predecessor = {}
+    for node in remaining:
+        for neighbor in graph.edges[node]:
+            if neighbor in remaining:
+                predecessor[neighbor] = node
+
+    current = next(iter(remaining))
+    seen = set()
+    while current not in seen:
+        seen.add(current)
+        current = predecessor[current]
+
+    # current is on the cycle, so walk around it once more to collect it
+    cycle = [current]
+    node = predecessor[current]
+    while node != current:
+        cycle.append(node)
+        node = predecessor[node]
+    cycle.reverse()
+    return cycle
+
+
 class TestTopSort(unittest.TestCase):
 
     def setUp(self):
@@ -136,5 +211,34 @@ class TestTopSort(unittest.TestCase):
         expected = 'the given graph has a cycle'
         self.assertEqual(actual, expected)
 
+    def test_kahn_top_sort_1(self):
+        actual = kahn_top_sort(self.graph_1)
+        expected = (['A', 'B', 'C', 'D', 'E', 'F'], None)
+        self.assertEqual(actual, expected)
+
+    def test_kahn_top_sort_2(self):
+        nodes_list, cycle = kahn_top_sort(self.graph_2)
+        self.assertEqual(nodes_list, [])
+        self.assertIn(cycle, [['B', 'C', 'D'], ['C', 'D', 'B'], ['D', 'B', 'C']])
+
+    def test_kahn_levels(self):
+        graph = Graph()
+        graph.add_edge('A', 'C')
+        graph.add_edge('B', 'C')
+        graph.add_edge('C', 'D')
+        graph.add_edge('C', 'E')
+        graph.add_edge('A', 'E')
+        levels, cycle = kahn_levels(graph)
+        self.assertEqual([sorted(level) for level in levels], [['A', 'B'], ['C'], ['D', 'E']])
+        self.assertIsNone(cycle)
+
+    def test_kahn_long_chain(self):
+        # a chain much longer than the default recursion limit
+        graph = Graph()
+        for node in range(100000):
+            graph.add_edge(node, node + 1)
+        nodes_list, cycle = kahn_top_sort(graph)
+        self.assertEqual(nodes_list, list(range(100001)))
+
 
 unittest.main(verbosity=2)
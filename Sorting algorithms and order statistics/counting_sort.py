@@ -8,6 +8,10 @@ output in the same order the appear in the input. This is essential for other al
 sort as a subroutine, for example radix sort. For more details, see Chapter 8.2 from 3rd edition of
 Cormen - Introduction to Algorithms.
 
+Same as the built-in sorted, count_sort can also sort arbitrary elements by key(element), which has to be an integer
+from the set {0,1, ..., k} and is computed exactly once for every element, and in descending order with
+reverse=True. The output is stable in both cases.
+
 The file also contains the class TestCountSort, which provides several test cases for the below implementation
 of counting sort.
 """
@@ -15,30 +19,36 @@ of counting sort.
 import unittest
 
 
-def count_sort(arr, k):
+def count_sort(arr, k, key=None, reverse=False):
+    # compute every key exactly once, into a list parallel to arr; without a key, the elements are their own keys
+    keys = arr if key is None else [key(element) for element in arr]
+
     # initialize the array that will track the elements of the input array
     track_array = [0] * (k+1)
 
     # store in track_array[j] how many elements in arr are equal to j
     n = len(arr)
     for j in range(n):
-        track_array[arr[j]] += 1
-
-    # store in track_array[j] how many elements in arr are <= j
-    for j in range(1, k+1):
-        track_array[j] += track_array[j-1]
+        track_array[keys[j]] += 1
 
-    print(track_array)
+    if reverse:
+        # store in track_array[j] how many elements in arr are >= j
+        for j in range(k-1, -1, -1):
+            track_array[j] += track_array[j+1]
+    else:
+        # store in track_array[j] how many elements in arr are <= j
+        for j in range(1, k+1):
+            track_array[j] += track_array[j-1]
 
     # based on the info in track_array, we sort the elements in arr, in a stable way
     sorted_array = [0] * n
     for j in range(n - 1, -1, -1):
-        # there are track_array[arr[j]] elements in arr that are <= arr[j], so arr[j] has to occupy this index
-        # the -1 comes from the fact that we start indexing from 0
-        sorted_array[track_array[arr[j]]-1] = arr[j]
+        # there are track_array[keys[j]] elements in arr that come before arr[j] or are equal to it, so arr[j]
+        # has to occupy this index; the -1 comes from the fact that we start indexing from 0
+        sorted_array[track_array[keys[j]]-1] = arr[j]
 
         # decrement the count after placing arr[j] in the right position
-        track_array[arr[j]] -= 1
+        track_array[keys[j]] -= 1
 
     return sorted_array
 
@@ -72,5 +82,20 @@ class TestCountSort(unittest.TestCase):
         expected = []
         self.assertEqual(actual, expected)
 
+    def test_key_and_reverse(self):
+        records = [('b', 2), ('a', 3), ('c', 1), ('d', 3), ('e', 2), ('f', 1)]
+        actual = count_sort(records, 3, key=lambda record: record[1])
+        expected = [('c', 1), ('f', 1), ('b', 2), ('e', 2), ('a', 3), ('d', 3)]
+        self.assertEqual(actual, expected)
+
+        # the order of equal elements is kept in descending order too
+        actual = count_sort(records, 3, key=lambda record: record[1], reverse=True)
+        expected = [('a', 3), ('d', 3), ('b', 2), ('e', 2), ('c', 1), ('f', 1)]
+        self.assertEqual(actual, expected)
+
+        actual = count_sort(self.array_to_sort_1, 9, reverse=True)
+        expected = [9, 6, 5, 5, 5, 5, 5, 4, 3, 3, 2, 1, 1]
+        self.assertEqual(actual, expected)
+
 
 unittest.main(verbosity=2)
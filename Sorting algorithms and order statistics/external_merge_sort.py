@@ -0,0 +1,255 @@
+""" Python3 implementation of external merge sort, for sorting more numbers than fit in memory.
+
+merge_sort from merge_sort.py needs the whole array in memory. External merge sort only keeps a bounded number of
+elements in memory at any time, and works in two phases:
+    * the input is read in chunks that fit in the memory budget; every chunk is sorted in memory and written to a
+    temporary file (a sorted run). The chunks are independent of each other, so they can be sorted by a pool of
+    worker processes, each of them writing its own run
+    * the runs are merged with a k-way merge: a min heap holds the smallest element not yet merged of every run,
+    so that the smallest element overall is always at the top of the heap. The runs are read back in blocks, and
+    at most fan_in runs are merged at once; if there are more runs than that, groups of fan_in runs are first
+    merged into longer runs, until at most fan_in runs are left
+The sorted numbers are produced by a generator, as they come out of the final merge, so that they can be written to
+a file or processed without ever holding them all in memory.
+
+The elements are numbers of a single type, given by a typecode of the Python array module (e.g. 'd' for floats,
+'q' for 64 bit integers), and the runs are stored in the compact binary format of the array module, itemsize bytes
+per element. A chunk is also held in memory as an array, but the built-in sort works on a list of Python numbers:
+every element then takes about BOXED_SIZE = 40 more bytes (8 for the list slot and up to 32 for the number object)
+on top of its itemsize bytes in the array. With several workers, the main process also keeps every chunk in flight
+as the argument of its future, and only reads the next chunk once a worker is done, so it holds at most workers
+chunks. The chunk size accounts for this, so that the peak memory of the elements while sorting, about
+itemsize + BOXED_SIZE bytes per chunk element with a single process and workers * (2 * itemsize + BOXED_SIZE)
+bytes with several workers (the boxed chunk of every worker plus the chunks held by the main process), stays within
+memory_budget. For a discussion of external sorting, see for example Chapter 5.4 in Knuth - The Art of Computer
+Programming, Volume 3.
+
+The file contains the following functions
+    * external_sort - takes as input an iterable of numbers, and yields them in ascending order; memory_budget is the
+    approximate number of bytes used for the elements held in memory, fan_in the maximum number of runs merged at
+    once, and workers the number of processes sorting the chunks
+
+    * external_sort_file - same as external_sort, but reads the numbers from a binary file and writes the sorted
+    numbers to another binary file, both in the format of the array module
+
+    * read_numbers - takes as input the path of a binary file, and yields the numbers stored in it, reading them
+    in blocks
+
+    * sort_run - auxiliary function that sorts a chunk of numbers and writes it to a run file, in blocks
+
+    * merge_runs - auxiliary function that takes as input a list of run files, and yields their numbers in ascending
+    order, using a min heap
+
+    * write_numbers - auxiliary function that writes an iterable of numbers to a binary file, in blocks
+"""
+
+from array import array
+import concurrent.futures
+import heapq
+import os
+import random
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+
+# the approximate number of bytes taken by every element of a chunk while it is sorted, in addition to its itemsize
+# bytes in the array: a pointer in the list, and the Python int or float object it points to
+BOXED_SIZE = 40
+
+
+def external_sort(numbers, typecode='d', memory_budget=1 << 26, fan_in=16, workers=1, temp_dir=None):
+    assert fan_in >= 2, "Cannot merge fewer than two runs at once"
+
+    itemsize = array(typecode).itemsize
+    # every worker holds one chunk while sorting it, boxed as a list of Python numbers, and with several workers
+    # the main process holds one more copy of every chunk in flight
+    element_size = workers * (itemsize + BOXED_SIZE) + (workers * itemsize if workers > 1 else 0)
+    chunk_size = max(1, memory_budget // element_size)
+    # during a merge, every run holds one block in memory
+    block_size = max(1, memory_budget // (itemsize * (fan_in + 1)))
+
+    run_dir = tempfile.mkdtemp(dir=temp_dir)
+    try:
+        paths = _sorted_runs(numbers, typecode, chunk_size, workers, run_dir)
+
+        # merge groups of fan_in runs into longer runs, until one final merge is enough
+        run_count = len(paths)
+        while len(paths) > fan_in:
+            merged_paths = []
+            for i in range(0, len(paths), fan_in):
+                group = paths[i: i + fan_in]
+                if len(group) == 1:
+                    merged_paths.append(group[0])
+                    continue
+                path = os.path.join(run_dir, 'run_%d' % run_count)
+                run_count += 1
+                write_numbers(merge_runs(group, typecode, block_size), path, typecode, block_size)
+                for merged_path in group:
+                    os.remove(merged_path)
+                merged_paths.append(path)
+            paths = merged_paths
+
+        yield from merge_runs(paths, typecode, block_size)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def _chunks(numbers, typecode, chunk_size):
+    chunk = array(typecode)
+    for number in numbers:
+        chunk.append(number)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = array(typecode)
+    if chunk:
+        yield chunk
+
+
+def _sorted_runs(numbers, typecode, chunk_size, workers, run_dir):
+    paths = []
+    chunks = enumerate(_chunks(numbers, typecode, chunk_size))
+
+    if workers == 1:
+        for i, chunk in chunks:
+            paths.append(sort_run(chunk, os.path.join(run_dir, 'run_%d' % i)))
+        return paths
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep at most one chunk per worker in flight, and wait for a worker to finish before reading the next
+        # chunk, as the pending futures keep their chunks alive, so that the memory budget holds
+        pending = set()
+        for i, chunk in chunks:
+            pending.add(executor.submit(sort_run, chunk, os.path.join(run_dir, 'run_%d' % i)))
+            if len(pending) == workers:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                paths.extend(future.result() for future in done)
+        paths.extend(future.result() for future in concurrent.futures.as_completed(pending))
+
+    # keep the runs in the order of the input, so that the merges do not depend on the scheduling of the workers
+    paths.sort(key=lambda path: int(path.rsplit('_', 1)[1]))
+    return paths
+
+
+def sort_run(chunk, path, block_size=1 << 12):
+    # the chunk fits in memory, so it is sorted with the built-in sort (Timsort, a hybrid of merge sort
+    # and insertion sort); the sorted list is written back in blocks, so that it is never copied into a second
+    # array of the size of the chunk
+    numbers = chunk.tolist()
+    numbers.sort()
+    with open(path, 'wb') as run_file:
+        for i in range(0, len(numbers), block_size):
+            array(chunk.typecode, numbers[i: i + block_size]).tofile(run_file)
+    return path
+
+
+def read_numbers(path, typecode='d', block_size=1 << 16):
+    with open(path, 'rb') as number_file:
+        while True:
+            block = array(typecode)
+            block.frombytes(number_file.read(block_size * block.itemsize))
+            if not block:
+                return
+            yield from block
+
+
+def merge_runs(paths, typecode, block_size):
+    runs = [read_numbers(path, typecode, block_size) for path in paths]
+
+    # the heap stores pairs (number, run index); the run index breaks ties, so that equal numbers come out
+    # in the order of the runs
+    heap = []
+    for run_index, run in enumerate(runs):
+        for number in run:
+            heap.append((number, run_index))
+            break
+    heapq.heapify(heap)
+
+    while heap:
+        number, run_index = heap[0]
+        yield number
+        # replace the top of the heap with the next number of the same run, or remove it if the run is over
+        for next_number in runs[run_index]:
+            heapq.heapreplace(heap, (next_number, run_index))
+            break
+        else:
+            heapq.heappop(heap)
+
+
+def write_numbers(numbers, path, typecode='d', block_size=1 << 16):
+    with open(path, 'wb') as number_file:
+        block = array(typecode)
+        for number in numbers:
+            block.append(number)
+            if len(block) == block_size:
+                block.tofile(number_file)
+                block = array(typecode)
+        block.tofile(number_file)
+
+
+def external_sort_file(input_path, output_path, typecode='d', memory_budget=1 << 26, fan_in=16, workers=1,
+                       temp_dir=None):
+    block_size = max(1, memory_budget // (16 * array(typecode).itemsize))
+    numbers = read_numbers(input_path, typecode, block_size)
+    sorted_numbers = external_sort(numbers, typecode, memory_budget, fan_in, workers, temp_dir)
+    write_numbers(sorted_numbers, output_path, typecode, block_size)
+
+
+class TestExternalMergeSort(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.numbers = [rng.randint(-1000, 1000) for _ in range(5000)]
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_in_memory(self):
+        # a budget large enough for all the numbers gives a single run
+        actual = list(external_sort(self.numbers, 'q'))
+        self.assertEqual(actual, sorted(self.numbers))
+
+    def test_many_runs(self):
+        # 64 numbers per chunk gives 79 runs, merged 4 at a time in several passes
+        actual = list(external_sort(self.numbers, 'q', memory_budget=48 * 64, fan_in=4, temp_dir=self.temp_dir))
+        self.assertEqual(actual, sorted(self.numbers))
+        # the temporary runs are removed
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_memory_budget(self):
+        # the chunks are sized for the boxed numbers of the sort, so the peak memory stays within the budget
+        rng = random.Random(12)
+        numbers = [rng.random() for _ in range(60000)]
+        memory_budget = 1 << 20
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in external_sort(iter(numbers), memory_budget=memory_budget, temp_dir=self.temp_dir))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(count, 60000)
+        self.assertLessEqual(peak, memory_budget)
+
+    def test_parallel(self):
+        actual = list(external_sort(self.numbers, 'q', memory_budget=8 * 1000, fan_in=3, workers=4))
+        self.assertEqual(actual, sorted(self.numbers))
+
+    def test_floats_and_edge_cases(self):
+        numbers = [0.5, -2.25, 1e10, 0.5, float('-inf')]
+        self.assertEqual(list(external_sort(numbers, memory_budget=8, fan_in=2)), sorted(numbers))
+        self.assertEqual(list(external_sort([], memory_budget=8)), [])
+        self.assertEqual(list(external_sort([3], memory_budget=8)), [3])
+
+    def test_files(self):
+        input_path = os.path.join(self.temp_dir, 'input')
+        output_path = os.path.join(self.temp_dir, 'output')
+        write_numbers(self.numbers, input_path, 'l', block_size=100)
+        external_sort_file(input_path, output_path, 'l', memory_budget=8 * 500, fan_in=4, workers=2)
+        self.assertEqual(list(read_numbers(output_path, 'l', block_size=7)), sorted(self.numbers))
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['input', 'output'])
+
+
+# the worker processes may import this file, so the tests only run when it is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -7,12 +7,21 @@ While the below implementation of the auxiliary function max_heapify is recursiv
 iterative procedure, making the heap_sort procedure have O(1) space complexity.
 
 The file contains the following functions
-    * heap_sort - function that takes as input an array and sorts its elements in ascending order
+    * heap_sort - function that takes as input an array and sorts its elements in ascending order. Same as the
+    built-in sorted, the elements can be compared by key(element) instead of the elements themselves, in which case
+    every key is computed exactly once into a list parallel to the array, and sorted in descending order with
+    reverse=True; heap sort is not stable, so equal elements may change their order. If start_index and end_index
+    are given, only the elements between them (inclusive) are sorted.
+
+    * heap_sort_keys - same as heap_sort, but takes as input an array, an optional list of keys parallel to it, and
+    the range to sort; it is also used by introsort in quick_sort_randomized.py, which computes the keys beforehand.
 
     * max_heapify - auxiliary function used by heap_sort; it takes as input an array, a start_index and a heap_size;
     the function assumes that the input array satisfies the max heap property starting from both left(start_index)
     right(start_index), but that start_index might be smaller than its children, thus violating the max heap property.
-    For more details, see Chapter 6.2 in 3rd edition of Cormen - Introduction to Algorithms.
+    For more details, see Chapter 6.2 in 3rd edition of Cormen - Introduction to Algorithms. If a list of keys is
+    given, the elements are compared by their keys, and every key is moved together with its element. The heap can
+    start at any offset of the array, in which case start_index is relative to the offset.
 
 The file also contains the TestHeapSort class, which provides several test cases for the implemented function.
 """
@@ -20,34 +29,63 @@ The file also contains the TestHeapSort class, which provides several test cases
 import unittest
 
 
-def heap_sort(arr):
-    n = len(arr)
-    for start_index in range(n, -1, -1):
-        max_heapify(arr, start_index, n)
+def heap_sort(arr, key=None, reverse=False, start_index=0, end_index=None):
+    if end_index is None:
+        end_index = len(arr) - 1
+
+    # compute every key exactly once, into a list parallel to arr; only the keys of the sorted range are needed
+    keys = None
+    if key is not None:
+        keys = [None] * len(arr)
+        for i in range(start_index, end_index + 1):
+            keys[i] = key(arr[i])
+
+    heap_sort_keys(arr, keys, start_index, end_index)
+
+    # heap sort is not stable, so the descending order is simply the ascending order reversed
+    if reverse:
+        arr[start_index: end_index + 1] = arr[start_index: end_index + 1][::-1]
+
+
+def heap_sort_keys(arr, keys, start_index, end_index):
+    # same as heap_sort, with the keys already computed; the heap is arr[start_index: end_index + 1], and the
+    # positions given to max_heapify are relative to start_index
+    n = end_index - start_index + 1
+    for position in range(n // 2 - 1, -1, -1):
+        max_heapify(arr, position, n, keys, start_index)
 
     # now one by one sort and extract elements
     for heap_size in range(n-1, 0, -1):
         # move the largest element on the last entry
-        arr[0], arr[heap_size] = arr[heap_size], arr[0]
+        last = start_index + heap_size
+        arr[start_index], arr[last] = arr[last], arr[start_index]
+        if keys is not None:
+            keys[start_index], keys[last] = keys[last], keys[start_index]
 
         # leave the last element untouched and repeat for the remaining array
-        max_heapify(arr, 0, heap_size)
+        max_heapify(arr, 0, heap_size, keys, start_index)
+
 
+def max_heapify(arr, start_index, heap_size, keys=None, offset=0):
+    # the elements are compared by their keys, if there are any
+    compared = arr if keys is None else keys
 
-def max_heapify(arr, start_index, heap_size):
     left_child_index = 2 * start_index + 1
     right_child_index = 2 * start_index + 2
 
     largest = start_index
-    if left_child_index < heap_size and arr[largest] < arr[left_child_index]:
+    if left_child_index < heap_size and compared[offset + largest] < compared[offset + left_child_index]:
         largest = left_child_index
 
-    if right_child_index < heap_size and arr[largest] < arr[right_child_index]:
+    if right_child_index < heap_size and compared[offset + largest] < compared[offset + right_child_index]:
         largest = right_child_index
 
     if largest != start_index:
-        arr[start_index], arr[largest] = arr[largest], arr[start_index]
-        max_heapify(arr, largest, heap_size)
+        i, j = offset + start_index, offset + largest
+        arr[i], arr[j] = arr[j], arr[i]
+        if keys is not None:
+            keys[i], keys[j] = keys[j], keys[i]
+        max_heapify(arr, largest, heap_size, keys, offset)
 
 
 class TestHeapSort(unittest.TestCase):
@@ -83,5 +121,39 @@ class TestHeapSort(unittest.TestCase):
         expected = []
         self.assertEqual(actual, expected)
 
+    def test_key_and_reverse(self):
+        records = [('b', 2), ('a', 3), ('c', 1), ('d', 4), ('e', 0)]
+        heap_sort(records, key=lambda record: record[1])
+        self.assertEqual(records, [('e', 0), ('c', 1), ('b', 2), ('a', 3), ('d', 4)])
+
+        heap_sort(records, key=lambda record: record[0], reverse=True)
+        self.assertEqual(records, [('e', 0), ('d', 4), ('c', 1), ('b', 2), ('a', 3)])
+
+        heap_sort(self.array_to_sort_1, reverse=True)
+        self.assertEqual(self.array_to_sort_1, [44, 14, 8, 7, 1, 0.2, -19])
+
+        # every key is computed once
+        calls = []
+        arr = [5, -3, 3, -5, 1, 0, -1]
+        heap_sort(arr, key=lambda element: calls.append(element) or abs(element))
+        self.assertEqual([abs(element) for element in arr], [0, 1, 1, 3, 3, 5, 5])
+        self.assertEqual(len(calls), 7)
+
+    def test_range(self):
+        # only the given range is sorted, with or without keys
+        arr = [5, 9, 1, 8, 2, 7, 0]
+        heap_sort(arr, start_index=1, end_index=5)
+        self.assertEqual(arr, [5, 1, 2, 7, 8, 9, 0])
+
+        arr = [5, 9, 1, 8, 2, 7, 0]
+        heap_sort(arr, key=lambda element: -element, start_index=1, end_index=5)
+        self.assertEqual(arr, [5, 9, 8, 7, 2, 1, 0])
+
+        arr = [5, 9, 1, 8, 2, 7, 0]
+        heap_sort(arr, reverse=True, start_index=2, end_index=6)
+        self.assertEqual(arr, [5, 9, 8, 7, 2, 1, 0])
+
 
-unittest.main(verbosity=2)
+# other files import heap_sort_keys, so the tests only run when this file is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
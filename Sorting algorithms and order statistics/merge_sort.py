@@ -10,24 +10,60 @@ The file contains the following functions
     * merge_sort - recursive function that takes as input an array, a start index and an end index,
     and sorts the input array between the two given indices (inclusive) in ascending order. The function
     is designed to have default arguments, so that it can also be called in the natural way, by giving it
-    only the array as input, when we want to sort the entire array.
+    only the array as input, when we want to sort the entire array. Same as the built-in sorted, the
+    elements can be compared by key(element) instead of the elements themselves, and sorted in descending
+    order with reverse=True; equal elements keep their order in both cases, as merge sort is stable.
+
+    * merge_sort_keys - auxiliary function used by merge_sort when a key is given; it sorts an array together
+    with a parallel list of keys, in which every key is computed exactly once
 
     * merge - auxiliary function used by merge_sort; it takes as input an array and three indices
     start, middle, end and assumes that the input array is sorted in ascending order
     between start and middle (inclusive) and between middle and end (inclusive), respectively; the
     function returns an array containing all elements between start and end of the input array, sorted in
-    ascending order.
+    ascending order. If a list of keys is given, it uses merge_keys instead.
+
+    * merge_keys - same as merge, but compares the elements by a parallel list of keys, and moves every key together
+    with its element
+
+    * bottom_up_merge_sort - non-recursive version of merge_sort, with the same arguments; it first splits the
+    array into natural runs, i.e. maximal ascending or strictly descending sequences (the latter are reversed
+    in place), extends the runs shorter than cutoff with insertion sort, and then merges neighboring runs pass by
+    pass, until a single run is left. All the merges share one auxiliary buffer, allocated once for the whole
+    sort, and two runs that are already in order are not merged at all, so that an already sorted (or reverse
+    sorted) array is sorted in O(n) time, and an array made of r runs in O(n*log(r)) time.
+
+    * bottom_up_merge_sort_keys - auxiliary function used by bottom_up_merge_sort, that sorts an array together with
+    an optional parallel list of keys, same as merge_sort_keys
+
+    * natural_runs - auxiliary function used by bottom_up_merge_sort; it takes as input an array, a start index,
+    an end index and a cutoff, and returns the list of the start indices of the runs, followed by end index + 1
+
+    * insertion_sort - auxiliary function used by bottom_up_merge_sort; it sorts the input array between a start
+    index and an end index (inclusive), assuming that the elements before a given index are already sorted
+
+    * merge_runs - auxiliary function used by bottom_up_merge_sort; same as merge, but copies only the left run
+    into the given buffer, and merges directly into the input array
+
+    * sort_by_key - auxiliary function used by the sorting functions above when a key is given or reverse is True;
+    it computes all the keys into a list, sorts the elements together with their keys, and puts them back into
+    the input array
 
 The file also contains the TestMergeSort class, which provides several test cases for the implemented function.
 """
 
+import random
 import unittest
 
 
-def merge_sort(arr, start_index=0, end_index=None):
+def merge_sort(arr, start_index=0, end_index=None, key=None, reverse=False):
     if end_index is None:
         end_index = len(arr) - 1
 
+    if key is not None or reverse:
+        sort_by_key(arr, start_index, end_index, key, reverse, merge_sort_keys)
+        return
+
     if start_index < end_index:
         middle_index = (start_index + end_index) // 2
         merge_sort(arr, start_index, middle_index)
@@ -35,7 +71,19 @@ def merge_sort(arr, start_index=0, end_index=None):
         merge(arr, start_index, middle_index, end_index)
 
 
-def merge(arr, start_index, middle_index, end_index):
+def merge_sort_keys(arr, keys, start_index, end_index):
+    # same as merge_sort, but compares the keys and moves every key together with its element
+    if start_index < end_index:
+        middle_index = (start_index + end_index) // 2
+        merge_sort_keys(arr, keys, start_index, middle_index)
+        merge_sort_keys(arr, keys, middle_index + 1, end_index)
+        merge(arr, start_index, middle_index, end_index, keys)
+
+
+def merge(arr, start_index, middle_index, end_index, keys=None):
+    if keys is not None:
+        return merge_keys(arr, keys, start_index, middle_index, end_index)
+
     # calculate first the sizes of arr[start_index: middle_index] and arr[middle_index+1:]
     left_size = (middle_index - start_index + 1)
     right_size = (end_index - middle_index)
@@ -80,6 +128,196 @@ def merge(arr, start_index, middle_index, end_index):
     return arr
 
 
+def merge_keys(arr, keys, start_index, middle_index, end_index):
+    # same as merge, but compares the keys and moves every key together with its element
+    left_array = arr[start_index: middle_index + 1]
+    left_keys = keys[start_index: middle_index + 1]
+    right_array = arr[middle_index + 1: end_index + 1]
+    right_keys = keys[middle_index + 1: end_index + 1]
+    left_size = len(left_array)
+    right_size = len(right_array)
+
+    left_counter = 0
+    right_counter = 0
+    array_counter = start_index
+    while (left_counter < left_size) and (right_counter < right_size):
+        if left_keys[left_counter] <= right_keys[right_counter]:
+            arr[array_counter] = left_array[left_counter]
+            keys[array_counter] = left_keys[left_counter]
+            left_counter += 1
+        else:
+            arr[array_counter] = right_array[right_counter]
+            keys[array_counter] = right_keys[right_counter]
+            right_counter += 1
+        array_counter += 1
+
+    # copy the remaining elements of either side
+    remaining = left_size - left_counter
+    arr[array_counter: array_counter + remaining] = left_array[left_counter:]
+    keys[array_counter: array_counter + remaining] = left_keys[left_counter:]
+    array_counter += remaining
+    arr[array_counter: end_index + 1] = right_array[right_counter:]
+    keys[array_counter: end_index + 1] = right_keys[right_counter:]
+
+    return arr
+
+
+def bottom_up_merge_sort(arr, start_index=0, end_index=None, cutoff=32, key=None, reverse=False):
+    if end_index is None:
+        end_index = len(arr) - 1
+
+    if key is not None or reverse:
+        sort_by_key(arr, start_index, end_index, key, reverse,
+                    lambda items, keys, start, end: bottom_up_merge_sort_keys(items, keys, start, end, cutoff))
+        return
+
+    bottom_up_merge_sort_keys(arr, None, start_index, end_index, cutoff)
+
+
+def bottom_up_merge_sort_keys(arr, keys, start_index, end_index, cutoff=32):
+    # same as bottom_up_merge_sort; if keys is not None, it compares the keys and moves every key together
+    # with its element
+    if start_index >= end_index:
+        return
+
+    run_starts = natural_runs(arr, start_index, end_index, cutoff, keys)
+
+    # a single buffer for all the merges (and one for the keys); the left run of a merge is never longer than
+    # the whole range
+    buffer = [None] * (end_index - start_index + 1)
+    key_buffer = None if keys is None else [None] * (end_index - start_index + 1)
+
+    # merge the runs two by two, until there is a single run left
+    while len(run_starts) > 2:
+        merged_starts = []
+        for i in range(0, len(run_starts) - 2, 2):
+            merged_starts.append(run_starts[i])
+            merge_runs(arr, buffer, run_starts[i], run_starts[i + 1], run_starts[i + 2], keys, key_buffer)
+        # an odd run at the end is left for the next pass
+        if len(run_starts) % 2 == 0:
+            merged_starts.append(run_starts[-2])
+        merged_starts.append(run_starts[-1])
+        run_starts = merged_starts
+
+
+def natural_runs(arr, start_index, end_index, cutoff, keys=None):
+    # the elements are compared by their keys, if there are any
+    compared = arr if keys is None else keys
+
+    run_starts = []
+    run_start = start_index
+    while run_start <= end_index:
+        run_end = run_start + 1
+        if run_end <= end_index and compared[run_end] < compared[run_start]:
+            # a strictly descending run, which is reversed in place by swapping from both ends; equal elements
+            # would lose their order
+            while run_end <= end_index and compared[run_end] < compared[run_end - 1]:
+                run_end += 1
+            low, high = run_start, run_end - 1
+            while low < high:
+                arr[low], arr[high] = arr[high], arr[low]
+                if keys is not None:
+                    keys[low], keys[high] = keys[high], keys[low]
+                low += 1
+                high -= 1
+        else:
+            while run_end <= end_index and compared[run_end] >= compared[run_end - 1]:
+                run_end += 1
+
+        # extend short runs up to cutoff elements
+        if run_end - run_start < cutoff and run_end <= end_index:
+            extended_end = min(run_start + cutoff, end_index + 1)
+            insertion_sort(arr, run_start, extended_end - 1, run_end, keys)
+            run_end = extended_end
+
+        run_starts.append(run_start)
+        run_start = run_end
+
+    run_starts.append(end_index + 1)
+    return run_starts
+
+
+def insertion_sort(arr, start_index, end_index, sorted_until=None, keys=None):
+    if sorted_until is None:
+        sorted_until = start_index + 1
+    compared = arr if keys is None else keys
+
+    for i in range(sorted_until, end_index + 1):
+        element = arr[i]
+        element_key = compared[i]
+        j = i - 1
+        # strict comparison, so that equal elements keep their order
+        while j >= start_index and element_key < compared[j]:
+            arr[j + 1] = arr[j]
+            if keys is not None:
+                keys[j + 1] = keys[j]
+            j -= 1
+        arr[j + 1] = element
+        if keys is not None:
+            keys[j + 1] = element_key
+
+
+def merge_runs(arr, buffer, start_index, middle_index, end_index, keys=None, key_buffer=None):
+    # merges the sorted runs arr[start_index: middle_index] and arr[middle_index: end_index]
+    compared = arr if keys is None else keys
+
+    # the two runs are already in order, which is the common case for nearly sorted arrays
+    if compared[middle_index - 1] <= compared[middle_index]:
+        return
+
+    # copy the left run into the buffer element by element, as a slice would create a temporary list
+    left_size = middle_index - start_index
+    for i in range(left_size):
+        buffer[i] = arr[start_index + i]
+    if keys is None:
+        key_buffer = buffer
+    else:
+        for i in range(left_size):
+            key_buffer[i] = keys[start_index + i]
+
+    left_counter = 0
+    right_counter = middle_index
+    array_counter = start_index
+    while left_counter < left_size and right_counter < end_index:
+        if key_buffer[left_counter] <= compared[right_counter]:
+            arr[array_counter] = buffer[left_counter]
+            if keys is not None:
+                keys[array_counter] = key_buffer[left_counter]
+            left_counter += 1
+        else:
+            arr[array_counter] = arr[right_counter]
+            if keys is not None:
+                keys[array_counter] = keys[right_counter]
+            right_counter += 1
+        array_counter += 1
+
+    # the remaining elements of the right run are already in place
+    while left_counter < left_size:
+        arr[array_counter] = buffer[left_counter]
+        if keys is not None:
+            keys[array_counter] = key_buffer[left_counter]
+        left_counter += 1
+        array_counter += 1
+
+
+def sort_by_key(arr, start_index, end_index, key, reverse, sort_function):
+    # compute every key exactly once, into a list parallel to the elements of arr[start_index: end_index + 1]
+    items = arr[start_index: end_index + 1]
+    keys = list(items) if key is None else [key(item) for item in items]
+
+    # sorting the reversed range in ascending order and reversing the result gives the descending order,
+    # while equal elements keep their original order
+    if reverse:
+        items.reverse()
+        keys.reverse()
+
+    sort_function(items, keys, 0, len(items) - 1)
+
+    if reverse:
+        items.reverse()
+    arr[start_index: end_index + 1] = items
+
+
 class TestMergeSort(unittest.TestCase):
 
     def setUp(self):
@@ -113,5 +351,98 @@ class TestMergeSort(unittest.TestCase):
         expected = []
         self.assertEqual(actual, expected)
 
+    def test_bottom_up(self):
+        for arr, expected in [(self.array_to_sort_1, [-19, 0.2, 1, 7, 8, 14, 44]),
+                              (self.array_to_sort_2, [1, 3, 5, 7, 9, 11, 13]),
+                              (self.array_to_sort_3, [7, 8, 9]),
+                              (self.array_to_sort_4, [])]:
+            bottom_up_merge_sort(arr)
+            self.assertEqual(arr, expected)
+
+    def test_bottom_up_random(self):
+        rng = random.Random(5)
+        for size in [1, 2, 31, 32, 33, 100, 1000]:
+            for cutoff in [1, 4, 32]:
+                arr = [rng.randint(0, 50) for _ in range(size)]
+                expected = sorted(arr)
+                bottom_up_merge_sort(arr, cutoff=cutoff)
+                self.assertEqual(arr, expected)
+
+        # only the given range is sorted
+        arr = [5, 4, 3, 2, 1]
+        bottom_up_merge_sort(arr, 1, 3, cutoff=1)
+        self.assertEqual(arr, [5, 2, 3, 4, 1])
+
+    def test_natural_runs(self):
+        # an ascending run, a strictly descending run that is reversed, and a run of equal elements
+        arr = [1, 2, 3, 9, 7, 5, 5, 5]
+        self.assertEqual(natural_runs(arr, 0, len(arr) - 1, 1), [0, 4, 6, 8])
+        self.assertEqual(arr, [1, 2, 3, 9, 5, 7, 5, 5])
+
+        # the keys of a descending run are reversed together with the elements
+        arr = ['a', 'b', 'c', 'd', 'e']
+        keys = [5, 4, 3, 2, 1]
+        self.assertEqual(natural_runs(arr, 0, 4, 1, keys), [0, 5])
+        self.assertEqual((arr, keys), (['e', 'd', 'c', 'b', 'a'], [1, 2, 3, 4, 5]))
+
+    def test_key_and_reverse(self):
+        records = [('b', 2), ('a', 3), ('c', 1), ('d', 3), ('e', 2), ('f', 1)]
+        expected = sorted(records, key=lambda record: record[1])
+        expected_reversed = sorted(records, key=lambda record: record[1], reverse=True)
+        for sort_function in [merge_sort, lambda arr, **kwargs: bottom_up_merge_sort(arr, cutoff=2, **kwargs)]:
+            arr = list(records)
+            sort_function(arr, key=lambda record: record[1])
+            self.assertEqual(arr, expected)
+
+            arr = list(records)
+            sort_function(arr, key=lambda record: record[1], reverse=True)
+            self.assertEqual(arr, expected_reversed)
+
+            arr = [3, 1, 2]
+            sort_function(arr, reverse=True)
+            self.assertEqual(arr, [3, 2, 1])
+
+    def test_key_computed_once(self):
+        calls = []
+
+        def key(element):
+            calls.append(element)
+            return -element
+
+        rng = random.Random(4)
+        arr = [rng.randint(0, 1000) for _ in range(300)]
+        expected = sorted(arr, reverse=True)
+        merge_sort(arr, key=key)
+        self.assertEqual(arr, expected)
+        self.assertEqual(len(calls), 300)
+
+        # only the given range is sorted
+        arr = [5, 1, 4, 2, 3]
+        bottom_up_merge_sort(arr, 1, 3, key=key)
+        self.assertEqual(arr, [5, 4, 2, 1, 3])
+
+    def test_bottom_up_stable(self):
+        # elements compared by their first value only, so that the order of equal elements is visible
+        class Item:
+            def __init__(self, value, label):
+                self.value, self.label = value, label
+
+            def __lt__(self, other):
+                return self.value < other.value
+
+            def __le__(self, other):
+                return self.value <= other.value
+
+            def __ge__(self, other):
+                return self.value >= other.value
+
+        rng = random.Random(2)
+        items = [Item(rng.randint(0, 5), i) for i in range(200)]
+        for cutoff in [1, 8]:
+            arr = list(items)
+            bottom_up_merge_sort(arr, cutoff=cutoff)
+            self.assertEqual([(item.value, item.label) for item in arr],
+                             sorted((item.value, item.label) for item in items))
+
 
 unittest.main(verbosity=2)
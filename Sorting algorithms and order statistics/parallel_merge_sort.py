@@ -0,0 +1,273 @@
+""" Python3 implementation of a parallel merge sort for arrays of numbers, using several processes.
+
+merge_sort from merge_sort.py runs in a single process, and therefore on a single core. The below implementation
+splits the work between a pool of worker processes, in the same two phases as a bottom-up merge sort:
+    * the array is split into one partition per worker, and every worker sorts its partition
+    * neighboring sorted partitions are merged two by two, round after round, until a single one is left
+The numbers are never sent to the workers: the array is copied once into a block of shared memory (the
+multiprocessing.shared_memory module), which every worker maps into its own memory when it starts, and the tasks
+only consist of a few indices. A second block of the same size receives the result of every merge round, and the
+two blocks swap roles after each round.
+
+Merging two partitions is a single task, so that the later rounds would keep fewer and fewer workers busy, and the
+last round only one of them. To avoid this, every merge is split into pieces of equal size with the merge path
+technique (Odeh, Green, Mwassi, Shmueli and Birk, Merge Path - Parallel Merging Made Simple, 2012): for every
+position k of the merged output, a binary search finds how many of its first k elements come from the left
+partition, and the pieces between consecutive split positions are merged independently of each other.
+
+The numbers are of a single type, given by a typecode of the Python array module: the typecode of the array, or
+for a list the given typecode, by default 'q' (64 bit integers) if all the elements are integers and 'd' otherwise.
+The partitions are sorted, and
+the pieces merged, by the built-in sort (Timsort), which recognizes the two sorted runs of a piece and merges them
+in linear time.
+
+The file contains the following functions
+    * parallel_merge_sort - takes as input an array (from the array module) or a list of numbers, and sorts it in
+    ascending order, using the given number of worker processes
+
+    * merge_path - auxiliary function that takes as input two sorted ranges of an array and a position k, and
+    returns the number of elements of the left range among the first k elements of the merged output
+
+    * benchmark - sorts the same random array with different numbers of worker processes, and returns the
+    running time and the speedup versus a single process for each of them
+"""
+
+from array import array
+import concurrent.futures
+from multiprocessing import shared_memory
+import os
+import random
+import time
+import unittest
+
+
+def parallel_merge_sort(arr, typecode=None, workers=None):
+    if isinstance(arr, array):
+        typecode = arr.typecode
+    elif typecode is None:
+        # a list of integers is sorted as 64 bit integers, so that they come back exactly as they were given
+        typecode = 'q' if all(isinstance(x, int) for x in arr) else 'd'
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    n = len(arr)
+    if n < 2:
+        return arr
+
+    itemsize = array(typecode).itemsize
+    blocks = [shared_memory.SharedMemory(create=True, size=n * itemsize) for _ in range(2)]
+    views = []
+    try:
+        views = [memoryview(block.buf)[:n * itemsize].cast(typecode) for block in blocks]
+        views[0][:] = arr if isinstance(arr, array) else array(typecode, arr)
+
+        # the partitions, given by their start indices followed by n
+        partitions = min(workers, n)
+        run_starts = [n * i // partitions for i in range(partitions + 1)]
+
+        if workers == 1:
+            source = _sort(views, typecode, run_starts, workers, None)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker,
+                    initargs=([block.name for block in blocks], typecode, n)) as executor:
+                source = _sort(views, typecode, run_starts, workers, executor)
+
+        if isinstance(arr, array):
+            arr[:] = array(typecode, views[source])
+        else:
+            arr[:] = views[source].tolist()
+    finally:
+        # the views have to be released before the shared memory can be closed, and the shared memory is
+        # unlinked even if an error occurred, so that it does not outlive the process
+        for view in views:
+            view.release()
+        for block in blocks:
+            try:
+                block.close()
+            finally:
+                block.unlink()
+    return arr
+
+
+def _sort(views, typecode, run_starts, workers, executor):
+    # sort every partition in place
+    tasks = [(run_starts[i], run_starts[i + 1]) for i in range(len(run_starts) - 1)]
+    _run(executor, _sort_partition, _worker_sort_partition, views, typecode, tasks)
+
+    # merge neighboring runs two by two; source is the index of the block holding the current runs
+    source = 0
+    while len(run_starts) > 2:
+        pairs = []
+        for i in range(0, len(run_starts) - 1, 2):
+            start, middle = run_starts[i], run_starts[i + 1]
+            # an odd run at the end is merged with an empty one, which simply copies it to the other block
+            end = run_starts[i + 2] if i + 2 < len(run_starts) else middle
+            pairs.append((start, middle, end))
+
+        # split every merge into pieces, so that all the workers are busy in every round
+        pieces_per_pair = -(-workers // len(pairs))
+        tasks = []
+        for start, middle, end in pairs:
+            split_positions = [start + (end - start) * p // pieces_per_pair for p in range(pieces_per_pair + 1)]
+            splits = [merge_path(views[source], start, middle, middle, end, k - start) for k in split_positions]
+            for p in range(pieces_per_pair):
+                left_start, left_end = start + splits[p], start + splits[p + 1]
+                right_start = middle + (split_positions[p] - start - splits[p])
+                right_end = middle + (split_positions[p + 1] - start - splits[p + 1])
+                if left_start < left_end or right_start < right_end:
+                    tasks.append((source, left_start, left_end, right_start, right_end, split_positions[p]))
+        _run(executor, _merge_pieces, _worker_merge_pieces, views, typecode, tasks)
+
+        run_starts = [start for start, _, _ in pairs] + [run_starts[-1]]
+        source = 1 - source
+
+    return source
+
+
+def _run(executor, function, worker_function, views, typecode, tasks):
+    if executor is None:
+        for task in tasks:
+            function(views, typecode, *task)
+    else:
+        # only the indices are sent to the workers; wait for all of them before the next round
+        for _ in executor.map(worker_function, tasks):
+            pass
+
+
+def _sort_partition(views, typecode, start, end):
+    views[0][start: end] = array(typecode, sorted(views[0][start: end]))
+
+
+def _merge_pieces(views, typecode, source, left_start, left_end, right_start, right_end, output_start):
+    # the piece consists of two sorted runs, which the built-in sort merges in linear time; the left run comes
+    # first, so that equal elements keep their order
+    piece = array(typecode, views[source][left_start: left_end])
+    piece.extend(views[source][right_start: right_end])
+    views[1 - source][output_start: output_start + len(piece)] = array(typecode, sorted(piece))
+
+
+def merge_path(arr, left_start, left_end, right_start, right_end, k):
+    # binary search for the largest i such that taking the first i elements from the left range and the first
+    # k - i elements from the right range gives the first k elements of the merged output
+    low = max(0, k - (right_end - right_start))
+    high = min(k, left_end - left_start)
+    while low < high:
+        i = (low + high + 1) // 2
+        j = k - i
+        # the element left_start + i - 1 comes before the element right_start + j in the output
+        if j == right_end - right_start or arr[left_start + i - 1] <= arr[right_start + j]:
+            low = i
+        else:
+            high = i - 1
+    return low
+
+
+# the shared memory and the views of a worker process, set up once when the process starts
+_worker_blocks = None
+_worker_views = None
+_worker_typecode = None
+
+
+def _init_worker(names, typecode, n):
+    global _worker_blocks, _worker_views, _worker_typecode
+    _worker_blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    itemsize = array(typecode).itemsize
+    _worker_views = [memoryview(block.buf)[:n * itemsize].cast(typecode) for block in _worker_blocks]
+    _worker_typecode = typecode
+
+
+def _worker_sort_partition(task):
+    _sort_partition(_worker_views, _worker_typecode, *task)
+
+
+def _worker_merge_pieces(task):
+    _merge_pieces(_worker_views, _worker_typecode, *task)
+
+
+def benchmark(n=1000000, workers=(1, 2, 4, 8), typecode='d', seed=0):
+    rng = random.Random(seed)
+    numbers = array(typecode, (rng.random() for _ in range(n)))
+    timings = {}
+
+    for worker_count in sorted(set(workers) | {1}):
+        arr = array(typecode, numbers)
+        start = time.perf_counter()
+        parallel_merge_sort(arr, workers=worker_count)
+        timings[worker_count] = time.perf_counter() - start
+
+    return {worker_count: (seconds, timings[1] / seconds) for worker_count, seconds in timings.items()}
+
+
+class TestParallelMergeSort(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.numbers = [rng.randint(-100, 100) for _ in range(1000)]
+
+    def test_serial(self):
+        arr = array('q', self.numbers)
+        parallel_merge_sort(arr, workers=1)
+        self.assertEqual(arr.tolist(), sorted(self.numbers))
+
+    def test_parallel(self):
+        for workers in [2, 3, 4]:
+            arr = array('q', self.numbers)
+            parallel_merge_sort(arr, workers=workers)
+            self.assertEqual(arr.tolist(), sorted(self.numbers))
+
+    def test_list(self):
+        arr = [7, 1, 8, -19, 14, 44, 0.2]
+        parallel_merge_sort(arr, workers=3)
+        self.assertEqual(arr, [-19, 0.2, 1, 7, 8, 14, 44])
+
+        arr = []
+        parallel_merge_sort(arr, workers=2)
+        self.assertEqual(arr, [])
+
+    def test_list_typecode(self):
+        # integers come back as integers, and exactly, even when they cannot be represented by a float
+        arr = [3, 1, 2]
+        parallel_merge_sort(arr, workers=2)
+        self.assertEqual(arr, [1, 2, 3])
+        self.assertTrue(all(type(x) is int for x in arr))
+
+        arr = [2 ** 60 + 1, 2 ** 60, -2 ** 62]
+        parallel_merge_sort(arr, workers=1)
+        self.assertEqual(arr, [-2 ** 62, 2 ** 60, 2 ** 60 + 1])
+
+        # an explicit typecode is used as given
+        arr = [3, 1, 2]
+        parallel_merge_sort(arr, typecode='d', workers=1)
+        self.assertEqual([type(x) for x in arr], [float] * 3)
+
+    def test_error(self):
+        # the error of the caller is raised, not an error from releasing the shared memory
+        arr = [1, 'x', 3]
+        with self.assertRaises(TypeError):
+            parallel_merge_sort(arr, typecode='q', workers=1)
+        self.assertEqual(arr, [1, 'x', 3])
+
+    def test_merge_path(self):
+        # the merged output is 1, 2, 3, 3, 4, 5, 7, where the first 3 comes from the left range
+        arr = [1, 3, 5, 7, 2, 3, 4]
+        self.assertEqual([merge_path(arr, 0, 4, 4, 7, k) for k in range(8)], [0, 1, 1, 2, 2, 2, 3, 4])
+
+    def test_pieces(self):
+        # more workers than partitions in the later rounds, so every merge is split into several pieces,
+        # and an odd number of partitions
+        for workers in [1, 5, 7]:
+            arr = array('d', [float(x % 17) for x in range(200)])
+            expected = sorted(arr)
+            self.assertIs(parallel_merge_sort(arr, workers=workers), arr)
+            self.assertEqual(arr.tolist(), expected)
+
+    def test_benchmark(self):
+        timings = benchmark(n=10000, workers=(2,))
+        self.assertEqual(set(timings), {1, 2})
+        self.assertEqual(timings[1][1], 1)
+
+
+# the worker processes may import this file, so the tests only run when it is executed directly
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
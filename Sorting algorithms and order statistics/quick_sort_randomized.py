@@ -11,52 +11,219 @@ The file contains the following functions
     * quick_sort - recursive function that takes as input an array, a start index and an end index,
     and sorts the input array between the two given indices (inclusive) in ascending order. The function is designed
     to have default arguments, so that it can also be called in the natural way by simply giving it only the array as
-    input, when we want to sort the entire array.
+    input, when we want to sort the entire array. Same as the built-in sorted, the elements can be compared by
+    key(element) instead of the elements themselves, and sorted in descending order with reverse=True; quick sort
+    is not stable, so equal elements may change their order.
+
+    * quick_sort_keys - auxiliary function used by quick_sort when a key is given; it sorts an array together
+    with a parallel list of keys, in which every key is computed exactly once
 
     * randomized_partition - auxiliary function used by quick_sort; it takes as input an array and two indices
     start_index, and end_index; it selects a random element (pivot) of the array that lies between the two input
     indices and returns the array partitioned around the pivot, with all elements that are <= pivot lying to the
-    left of the pivot and all elements >pivot lying to the right of the pivot
+    left of the pivot and all elements >pivot lying to the right of the pivot. If a list of keys is given, the
+    elements are compared by their keys, and every key is moved together with its element
+
+    * sort_by_key - auxiliary function used by quick_sort when a key is given or reverse is True; it computes all
+    the keys into a list, sorts the elements together with their keys, and puts them back into the input array
+
+    * introsort - same arguments as quick_sort, but sorts with introsort (Musser, Introspective Sorting and Selection
+    Algorithms, 1997), which keeps the O(n*log(n)) running time of heap sort in the worst case:
+        - the range is partitioned three ways (Dutch national flag), into the elements smaller than, equal to and
+        larger than the pivot, so that the elements equal to the pivot are never looked at again, and many
+        duplicates make the sort faster instead of slower
+        - the pivot is the median of the first, middle and last elements of the range, or for large ranges the
+        median of three such medians (Tukey's ninther)
+        - only the smaller side is sorted by a recursive call, while the larger side is sorted by the loop of the
+        current call, so that the recursion depth is at most log(n)
+        - when the number of partitioning steps exceeds 2*log(n), the range is sorted with heap sort
+        - ranges with at most cutoff elements are sorted with insertion sort
+
+    * introsort_keys - auxiliary function used by introsort, that sorts an array together with an optional
+    parallel list of keys, in which every key is computed exactly once
+
+    * choose_pivot, three_way_partition, insertion_sort_range - auxiliary functions used by introsort; the heap sort
+    fallback is heap_sort_keys from heap_sort.py
 
 The file also contains the TestQuickSort class, which provides several test cases for the implemented function.
 """
 
 
+import math
 import random
 import unittest
 
+from heap_sort import heap_sort_keys
+
 
-def quick_sort(arr, start_index=0, end_index=None):
+def quick_sort(arr, start_index=0, end_index=None, key=None, reverse=False):
     if end_index is None:
         end_index = len(arr)-1
 
+    if key is not None or reverse:
+        sort_by_key(arr, start_index, end_index, key, reverse, quick_sort_keys)
+        return
+
     if start_index < end_index:
         partition_index = randomized_partition(arr, start_index, end_index)
         quick_sort(arr, start_index, partition_index - 1)
         quick_sort(arr, partition_index + 1, end_index)
 
 
-def randomized_partition(arr, start_index, end_index):
+def quick_sort_keys(arr, keys, start_index, end_index):
+    # same as quick_sort, but compares the keys and moves every key together with its element
+    if start_index < end_index:
+        partition_index = randomized_partition(arr, start_index, end_index, keys)
+        quick_sort_keys(arr, keys, start_index, partition_index - 1)
+        quick_sort_keys(arr, keys, partition_index + 1, end_index)
+
+
+def randomized_partition(arr, start_index, end_index, keys=None):
+    # the elements are compared by their keys, if there are any
+    compared = arr if keys is None else keys
+
     # generate a random pivot
     pivot = random.randint(start_index, end_index)
     arr[pivot], arr[end_index] = arr[end_index], arr[pivot]
+    if keys is not None:
+        keys[pivot], keys[end_index] = keys[end_index], keys[pivot]
 
     # partition the input array around the pivot
-    pivot_element = arr[end_index]
+    pivot_element = compared[end_index]
     k = start_index - 1
 
     # the below code puts all elements <= pivot_element to the left of the pivot_element \
     # and elements > pivot_element to the right of the pivot_element
     for j in range(start_index, end_index):
-        if arr[j] <= pivot_element:
+        if compared[j] <= pivot_element:
             k += 1
             arr[k], arr[j] = arr[j], arr[k]
+            if keys is not None:
+                keys[k], keys[j] = keys[j], keys[k]
 
     # place the pivot_element in the right position in the array and then return its index
     arr[k+1], arr[end_index] = arr[end_index], arr[k+1]
+    if keys is not None:
+        keys[k+1], keys[end_index] = keys[end_index], keys[k+1]
     return k+1
 
 
+def sort_by_key(arr, start_index, end_index, key, reverse, sort_function):
+    # compute every key exactly once, into a list parallel to the elements of arr[start_index: end_index + 1]
+    items = arr[start_index: end_index + 1]
+    keys = list(items) if key is None else [key(item) for item in items]
+
+    sort_function(items, keys, 0, len(items) - 1)
+
+    # quick sort is not stable, so the descending order is simply the ascending order reversed
+    if reverse:
+        items.reverse()
+    arr[start_index: end_index + 1] = items
+
+
+def introsort(arr, start_index=0, end_index=None, key=None, reverse=False, cutoff=16):
+    if end_index is None:
+        end_index = len(arr)-1
+
+    if key is not None or reverse:
+        sort_by_key(arr, start_index, end_index, key, reverse,
+                    lambda items, keys, start, end: introsort_keys(items, keys, start, end, cutoff))
+        return
+
+    introsort_keys(arr, None, start_index, end_index, cutoff)
+
+
+def introsort_keys(arr, keys, start_index, end_index, cutoff=16, depth_limit=None):
+    if depth_limit is None:
+        depth_limit = 2 * int(math.log2(end_index - start_index + 1)) if end_index > start_index else 0
+
+    # the elements are compared by their keys, if there are any
+    compared = arr if keys is None else keys
+
+    while end_index - start_index + 1 > cutoff:
+        if depth_limit == 0:
+            # too many partitioning steps, so the pivots were bad: fall back to heap sort
+            heap_sort_keys(arr, keys, start_index, end_index)
+            return
+        depth_limit -= 1
+
+        pivot_element = compared[choose_pivot(compared, start_index, end_index)]
+        lower, upper = three_way_partition(arr, start_index, end_index, pivot_element, keys)
+
+        # recurse on the smaller side, and continue the loop on the larger one
+        if lower - start_index < end_index - upper:
+            introsort_keys(arr, keys, start_index, lower - 1, cutoff, depth_limit)
+            start_index = upper + 1
+        else:
+            introsort_keys(arr, keys, upper + 1, end_index, cutoff, depth_limit)
+            end_index = lower - 1
+
+    insertion_sort_range(arr, start_index, end_index, keys)
+
+
+def choose_pivot(compared, start_index, end_index):
+    def median_of_three(i, j, k):
+        if compared[i] < compared[j]:
+            if compared[j] < compared[k]:
+                return j
+            return k if compared[i] < compared[k] else i
+        if compared[i] < compared[k]:
+            return i
+        return k if compared[j] < compared[k] else j
+
+    middle_index = (start_index + end_index) // 2
+    if end_index - start_index + 1 < 40:
+        return median_of_three(start_index, middle_index, end_index)
+
+    # Tukey's ninther: the median of the medians of three groups of three elements spread over the range
+    step = (end_index - start_index + 1) // 8
+    return median_of_three(median_of_three(start_index, start_index + step, start_index + 2 * step),
+                           median_of_three(middle_index - step, middle_index, middle_index + step),
+                           median_of_three(end_index - 2 * step, end_index - step, end_index))
+
+
+def three_way_partition(arr, start_index, end_index, pivot_element, keys=None):
+    # the below code keeps arr[start_index: lower] < pivot_element, arr[lower: i] == pivot_element and
+    # arr[upper+1: end_index+1] > pivot_element, while arr[i: upper+1] is not looked at yet
+    compared = arr if keys is None else keys
+    lower = start_index
+    i = start_index
+    upper = end_index
+    while i <= upper:
+        if compared[i] < pivot_element:
+            arr[lower], arr[i] = arr[i], arr[lower]
+            if keys is not None:
+                keys[lower], keys[i] = keys[i], keys[lower]
+            lower += 1
+            i += 1
+        elif pivot_element < compared[i]:
+            arr[upper], arr[i] = arr[i], arr[upper]
+            if keys is not None:
+                keys[upper], keys[i] = keys[i], keys[upper]
+            upper -= 1
+        else:
+            i += 1
+
+    # the elements equal to pivot_element are arr[lower: upper+1]
+    return lower, upper
+
+
+def insertion_sort_range(arr, start_index, end_index, keys=None):
+    compared = arr if keys is None else keys
+    for i in range(start_index + 1, end_index + 1):
+        element = arr[i]
+        element_key = compared[i]
+        j = i - 1
+        while j >= start_index and element_key < compared[j]:
+            arr[j + 1] = arr[j]
+            if keys is not None:
+                keys[j + 1] = keys[j]
+            j -= 1
+        arr[j + 1] = element
+        if keys is not None:
+            keys[j + 1] = element_key
+
+
 class TestQuickSort(unittest.TestCase):
 
     def setUp(self):
@@ -90,5 +257,85 @@ class TestQuickSort(unittest.TestCase):
         expected = []
         self.assertEqual(actual, expected)
 
+    def test_key_and_reverse(self):
+        records = [('b', 2), ('a', 3), ('c', 1), ('d', 4), ('e', 0)]
+        quick_sort(records, key=lambda record: record[1])
+        self.assertEqual(records, [('e', 0), ('c', 1), ('b', 2), ('a', 3), ('d', 4)])
+
+        quick_sort(records, key=lambda record: record[0], reverse=True)
+        self.assertEqual(records, [('e', 0), ('d', 4), ('c', 1), ('b', 2), ('a', 3)])
+
+        quick_sort(self.array_to_sort_1, reverse=True)
+        self.assertEqual(self.array_to_sort_1, [44, 14, 8, 7, 1, 0.2, -19])
+
+        # equal keys end up next to each other, and every key is computed once
+        calls = []
+        arr = [5, -3, 3, -5, 1, 0, -1]
+        quick_sort(arr, key=lambda element: calls.append(element) or abs(element))
+        self.assertEqual([abs(element) for element in arr], [0, 1, 1, 3, 3, 5, 5])
+        self.assertEqual(len(calls), 7)
+
+    def test_introsort(self):
+        for arr, expected in [(self.array_to_sort_1, [-19, 0.2, 1, 7, 8, 14, 44]),
+                              (self.array_to_sort_2, [1, 3, 5, 7, 9, 11, 13]),
+                              (self.array_to_sort_3, [7, 8, 9]),
+                              (self.array_to_sort_4, [])]:
+            introsort(arr)
+            self.assertEqual(arr, expected)
+
+    def test_introsort_random(self):
+        rng = random.Random(8)
+        for size in [1, 2, 16, 17, 39, 40, 100, 2000]:
+            for values in [3, 1000]:
+                arr = [rng.randint(0, values) for _ in range(size)]
+                expected = sorted(arr)
+                introsort(arr, cutoff=4)
+                self.assertEqual(arr, expected)
+
+        # only the given range is sorted
+        arr = [5, 4, 3, 2, 1]
+        introsort(arr, 1, 3, cutoff=1)
+        self.assertEqual(arr, [5, 2, 3, 4, 1])
+
+    def test_introsort_duplicates(self):
+        # the randomized quick_sort would recurse once per element here, and exceed the recursion limit
+        arr = [7] * 5000 + [3] * 5000
+        introsort(arr)
+        self.assertEqual(arr, [3] * 5000 + [7] * 5000)
+
+    def test_heap_sort_fallback(self):
+        # a depth limit of 1 allows a single partitioning step, after which the two sides are heap sorted
+        rng = random.Random(9)
+        arr = [rng.randint(0, 100) for _ in range(500)]
+        expected = sorted(arr)
+        introsort_keys(arr, None, 0, len(arr) - 1, cutoff=4, depth_limit=1)
+        self.assertEqual(arr, expected)
+
+        arr = [rng.randint(0, 100) for _ in range(100)]
+        expected = sorted(arr)
+        heap_sort_keys(arr, None, 10, 89)
+        self.assertEqual(arr[10: 90], sorted(arr[10: 90]))
+        self.assertEqual(sorted(arr), expected)
+
+    def test_introsort_key_and_reverse(self):
+        records = [('b', 2), ('a', 3), ('c', 1), ('d', 4), ('e', 0)]
+        introsort(records, key=lambda record: record[1])
+        self.assertEqual(records, [('e', 0), ('c', 1), ('b', 2), ('a', 3), ('d', 4)])
+
+        introsort(records, key=lambda record: record[0], reverse=True)
+        self.assertEqual(records, [('e', 0), ('d', 4), ('c', 1), ('b', 2), ('a', 3)])
+
+        rng = random.Random(10)
+        arr = [rng.random() for _ in range(1000)]
+        expected = sorted(arr, key=lambda element: -element)
+        introsort(arr, key=lambda element: -element)
+        self.assertEqual(arr, expected)
+
+    def test_choose_pivot(self):
+        self.assertEqual(choose_pivot([3, 1, 2], 0, 2), 2)
+        # the ninther of the elements 0, 6, 12, 19, 25, 31, 38, 44, 50 is 25
+        arr = list(range(51))
+        self.assertEqual(choose_pivot(arr, 0, 50), 25)
+
 
 unittest.main(verbosity=2)